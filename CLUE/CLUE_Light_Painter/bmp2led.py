@@ -9,9 +9,17 @@ BMP-to-DotStar-ready-bytearrays.
 # pylint: disable=import-error
 import os
 import math
-import ulab
+import struct
+from time import monotonic
+try:
+    from ulab import numpy as np
+except ImportError:
+    import numpy as np # CPython host, used by precompile.py
 
 BUFFER_ROWS = 32
+PRECOMPILED_DIR = 'precompiled' # Subfolder of image path for precompile.py
+CHECKPOINT_ROWS = 256 # Output rows between resume checkpoints
+CHECKPOINT_SUFFIX = '.ckpt' # Appended to output filename for checkpoint
 
 class BMPError(Exception):
     """Used for raising errors in the BMP2LED Class."""
@@ -62,6 +70,7 @@ class BMP2LED:
                                Optional; 2.4 if unspecified.
         """
         order = order.lower()
+        self.order = order
         self.red_index = order.find('r')
         self.green_index = order.find('g')
         self.blue_index = order.find('b')
@@ -69,6 +78,8 @@ class BMP2LED:
         self.gamma = gamma
         self.bmp_file = None
         self.bmp_specs = None
+        self.header = bytearray(34) # Reused by read_header()
+        self.file_position = 0 # Tracked by read_row() to avoid seeks
 
 
     def read_le(self, num_bytes):
@@ -94,15 +105,16 @@ class BMP2LED:
         Returns:
             BMPSpecs object containing size, offset, etc.
         """
-        if self.bmp_file.read(2) != b'BM': # Check signature
+        # Entire header is read at once into a preallocated buffer, fields
+        # are then unpacked from it (rather than many small reads).
+        if (self.bmp_file.readinto(self.header) != len(self.header) or
+                self.header[0:2] != b'BM'): # Check signature
             raise BMPError("Not BMP file")
 
-        self.bmp_file.read(8) # Read & ignore file size & creator bytes
-
-        image_offset = self.read_le(4) # Start of image data
-        self.bmp_file.read(4) # Read & ignore header size
-        width = self.read_le(4)
-        height = self.read_le(4)
+        # Skip file size, creator bytes and header size
+        image_offset = struct.unpack_from('<I', self.header, 10)[0]
+        width, height, planes, depth, compression = struct.unpack_from(
+            '<iiHHI', self.header, 18)
         # BMPs are traditionally stored bottom-to-top.
         # If bmp_height is negative, image is in top-down order.
         # This is not BMP canon but has been observed in the wild!
@@ -111,13 +123,14 @@ class BMP2LED:
             height = -height
             flip = False
 
-        if self.read_le(2) != 1:
+        if planes != 1:
             raise BMPError("Not single-plane")
-        if self.read_le(2) != 24: # bits per pixel
+        if depth != 24: # bits per pixel
             raise BMPError("Not 24-bit")
-        if self.read_le(2) != 0:
+        if compression != 0:
             raise BMPError("Compressed file")
 
+        self.file_position = len(self.header)
         return BMPSpecs(width, height, image_offset, flip)
 
 
@@ -146,6 +159,26 @@ class BMP2LED:
         return valid_list
 
 
+    def precompiled_filename(self, path, bmp_filename, brightness, loop):
+        """
+        Name of the precompiled DotStar data file for a BMP image, as
+        written by the host-side precompile.py tool. Filename encodes every
+        setting that affects the output bytes, so a file only matches if
+        it was generated for this strip and these settings.
+        Arguments:
+            path (string)         : Directory containing BMP images.
+            bmp_filename (string) : BMP filename within path (no path).
+            brightness (float)    : Brightness as passed to process().
+            loop (boolean)        : Looped vs. non-looped playback.
+        Returns:
+            Full path and filename (string). File may or may not exist.
+        """
+        return '%s/%s/%s-%d%s-g%.2f-b%.2f%s.dat' % (
+            path, PRECOMPILED_DIR, bmp_filename.split('.')[0],
+            self.num_pixels, self.order, self.gamma, brightness,
+            '-loop' if loop else '')
+
+
     def read_row(self, row, dest):
         """
         Read one row of pixels from BMP file, clipped to minimum of BMP
@@ -161,15 +194,59 @@ class BMP2LED:
         # this makes BMP image prep an easy 90 degree CCW rotation.
         if not self.bmp_specs.flip:
             row = self.bmp_specs.height - 1 - row
-        self.bmp_file.seek(self.bmp_specs.image_offset +
-                           row * self.bmp_specs.row_size)
+        position = (self.bmp_specs.image_offset +
+                    row * self.bmp_specs.row_size)
+        # Rows are usually read in file order; seek only when they're not,
+        # so a large image is streamed through with no extra file overhead.
+        if position != self.file_position:
+            self.bmp_file.seek(position)
         self.bmp_file.readinto(dest)
+        self.file_position = position + len(dest)
+
+
+    @staticmethod
+    def read_checkpoint(checkpoint_filename, signature):
+        """
+        Read a conversion checkpoint left by an interrupted process() call.
+        Arguments:
+            checkpoint_filename (string) : Full path and filename of
+                                           checkpoint file.
+            signature (string)           : Describes input file and
+                                           settings of current conversion.
+        Returns:
+            Tuple of (total rows, rows completed) if checkpoint exists and
+            matches signature, else None.
+        """
+        try:
+            with open(checkpoint_filename, 'r') as file:
+                if file.readline().rstrip('\n') != signature:
+                    return None
+                rows, rows_done = file.readline().split()
+                return int(rows), int(rows_done)
+        except (OSError, ValueError):
+            return None
+
+
+    @staticmethod
+    def write_checkpoint(checkpoint_filename, signature, rows, rows_done):
+        """
+        Record conversion progress so process() can resume from here.
+        Arguments:
+            checkpoint_filename (string) : Full path and filename of
+                                           checkpoint file.
+            signature (string)           : Describes input file and
+                                           settings of current conversion.
+            rows (int)                   : Total rows in conversion.
+            rows_done (int)              : Rows written and flushed so far.
+        """
+        with open(checkpoint_filename, 'w') as file:
+            file.write('%s\n%d %d\n' % (signature, rows, rows_done))
 
 
     # pylint: disable=too-many-arguments, too-many-locals
     # pylint: disable=too-many-branches, too-many-statements
     def process(self, input_filename, output_filename, rows,
-                brightness=1.0, loop=False, callback=None):
+                brightness=1.0, loop=False, callback=None, resume=False):
         """
         Process a 24-bit uncompressed BMP file into a series of
         DotStar-ready rows of bytes (including header and footer) written
@@ -204,7 +281,16 @@ class BMP2LED:
                                        for looped vs. non-looped playback).
             callback (func)          : Callback function for displaying load
                                        progress, will be passed a float
-                                       ranging from 0.0 (start) to 1.0 (end).
+                                       ranging from 0.0 (start) to 1.0 (end)
+                                       and the conversion speed in rows per
+                                       second (float).
+            resume (boolean)         : If True, and a checkpoint shows an
+                                       earlier call with the same input and
+                                       settings was interrupted (e.g. power
+                                       loss), conversion continues where it
+                                       stopped rather than starting over.
+                                       Progress is checkpointed every
+                                       CHECKPOINT_ROWS rows regardless.
         Returns: actual number of rows in output file (may be less than
                  number of rows requested, depending on storage space.
         """
@@ -213,10 +299,10 @@ class BMP2LED:
         # It's formed just like valid strip data (with header, per-pixel
         # start markers and footer), with colors all '0' to start...these
         # will be filled later.
-        dotstar_buffer = ulab.numpy.array([0] * 4 +
-                                    [255, 0, 0, 0] * self.num_pixels +
-                                    [255] * ((self.num_pixels + 15) // 16),
-                                    dtype=ulab.numpy.uint8)
+        dotstar_buffer = np.array([0] * 4 +
+                                  [255, 0, 0, 0] * self.num_pixels +
+                                  [255] * ((self.num_pixels + 15) // 16),
+                                  dtype=np.uint8)
         dotstar_row_size = len(dotstar_buffer)
 
         # Output rows are held in RAM and periodically written,
@@ -224,20 +310,39 @@ class BMP2LED:
         output_buffer = bytearray(BUFFER_ROWS * dotstar_row_size)
         output_position = 0
 
-        # Delete old temporary file, if any
-        try:
-            os.remove(output_filename)
-        except OSError:
-            pass
-
-        # Determine free space on drive
-        stats = os.statvfs('/')
-        bytes_free = stats[0] * stats[4]   # block size, free blocks
-        if not loop:                       # If not looping, leave space
-            bytes_free -= dotstar_row_size # for 'off' LED data at end.
-        # Clip the maximum number of output rows based on free space and
-        # the size (in bytes) of each DotStar row.
-        rows = min(rows, bytes_free // dotstar_row_size)
+        # Any checkpoint must match all of the inputs to this conversion
+        checkpoint_filename = output_filename + CHECKPOINT_SUFFIX
+        signature = '%s %d %.4f %d %d %s %.4f' % (
+            input_filename, rows, brightness, loop, self.num_pixels,
+            self.order, self.gamma)
+        checkpoint = None
+        if resume:
+            checkpoint = self.read_checkpoint(checkpoint_filename, signature)
+
+        if checkpoint:
+            # Pick up where the interrupted conversion left off. Output
+            # file already exists, sized for the original (clipped) rows.
+            rows, start_row = checkpoint
+        else:
+            start_row = 0
+            # Delete old temporary file and checkpoint, if any
+            for filename in (output_filename, checkpoint_filename):
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
+
+            # Determine free space on drive
+            try:
+                stats = os.statvfs('/')
+                bytes_free = stats[0] * stats[4] # block size, free blocks
+            except AttributeError:    # No statvfs on some host OSes,
+                bytes_free = rows * dotstar_row_size * 2 # don't clip rows.
+            if not loop:                       # If not looping, leave space
+                bytes_free -= dotstar_row_size # for 'off' LED data at end.
+            # Clip the maximum number of output rows based on free space and
+            # the size (in bytes) of each DotStar row.
+            rows = min(rows, bytes_free // dotstar_row_size)
 
         try:
             with open(input_filename, 'rb') as self.bmp_file:
@@ -255,11 +360,15 @@ class BMP2LED:
 
                 # Each output row is interpolated from two BMP rows,
                 # we'll call them 'a' and 'b' here.
-                row_a_data = ulab.numpy.zeros(row_bytes, dtype=ulab.numpy.uint8)
-                row_b_data = ulab.numpy.zeros(row_bytes, dtype=ulab.numpy.uint8)
+                row_a_data = np.zeros(row_bytes, dtype=np.uint8)
+                row_b_data = np.zeros(row_bytes, dtype=np.uint8)
                 prev_row_a_index, prev_row_b_index = None, None
 
-                with open(output_filename, 'wb') as led_file:
+                if checkpoint:
+                    led_file = open(output_filename, 'r+b')
+                    led_file.seek(start_row * dotstar_row_size)
+                else:
+                    led_file = open(output_filename, 'wb')
                     # To avoid continually appending to output file (a slow
                     # operation), seek to where the end of the file would
                     # be, write a nonsense byte there, then seek back to
@@ -267,8 +376,13 @@ class BMP2LED:
                     led_file.seek((dotstar_row_size * rows) - 1)
                     led_file.write(b'\0')
                     led_file.seek(0)
+                with led_file:
+                    # Dither error is fully applied by the end of each row,
+                    # so a resumed conversion can start fresh with none.
                     err = 0
-                    for row in range(rows): # For each output row...
+                    checkpoint_row = start_row
+                    start_time = monotonic()
+                    for row in range(start_row, rows): # Each output row
                         # Scale position into pixel space...
                         if loop: # 0 to <image height
                             position = self.bmp_specs.height * row / rows
@@ -327,7 +441,7 @@ class BMP2LED:
                         # operations. First, the 'want' values are quantized
                         # to uint8's -- so these will always be slightly
                         # dimmer (v. occasionally equal) to the 'want' vals.
-                        got = ulab.numpy.array(want, dtype=ulab.numpy.uint8)
+                        got = np.array(want, dtype=np.uint8)
                         # Note: naive 'foo = foo + bar' syntax used in this
                         # next section is intentional. ndarrays don't seem
                         # to always play well with '+=' syntax.
@@ -341,7 +455,7 @@ class BMP2LED:
                         # will be 0 or 1.
                         # Convert float values in err to integers
                         err = [int(min(max(0, e), 255)) for e in err]
-                        err_bits = ulab.numpy.array(err, dtype=ulab.numpy.uint8)
+                        err_bits = np.array(err, dtype=np.uint8)
                         # Add the 1's back into 'got', increasing the
                         # brightness of certain pixels by 1. Because the max
                         # value in 'got' is 254 (not 255), no clipping need
@@ -370,15 +484,26 @@ class BMP2LED:
                         output_position += dotstar_row_size
                         if output_position >= len(output_buffer):
                             led_file.write(output_buffer)
-                            if callback:
-                                callback(row / (rows - 1))
                             output_position = 0
+                            if row + 1 - checkpoint_row >= CHECKPOINT_ROWS:
+                                led_file.flush()
+                                checkpoint_row = row + 1
+                                self.write_checkpoint(checkpoint_filename,
+                                                      signature, rows,
+                                                      checkpoint_row)
+                            if callback:
+                                elapsed = monotonic() - start_time
+                                callback(row / (rows - 1),
+                                         (row + 1 - start_row) / elapsed
+                                         if elapsed > 0 else 0.0)
 
                     # Write any remaining buffered data
                     if output_position:
                         led_file.write(output_buffer[:output_position])
                         if callback:
-                            callback(1.0)
+                            elapsed = monotonic() - start_time
+                            callback(1.0, (rows - start_row) / elapsed
+                                     if elapsed > 0 else 0.0)
 
                     # If not looping, add an 'all off' row of LED data
                     # at end to ensure last row timing is consistent.
@@ -391,6 +516,12 @@ class BMP2LED:
                                                  ((self.num_pixels + 15) //
                                                   16)))
 
+                # Conversion finished, nothing to resume
+                try:
+                    os.remove(checkpoint_filename)
+                except OSError:
+                    pass
+
                 #print("Loaded OK!")
                 return rows
 
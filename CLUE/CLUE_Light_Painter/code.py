@@ -6,7 +6,9 @@
 Light painting project for Adafruit CLUE using DotStar LED strip.
 Images should be in 24-bit BMP format, with width matching the length
 of the LED strip. Uses ulab module to assist with interpolation and
-dithering, displayio for a minimal user interface.
+dithering, displayio for a minimal user interface. Images can optionally
+be converted ahead of time on a computer with precompile.py, skipping the
+slow on-device conversion step.
 
 TO RUN, boot.py MUST CONFIGURE FILESYSTEM FOR READ-WRITE MODE.
 TO EDIT CODE, FILESYSTEM MUST BE IN READ-ONLY MODE.
@@ -15,6 +17,7 @@ boot.py sets up latter condition using a jumper from pin 0 to GND.
 
 # pylint: disable=import-error
 import gc
+import os
 from time import monotonic, sleep
 import board
 import busio
@@ -128,6 +131,8 @@ class ClueLightPainter:
 
         self.image_num = 0    # Current selected image index in self.path
         self.num_rows = 0     # Nothing loaded yet
+        self.datafile = tempfile # Converted or precompiled LED data
+        self.row_step = 256   # Data rows per output row, 24.8 fixed-point
         self.loop = False     # Repeat image playback
         self.brightness = 1.0 # LED brightness, 0.0 (off) to 1.0 (bright)
         self.config_mode = 0  # Current setting being changed
@@ -178,12 +183,19 @@ class ClueLightPainter:
                                           16)))
 
 
-    def load_progress(self, amount):
+    def load_progress(self, amount, rows_per_second=None):
         """
         Callback function for image loading, moves progress bar on display.
         Arguments:
-            amount (float) : Current 'amount loaded' coefficient; 0.0 to 1.0
+            amount (float)          : Current 'amount loaded' coefficient;
+                                      0.0 to 1.0
+            rows_per_second (float) : Conversion speed, shown on display.
         """
+        if rows_per_second is not None:
+            group = board.DISPLAY.root_group
+            if len(group) > 1:
+                group.pop()
+            group.append(centered_label('%d rows/s' % rows_per_second, 70, 2))
         #self.rect.x = int(board.DISPLAY.width * (amount - 1.0))
         num_on = int(amount * self.bmp2led.num_pixels + 0.5)
         num_off = self.bmp2led.num_pixels - num_on
@@ -194,20 +206,40 @@ class ClueLightPainter:
                                  ((self.bmp2led.num_pixels + 15) // 16)))
 
 
+    def load_precompiled(self, brightness, rows):
+        """
+        Check for a precompiled LED data file (from precompile.py) matching
+        the current image and settings, and select it for playback if found.
+        Precompiled files have a fixed number of rows, so playback steps
+        through them at whatever rate fills the requested number of rows.
+        Arguments:
+            brightness (float) : Brightness, as would be passed to
+                                 BMP2LED.process().
+            rows (int)         : Number of rows requested for paint time.
+        Returns: True if precompiled file found and selected, else False.
+        """
+        filename = self.bmp2led.precompiled_filename(
+            self.path, self.images[self.image_num], brightness, self.loop)
+        try:
+            num_rows = os.stat(filename)[6] // self.row_size
+        except OSError:
+            return False
+        if not num_rows:
+            return False
+        if not self.loop:
+            rows += 1 # Both include an 'off' row at end
+        self.datafile = filename
+        self.num_rows = num_rows
+        self.row_step = max(1, (num_rows << 8) // max(1, rows))
+        return True
+
+
     def load_image(self):
         """
         Load BMP from image list, determined by variable self.image_num
-        (not a passed argument). Data is converted and placed in
-        self.tempfile.
+        (not a passed argument). If a matching precompiled file exists it's
+        used as-is, else data is converted and placed in self.tempfile.
         """
-        # Minimal progress display while image is loaded.
-        group = displayio.Group()
-        group.append(centered_label('LOADING...', 40, 3))
-        #self.rect = Rect(-board.DISPLAY.width, 120,
-        #                 board.DISPLAY.width, 40, fill=0x00B000)
-        #group.append(self.rect)
-        board.DISPLAY.root_group = group
-
         # pylint: disable=eval-used
         # (It's cool, is a 'trusted string' in the code)
         duration = eval(TIMES[self.time]) # Playback time in seconds
@@ -217,13 +249,27 @@ class ClueLightPainter:
         # Remap brightness from 0.0-1.0 to brightness_range.
         brightness = (self.brightness_range[0] + self.brightness *
                       (self.brightness_range[1] - self.brightness_range[0]))
+        if self.load_precompiled(brightness, rows):
+            return
+
+        # Minimal progress display while image is loaded.
+        group = displayio.Group()
+        group.append(centered_label('LOADING...', 40, 3))
+        #self.rect = Rect(-board.DISPLAY.width, 120,
+        #                 board.DISPLAY.width, 40, fill=0x00B000)
+        #group.append(self.rect)
+        board.DISPLAY.root_group = group
+
+        self.datafile = self.tempfile
+        self.row_step = 256
         try:
             self.num_rows = self.bmp2led.process(self.path + '/' +
                                                  self.images[self.image_num],
                                                  self.tempfile,
                                                  rows, brightness,
                                                  self.loop,
-                                                 self.load_progress)
+                                                 self.load_progress,
+                                                 resume=True)
         except (MemoryError, BMPError):
             group = displayio.Group()
             group.append(centered_label('TOO BIG', 40, 3))
@@ -242,10 +288,11 @@ class ClueLightPainter:
 
         board.DISPLAY.brightness = 0 # Screen backlight OFF
         painting = False
-        row = 0
+        row = 0 # Position in data file, 24.8 fixed-point
+        row_end = self.num_rows << 8
         action_list = [None, None]
 
-        with open(self.tempfile, 'rb') as file:
+        with open(self.datafile, 'rb') as file:
             led_buffer = bytearray(self.row_size)
             # During painting, automatic garbage collection is disabled
             # so there are no pauses in the LED output (which would wreck
@@ -270,7 +317,7 @@ class ClueLightPainter:
                     break # End paint loop
 
                 if painting:
-                    file.seek(row * self.row_size)
+                    file.seek((row >> 8) * self.row_size)
                     # using readinto() instead of read() is another
                     # avoid-automatic-garbage-collection strategy.
                     file.readinto(led_buffer)
@@ -281,11 +328,14 @@ class ClueLightPainter:
                     # function) reduces the output resolution slightly,
                     # in turn reducing the preprocessing requirements.
                     sleep(0.001)
-                    row += 1
-                    if row >= self.num_rows:
+                    row += self.row_step
+                    if row >= row_end:
                         if self.loop:
                             row = 0
                         else:
+                            # Resampled playback may step past the
+                            # 'off' row at end of file
+                            self.clear_strip()
                             painting = False
 
             # Re-enable automatic garbage collection before
@@ -0,0 +1,70 @@
+# SPDX-FileCopyrightText: 2020 Phillip Burgess for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Host-side (CPython, NOT CircuitPython) precompiler for CLUE Light Painter.
+Runs the same BMP2LED conversion the CLUE would, but on a computer, writing
+the finished DotStar SPI byte stream into a 'precompiled' subfolder of the
+image folder. When the painter finds a file there matching the selected
+image and settings, it's used directly and on-device conversion is skipped.
+Requires NumPy (pip install numpy), used in place of ulab.
+
+Example, with the CLUE's CIRCUITPY drive mounted:
+
+$ python precompile.py /media/CIRCUITPY/bmps-72px --brightness 0.75 0.45
+
+Brightness values are the final 0.0-1.0 levels passed to BMP2LED, i.e. the
+painter's on-screen brightness setting remapped to BRIGHTNESS_RANGE in
+code.py (setting 1.0 = 0.75, setting 0.5 = 0.45 with the defaults). Each
+image/brightness/loop combination is a separate file, so mind the space on
+the CIRCUITPY drive. Re-run after changing any images.
+"""
+
+import argparse
+import os
+from bmp2led import BMP2LED, PRECOMPILED_DIR
+
+
+def main():
+    """Parse command line and precompile each requested image."""
+    parser = argparse.ArgumentParser(
+        description='Precompile BMP images into DotStar data files for '
+                    'CLUE Light Painter.')
+    parser.add_argument('path', help='folder containing BMP images')
+    parser.add_argument('images', nargs='*',
+                        help='BMP filenames within path (default: all)')
+    parser.add_argument('--pixels', type=int, default=72,
+                        help='LED strip length (default: 72)')
+    parser.add_argument('--order', default='bgr',
+                        help='pixel color order (default: bgr)')
+    parser.add_argument('--gamma', type=float, default=2.4,
+                        help='gamma correction (default: 2.4)')
+    parser.add_argument('--brightness', type=float, nargs='+', default=[0.75],
+                        help='brightness level(s), 0.0-1.0 (default: 0.75)')
+    parser.add_argument('--rows', type=int, default=1024,
+                        help='rows per image; painter resamples to the '
+                             'selected time (default: 1024)')
+    parser.add_argument('--loop', action='store_true',
+                        help='also generate files for looped playback')
+    args = parser.parse_args()
+
+    bmp2led = BMP2LED(args.pixels, args.order, args.gamma)
+    images = args.images or bmp2led.scandir(args.path)
+    os.makedirs(os.path.join(args.path, PRECOMPILED_DIR), exist_ok=True)
+
+    for image in images:
+        for brightness in args.brightness:
+            for loop in (False, True) if args.loop else (False,):
+                output = bmp2led.precompiled_filename(args.path, image,
+                                                      brightness, loop)
+                # process() reports BMP format problems itself and
+                # returns None
+                rows = bmp2led.process(args.path + '/' + image, output,
+                                       args.rows, brightness, loop)
+                if rows:
+                    print('%s: %d rows' % (output, rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -43,6 +43,8 @@ Implementation Notes
 * Adafruit's CLUE library: https://github.com/adafruit/Adafruit_CircuitPython_CLUE
 """
 
+# pylint: disable=too-many-lines
+
 import time
 import array
 
@@ -77,6 +79,94 @@ def format_width(nchars, value):
     return text_value
 
 
+class MinMaxRing:
+    """Circular buffer of the minimum and maximum of completed buckets of
+    data held in arrays. The minimum and maximum across all buffered buckets
+    are maintained with monotonic deques of buffer slots, making them O(1)
+    rather than a scan of every bucket. Nothing is allocated after
+    construction."""
+
+    def __init__(self, size):
+        self._size = size
+        self._mins = array.array("f", [0.0] * size)
+        self._maxs = array.array("f", [0.0] * size)
+        # Two deques of slots stored as circular buffers, slots in _min_dq
+        # have strictly increasing minimums, _max_dq decreasing maximums
+        self._min_dq = array.array("B", [0] * size)
+        self._max_dq = array.array("B", [0] * size)
+        self._min_head = self._min_len = 0
+        self._max_head = self._max_len = 0
+        self._next = 0
+        self.count = 0
+
+    def clear(self):
+        self._min_head = self._min_len = 0
+        self._max_head = self._max_len = 0
+        self._next = 0
+        self.count = 0
+
+    def push(self, bucket_min, bucket_max):
+        """Add a completed bucket, discarding the oldest one if full."""
+        slot = self._next
+        if self.count == self._size:
+            # The oldest bucket is in slot, drop it from deque fronts
+            if self._min_len and self._min_dq[self._min_head] == slot:
+                self._min_head = (self._min_head + 1) % self._size
+                self._min_len -= 1
+            if self._max_len and self._max_dq[self._max_head] == slot:
+                self._max_head = (self._max_head + 1) % self._size
+                self._max_len -= 1
+        else:
+            self.count += 1
+        self._mins[slot] = bucket_min
+        self._maxs[slot] = bucket_max
+        # Newer buckets make any older ones which are not lower/higher
+        # irrelevant so pop them off the back before appending
+        while (
+            self._min_len
+            and self._mins[
+                self._min_dq[(self._min_head + self._min_len - 1) % self._size]
+            ]
+            >= self._mins[slot]
+        ):
+            self._min_len -= 1
+        self._min_dq[(self._min_head + self._min_len) % self._size] = slot
+        self._min_len += 1
+        while (
+            self._max_len
+            and self._maxs[
+                self._max_dq[(self._max_head + self._max_len - 1) % self._size]
+            ]
+            <= self._maxs[slot]
+        ):
+            self._max_len -= 1
+        self._max_dq[(self._max_head + self._max_len) % self._size] = slot
+        self._max_len += 1
+        self._next = (slot + 1) % self._size
+
+    def minimum(self):
+        if self._min_len == 0:
+            return Plotter.POS_INF
+        return self._mins[self._min_dq[self._min_head]]
+
+    def maximum(self):
+        if self._max_len == 0:
+            return Plotter.NEG_INF
+        return self._maxs[self._max_dq[self._max_head]]
+
+    def recent(self, buckets):
+        """Return (min, max) over the most recent buckets buckets."""
+        recent_min = Plotter.POS_INF
+        recent_max = Plotter.NEG_INF
+        for back in range(1, min(buckets, self.count) + 1):
+            slot = (self._next - back) % self._size
+            if self._mins[slot] < recent_min:
+                recent_min = self._mins[slot]
+            if self._maxs[slot] > recent_max:
+                recent_max = self._maxs[slot]
+        return (recent_min, recent_max)
+
+
 class Plotter:
     _DEFAULT_SCALE_MODE = {"lines": "onscroll", "dots": "screen"}
 
@@ -181,9 +271,10 @@ class Plotter:
             self._data_value.append(array.array("f", [0.0] * self._data_size))
 
         # begin-keep-pylint-happy
-        self._data_mins = None
-        self._data_maxs = None
-        self._data_stats_maxlen = None
+        self._data_min = None
+        self._data_max = None
+        self._data_start_ns = None
+        self._data_stats_maxlen = 10
         self._data_stats = None
         self._values = None
         self._data_values = None
@@ -191,6 +282,8 @@ class Plotter:
         self._data_idx = None
         self._plot_lastzoom_ns = None
         # end-keep-pylint-happy
+        # Completed buckets, the current one is in _data_min and _data_max
+        self._data_buckets = MinMaxRing(self._data_stats_maxlen - 1)
         self._init_data()
 
         self._mu_output = mu_output
@@ -224,11 +317,12 @@ class Plotter:
         self._last_manual_refresh = None
 
     def _init_data(self, ranges=True):
-        # Allocate arrays for each possible channel with plot_width elements
-        self._data_mins = [self.POS_INF]
-        self._data_maxs = [self.NEG_INF]
-        self._data_start_ns = [time.monotonic_ns()]
-        self._data_stats_maxlen = 10
+        # Minimum and maximum are kept in approximately 1 second buckets,
+        # the current bucket is updated for each value
+        self._data_min = self.POS_INF
+        self._data_max = self.NEG_INF
+        self._data_start_ns = time.monotonic_ns()
+        self._data_buckets.clear()
 
         # When in use the arrays in here are variable length
         self._data_stats = [[] * self._max_channels]
@@ -547,27 +641,36 @@ class Plotter:
 
         self._plot_dirty = True
 
+    def _new_bucket(self, now_ns, value):
+        """Complete the current stats bucket and start a new one with value."""
+        self._data_buckets.push(self._data_min, self._data_max)
+        self._data_start_ns = now_ns
+        self._data_min = value
+        self._data_max = value
+
     def _update_stats(self, values):
         """Update the statistics for minimum and maximum."""
         for idx, value in enumerate(values):
             # Occasionally check if we need to add a new bucket to stats
             if idx == 0 and self._values & 0xF == 0:
                 now_ns = time.monotonic_ns()
-                if now_ns - self._data_start_ns[-1] > 1e9:
-                    self._data_start_ns.append(now_ns)
-                    self._data_mins.append(value)
-                    self._data_maxs.append(value)
-                    # Remove the first elements if too long
-                    if len(self._data_start_ns) > self._data_stats_maxlen:
-                        self._data_start_ns.pop(0)
-                        self._data_mins.pop(0)
-                        self._data_maxs.pop(0)
+                if now_ns - self._data_start_ns > 1e9:
+                    self._new_bucket(now_ns, value)
                     continue
 
-            if value < self._data_mins[-1]:
-                self._data_mins[-1] = value
-            if value > self._data_maxs[-1]:
-                self._data_maxs[-1] = value
+            self._data_min = min(self._data_min, value)
+            self._data_max = max(self._data_max, value)
+
+    def _update_stats_many(self, samples):
+        """Update the statistics for minimum and maximum for a batch of
+        samples, checking once per batch if a new bucket is due."""
+        now_ns = time.monotonic_ns()
+        if now_ns - self._data_start_ns > 1e9:
+            self._new_bucket(now_ns, samples[0][0])
+
+        for values in samples:
+            self._data_min = min(self._data_min, *values)
+            self._data_max = max(self._data_max, *values)
 
     def _data_store(self, values):
         """Store the data values in the circular buffer."""
@@ -609,16 +712,17 @@ class Plotter:
         minimum and maximum times which are recorded in approximate 1 second buckets.
         Returns two element tuple with (min, max) or empty tuple for no zoom required.
         Caution is required with min == max."""
-        start_idx = len(self._data_start_ns) - self.ZOOM_IN_TIME
-        if start_idx < 0:
+        # The current bucket counts as one of the ZOOM_IN_TIME
+        if self._data_buckets.count + 1 < self.ZOOM_IN_TIME:
             return ()
 
         now_ns = time.monotonic_ns()
         if now_ns < self._plot_lastzoom_ns + self.ZOOM_IN_CHECK_TIME_NS:
             return ()
 
-        recent_min = min(self._data_mins[start_idx:])
-        recent_max = max(self._data_maxs[start_idx:])
+        recent_min, recent_max = self._data_buckets.recent(self.ZOOM_IN_TIME - 1)
+        recent_min = min(recent_min, self._data_min)
+        recent_max = max(recent_max, self._data_max)
         recent_range = recent_max - recent_min
         headroom = recent_range * self.ZOOM_HEADROOM
 
@@ -644,8 +748,8 @@ class Plotter:
 
         # Calcuate some new min/max values based on recentish data
         # and add some headroom
-        y_min = min(self._data_mins)
-        y_max = max(self._data_maxs)
+        y_min = min(self._data_buckets.minimum(), self._data_min)
+        y_max = max(self._data_buckets.maximum(), self._data_max)
         y_range = y_max - y_min
         headroom = y_range * self.ZOOM_HEADROOM
         new_plot_min = max(y_min - headroom, self._abs_min)
@@ -677,13 +781,32 @@ class Plotter:
         return False
 
     def data_add(self, values):
+        self._update_stats(values)
+        self._data_plot(values)
+
+        # scrolling mode has automatic refresh in background turned off
+        if self._mode == "scroll":
+            self._display_refresh()
+
+    def data_add_many(self, samples):
+        """Add a batch of samples, each one a tuple of values for the
+        channels as passed to data_add(). Statistics are updated for the
+        whole batch in one go and refresh happens once at the end."""
+        if not samples:
+            return
+        self._update_stats_many(samples)
+        for values in samples:
+            self._data_plot(values)
+
+        if self._mode == "scroll":
+            self._display_refresh()
+
+    def _data_plot(self, values):
         # pylint: disable=too-many-branches
         changed = False
         data_idx = self._data_idx
         x_pos = self._x_pos
 
-        self._update_stats(values)
-
         if self._mode == "wrap":
             if self._x_pos == 0 or self._scale_mode == "pixel":
                 changed = self._auto_plot_range(redraw_plot=False)
@@ -740,10 +863,6 @@ class Plotter:
         if self._mu_output:
             print(values)
 
-        # scrolling mode has automatic refresh in background turned off
-        if self._mode == "scroll":
-            self._display_refresh()
-
     def _change_y_range(self, new_plot_min, new_plot_max, redraw_plot=True):
         y_min = new_plot_min
         y_max = new_plot_max
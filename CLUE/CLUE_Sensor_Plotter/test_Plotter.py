@@ -40,7 +40,9 @@ verbose = int(os.getenv('TESTVERBOSE', '2'))
 sys.modules['board'] = MagicMock()
 sys.modules['displayio'] = MagicMock()
 sys.modules['terminalio'] = MagicMock()
+sys.modules['adafruit_display_text'] = MagicMock()
 sys.modules['adafruit_display_text.label'] = MagicMock()
+sys.modules['adafruit_display_text.bitmap_label'] = MagicMock()
 
 # Replicate CircuitPython's time.monotonic_ns() pre 3.5
 if not hasattr(time, "monotonic_ns"):
@@ -52,7 +54,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 # pylint: disable=wrong-import-position
 # import what we are testing
-from plotter import Plotter
+from plotter import Plotter, MinMaxRing
 
 import terminalio  # mocked
 terminalio.FONT = Mock()
@@ -554,6 +556,92 @@ class Test_Plotter(unittest.TestCase):
 
             plotter.display_off()
 
+    def test_data_add_many_matches_data_add_and_throughput(self):
+        """Check data_add_many() plots exactly what the equivalent data_add()
+           calls do and report throughput of both on three channels."""
+        samples = 4000
+        batch = 16
+        results = []
+        start_ns = time.monotonic_ns()
+        plotter = None
+
+        def sample_clock_ns():
+            # 0.05s per sample plotted so one second buckets complete
+            # inside batches and both paths see the same times
+            return start_ns + (plotter._values * 50_000_000 if plotter else 0)
+
+        with patch('time.monotonic_ns', create=True,
+                   side_effect=sample_clock_ns) as _:
+            for use_many in (False, True):
+                plotter = None
+                plotter = self.make_a_Plotter("lines", "scroll")
+                (tg, plot) = (Mock(), numpy.zeros((self._PLOT_WIDTH, self._PLOT_HEIGHT),
+                                                  numpy.uint8))
+                plotter.display_on(tg_and_plot=(tg, plot))
+                test_triplesource1 = self.make_a_PlotSource(channels=3)
+                self.ready_plot_source(plotter, test_triplesource1)
+                all_data = [test_triplesource1.data() for _ in range(samples)]
+
+                t1 = time.perf_counter()
+                if use_many:
+                    for idx in range(0, samples, batch):
+                        plotter.data_add_many(all_data[idx:idx + batch])
+                else:
+                    for values in all_data:
+                        plotter.data_add(values)
+                t2 = time.perf_counter()
+                ring = plotter._data_buckets
+                results.append((plot.copy(), plotter.y_range,
+                                [list(ypos) for ypos in plotter._data_y_pos],
+                                (ring.count, list(ring._mins), list(ring._maxs),
+                                 ring.minimum(), ring.maximum()),
+                                plotter._plot_lastzoom_ns))
+                if verbose >= 1:
+                    print("\n{}: {:.0f} samples/s".format(
+                        "data_add_many" if use_many else "data_add",
+                        samples / (t2 - t1)))
+                plotter.display_off()
+
+        self.assertEqual(results[0][3][0], plotter._data_stats_maxlen - 1,
+                         "Bucket ring filled")
+        self.assertGreater(results[0][4], 0, "Zoomed at least once")
+        self.assertTrue(numpy.array_equal(results[0][0], results[1][0]),
+                        "Same pixels plotted")
+        self.assertEqual(results[0][1], results[1][1], "Same y range")
+        self.assertEqual(results[0][2], results[1][2], "Same y positions")
+        self.assertEqual(results[0][3], results[1][3], "Same buckets")
+        self.assertEqual(results[0][4], results[1][4], "Same last zoom time")
+
+
+class Test_MinMaxRing(unittest.TestCase):
+    """Tests for the bucket min/max circular buffer used by Plotter."""
+
+    def test_against_brute_force(self):
+        ring = MinMaxRing(9)
+        pushed = []
+        rng = numpy.random.default_rng(1234)
+        for _ in range(200):
+            bucket_min = float(rng.integers(-50, 50))
+            bucket_max = bucket_min + float(rng.integers(0, 20))
+            ring.push(bucket_min, bucket_max)
+            pushed.append((bucket_min, bucket_max))
+            window = pushed[-9:]
+            self.assertEqual(ring.count, len(window))
+            self.assertEqual(ring.minimum(), min(b[0] for b in window))
+            self.assertEqual(ring.maximum(), max(b[1] for b in window))
+            self.assertEqual(ring.recent(7),
+                             (min(b[0] for b in window[-7:]),
+                              max(b[1] for b in window[-7:])))
+
+    def test_empty_and_clear(self):
+        ring = MinMaxRing(4)
+        self.assertEqual(ring.minimum(), Plotter.POS_INF)
+        self.assertEqual(ring.maximum(), Plotter.NEG_INF)
+        ring.push(1.0, 2.0)
+        ring.clear()
+        self.assertEqual(ring.count, 0)
+        self.assertEqual(ring.recent(4), (Plotter.POS_INF, Plotter.NEG_INF))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=verbose)
@@ -16,10 +16,14 @@ class NoteManager:
     """Manages notes, their positions, and related data"""
 
     def __init__(self, start_margin, staff_y_start, line_spacing):
-        self.note_data = []  # List of (x_position, y_position, midi_note, midi_channel)
+        # Notes by (x slot, staff position): (note_tg, ledger_tg, width, height, data)
+        self.notes = {}
+        # Note data per x slot for playback, each (x_position, y_position, midi_note, channel)
+        self.columns = {}
+        # Bumped on every change so playback knows a prepared column is stale
+        self.revision = 0
         self.notes_group = Group()
         self.ledger_lines_group = Group()
-        self.note_to_ledger = {}  # Mapping from note indices to ledger line indices
 
         # Key staff parameters
         self.START_MARGIN = start_margin
@@ -146,86 +150,68 @@ class NoteManager:
 
         return note_bitmap
 
+    @property
+    def note_data(self):
+        """All notes as (x_position, y_position, midi_note, midi_channel), column by column"""
+        return [note for slot in sorted(self.columns) for note in self.columns[slot]]
+
+    @staticmethod
+    def _closest_index(positions, value):
+        """Index of the position nearest value, earliest on a tie"""
+        last = len(positions) - 1
+        # Positions are near evenly spaced, so estimate the index then settle
+        # it against the neighbours (LINE_SPACING // 2 steps alternate when odd)
+        step = (positions[last] - positions[0]) / last if last else 1
+        index = min(max(round((value - positions[0]) / step), 0), last)
+        while index > 0 and abs(value - positions[index - 1]) <= abs(value - positions[index]):
+            index -= 1
+        while index < last and abs(value - positions[index + 1]) < abs(value - positions[index]):
+            index += 1
+        return index
+
     def find_closest_position(self, y):
         """Find the closest valid note position to a given y-coordinate"""
-        closest_pos = 0
-        min_distance = abs(y - self.note_positions[0])
-
-        for i, pos in enumerate(self.note_positions):
-            distance = abs(y - pos)
-            if distance < min_distance:
-                min_distance = distance
-                closest_pos = i
+        return self._closest_index(self.note_positions, y)
 
-        return closest_pos
-
-    def find_closest_x_position(self, x):
-        """Find the closest valid horizontal position"""
+    def find_closest_x_slot(self, x):
+        """Find the index of the closest valid horizontal position"""
         # Only allow positions after the double bar at beginning
         if x < self.START_MARGIN:
-            return self.x_positions[0]  # Return first valid position
-
-        closest_x = self.x_positions[0]
-        min_distance = abs(x - closest_x)
+            return 0  # Return first valid position
+        return self._closest_index(self.x_positions, x)
 
-        for pos in self.x_positions:
-            distance = abs(x - pos)
-            if distance < min_distance:
-                min_distance = distance
-                closest_x = pos
-
-        return closest_x
+    def find_closest_x_position(self, x):
+        """Find the closest valid horizontal position"""
+        return self.x_positions[self.find_closest_x_slot(x)]
 
-    def note_exists_at_position(self, x_pos, y_pos, mario_head, mario_palette):
+    def note_exists_at_position(self, x_pos, y_pos, mario_head=None, mario_palette=None):
         """Check if a note exists at the exact position (for adding new notes)"""
-        # Only check for exact overlap, not proximity
-        for note_tg in self.notes_group:
-            # Check if this is a Mario head note or a regular note
-            is_mario = (hasattr(note_tg.pixel_shader, "_palette") and
-                        len(note_tg.pixel_shader._palette) > 1 and
-                        note_tg.pixel_shader._palette[0] == mario_palette[0])
-
-            if is_mario:
-                note_width = mario_head.width
-                note_height = mario_head.height
-            else:
-                note_width = self.NOTE_WIDTH
-                note_height = self.NOTE_HEIGHT
-
-            note_x = note_tg.x + note_width // 2
-            note_y = note_tg.y + note_height // 2
-
-            # Only prevent notes from being in the exact same position (with a tiny tolerance)
-            if abs(note_x - x_pos) < 2 and abs(note_y - y_pos) < 2:
-                return True
-        return False
-
-    def find_note_at(self, x, y, mario_head, mario_palette):
-        """Check if a note already exists at a position and return its index"""
-        for i, note_tg in enumerate(self.notes_group):
-            # Check if this is a Mario head note or a regular note
-            is_mario = (hasattr(note_tg.pixel_shader, "_palette") and
-                        len(note_tg.pixel_shader._palette) > 1 and
-                        note_tg.pixel_shader._palette[0] == mario_palette[0])
-
-            if is_mario:
-                note_width = mario_head.width
-                note_height = mario_head.height
-            else:
-                note_width = self.NOTE_WIDTH
-                note_height = self.NOTE_HEIGHT
-
-            # Check if the note's center is within a reasonable distance of the cursor
-            note_center_x = note_tg.x + note_width // 2
-            note_center_y = note_tg.y + note_height // 2
-
-            # Use a slightly larger hit box for easier clicking
-            hit_box_width = max(self.NOTE_WIDTH, note_width)
-            hit_box_height = max(self.NOTE_HEIGHT, note_height)
-
-            if (abs(x-note_center_x) < hit_box_width) and (abs(y - note_center_y) < hit_box_height):
-                return i
-        return None
+        # pylint: disable=unused-argument
+        return (self.find_closest_x_slot(x_pos), self.find_closest_position(y_pos)) in self.notes
+
+    def find_note_at(self, x, y, mario_head=None, mario_palette=None):
+        """Check if a note is under a position and return its (x slot, staff position) key"""
+        # pylint: disable=unused-argument
+        # A 16 pixel sprite's hit box reaches at most two cells from the
+        # cell nearest the cursor, so only those need checking
+        slot = self.find_closest_x_slot(x)
+        position = self.find_closest_position(y)
+        found = None
+        closest = None
+        for note_slot in range(max(slot - 2, 0), min(slot + 3, len(self.x_positions))):
+            for note_position in range(max(position - 2, 0),
+                                       min(position + 3, len(self.note_positions))):
+                note = self.notes.get((note_slot, note_position))
+                if note is None:
+                    continue
+                # Use a slightly larger hit box for easier clicking
+                dx = abs(x - self.x_positions[note_slot])
+                dy = abs(y - self.note_positions[note_position])
+                if (dx < max(self.NOTE_WIDTH, note[2]) and dy < max(self.NOTE_HEIGHT, note[3])
+                        and (closest is None or dx + dy < closest)):
+                    found = (note_slot, note_position)
+                    closest = dx + dy
+        return found
 
     def add_note(
         self,
@@ -249,10 +235,11 @@ class NoteManager:
         y_position = self.note_positions[position_index]
 
         # Find the closest valid horizontal position
-        x_position = self.find_closest_x_position(x)
+        x_slot = self.find_closest_x_slot(x)
+        x_position = self.x_positions[x_slot]
 
         # Check if a note already exists at this exact position
-        if self.note_exists_at_position(x_position, y_position, mario_head, mario_palette):
+        if (x_slot, position_index) in self.notes:
             return (False, "Note already exists here")
 
         # Get the corresponding MIDI note number
@@ -289,6 +276,8 @@ class NoteManager:
             note_tg.y = y_position - note_height // 2
         else:  # Other channels use the colored circle
             note_tg = TileGrid(self.note_bitmap, pixel_shader=note_palettes[current_channel])
+            note_width = self.NOTE_WIDTH
+            note_height = self.NOTE_HEIGHT
             note_tg.x = x_position - self.NOTE_WIDTH // 2
             note_tg.y = y_position - self.NOTE_HEIGHT // 2
 
@@ -296,115 +285,53 @@ class NoteManager:
         sound_manager.play_note(midi_note, current_channel)
 
         # Add the note to the notes group
-        note_index = len(self.notes_group)
         self.notes_group.append(note_tg)
 
-        # Store the note data for playback with channel information
-        self.note_data.append((x_position, y_position, midi_note, current_channel))
-
         # Add a ledger line if it's the B3 or C4 below staff
+        ledger_tg = None
         if position_index <= 1:  # B3 or C4
             ledger_tg = TileGrid(self.ledger_bitmap, pixel_shader=self.ledger_palette)
             ledger_tg.x = x_position - self.ledger_line_width // 2
             ledger_tg.y = y_position
-            ledger_index = len(self.ledger_lines_group)
             self.ledger_lines_group.append(ledger_tg)
 
-            # Track association between note and its ledger line
-            self.note_to_ledger[note_index] = ledger_index
+        # Store the note data for playback with channel information
+        data = (x_position, y_position, midi_note, current_channel)
+        self.notes[(x_slot, position_index)] = (note_tg, ledger_tg, note_width, note_height, data)
+        self.columns.setdefault(x_slot, []).append(data)
+        self.revision += 1
 
         note_name = self.note_names[position_index]
         return (True, f"Added: Ch{current_channel+1} {note_name}")
 
-    def erase_note(self, x, y, mario_head, mario_palette, sound_manager=None):
+    def erase_note(self, x, y, mario_head=None, mario_palette=None, sound_manager=None):
         """Erase a note at the clicked position"""
+        # pylint: disable=unused-argument
         # Try to find a note at the click position
-        note_index = self.find_note_at(x, y, mario_head, mario_palette)
-
-        if note_index is not None:
-            # Get the position of the note
-            note_tg = self.notes_group[note_index]
-
-            # Check if this is a Mario head note or a regular note
-            is_mario = (hasattr(note_tg.pixel_shader, "_palette") and
-                        len(note_tg.pixel_shader._palette) > 1 and
-                        note_tg.pixel_shader._palette[0] == mario_palette[0])
-
-            if is_mario:
-                note_width = mario_head.width
-                note_height = mario_head.height
-            else:
-                note_width = self.NOTE_WIDTH
-                note_height = self.NOTE_HEIGHT
-
-            note_x = note_tg.x + note_width // 2
-            note_y = note_tg.y + note_height // 2
-
-            # Find the corresponding note data
-            found_data_index = None
-            # found_channel = None  # Unused variable
-
-            for i, (x_pos, y_pos, _midi_note, _channel) in enumerate(self.note_data):
-                # Increased tolerance for position matching
-                if abs(x_pos - note_x) < 5 and abs(y_pos - note_y) < 5:
-                    found_data_index = i
-                    break
-
-            # If we found the note data and have a sound manager reference
-            if found_data_index is not None and sound_manager is not None:
-                # Extract note data
-                x_pos, y_pos, _midi_note, channel = self.note_data[found_data_index]
-
-                # If this is a sample-based note (channels 0, 1, or 2), stop it
-                if channel in [0, 1, 2]:
-                    sound_manager.stop_sample_at_position(x_pos, y_pos, channel)
-
-                # Remove the note data
-                self.note_data.pop(found_data_index)
-                print(f"Erased note at position ({x_pos}, {y_pos}) ch {channel+1}")
-            else:
-                # Still remove the note data if found (for backward compatibility)
-                if found_data_index is not None:
-                    self.note_data.pop(found_data_index)
-
-            # Check if this note has an associated ledger line
-            if note_index in self.note_to_ledger:
-                ledger_index = self.note_to_ledger[note_index]
-
-                # Remove the ledger line
-                self.ledger_lines_group.pop(ledger_index)
-
-                # Update ledger line mappings after removing a ledger line
-                new_note_to_ledger = {}
-
-                # Process each mapping
-                for n_idx, l_idx in self.note_to_ledger.items():
-                    # Skip the note we're removing
-                    if n_idx != note_index:
-                        # Adjust indices for ledger lines after the removed one
-                        if l_idx > ledger_index:
-                            new_note_to_ledger[n_idx] = l_idx - 1
-                        else:
-                            new_note_to_ledger[n_idx] = l_idx
-
-                self.note_to_ledger = new_note_to_ledger
-
-            # Remove the note
-            self.notes_group.pop(note_index)
-
-            # Update mappings for notes with higher indices
-            new_note_to_ledger = {}
-            for n_idx, l_idx in self.note_to_ledger.items():
-                if n_idx > note_index:
-                    new_note_to_ledger[n_idx - 1] = l_idx
-                else:
-                    new_note_to_ledger[n_idx] = l_idx
-
-            self.note_to_ledger = new_note_to_ledger
-
-            return (True, "Note erased")
-
-        return (False, "No note found at this position")
+        key = self.find_note_at(x, y)
+        if key is None:
+            return (False, "No note found at this position")
+
+        note_tg, ledger_tg, _width, _height, data = self.notes.pop(key)
+        x_pos, y_pos, _midi_note, channel = data
+        column = self.columns[key[0]]
+        column.remove(data)
+        if not column:
+            del self.columns[key[0]]
+        self.revision += 1
+
+        # If this is a sample-based note (channels 0, 1, or 2), stop it
+        if sound_manager is not None:
+            if channel in [0, 1, 2]:
+                sound_manager.stop_sample_at_position(x_pos, y_pos, channel)
+            print(f"Erased note at position ({x_pos}, {y_pos}) ch {channel+1}")
+
+        # Remove the note and its ledger line, if it has one
+        self.notes_group.remove(note_tg)
+        if ledger_tg is not None:
+            self.ledger_lines_group.remove(ledger_tg)
+
+        return (True, "Note erased")
 
     def clear_all_notes(self, sound_manager=None):
         """Clear all notes from the staff"""
@@ -420,6 +347,7 @@ class NoteManager:
         while len(self.ledger_lines_group) > 0:
             self.ledger_lines_group.pop()
 
-        # Clear note data and ledger line mappings
-        self.note_data = []
-        self.note_to_ledger = {}
+        # Clear the note grid
+        self.notes = {}
+        self.columns = {}
+        self.revision += 1
@@ -21,9 +21,17 @@ class PlaybackController:
         # Playback state
         self.is_playing = False
         self.playhead_position = -1
-        self.last_playhead_time = 0
+        self.next_step_time = 0  # When the next eighth note is due, in monotonic time
         self.loop_enabled = False
 
+        # Next step worked out ahead of time: (position, note revision, prepared notes)
+        self.prepared = None
+
+        # Timing jitter: how late each step fired after its beat boundary
+        self.steps_played = 0
+        self.total_lateness = 0
+        self.max_lateness = 0
+
         # UI elements (to be set externally)
         self.playhead = None
         self.play_button = None
@@ -45,7 +53,11 @@ class PlaybackController:
         """Start playback"""
         self.is_playing = True
         self.playhead_position = -1  # Start at -1 so first note plays immediately
-        self.last_playhead_time = time.monotonic()
+        self.next_step_time = time.monotonic()
+        self.prepared = None
+        self.steps_played = 0
+        self.total_lateness = 0
+        self.max_lateness = 0
 
         # Set playhead position to just before the first note
         self.playhead.x = start_margin - 5
@@ -74,6 +86,8 @@ class PlaybackController:
         self.sound_manager.stop_all_notes()
         self.is_playing = False
         self.playhead.x = -10  # Move off-screen
+        self.prepared = None
+        self.report_timing()
 
         # Update button states using bitmaps
         if hasattr(self, 'button_sprites') and self.button_sprites is not None:
@@ -99,45 +113,66 @@ class PlaybackController:
         self.seconds_per_eighth = seconds_per_eighth
         print(f"Playback tempo updated: {60 / (seconds_per_eighth * 2)} BPM")
 
+    def report_timing(self):
+        """Print how closely the played steps kept to the beat"""
+        if self.steps_played:
+            print(f"Playback timing: {self.steps_played} steps, "
+                  f"mean {1000 * self.total_lateness / self.steps_played:.1f} ms late, "
+                  f"max {1000 * self.max_lateness:.1f} ms")
+
+    def _next_position(self, position, x_positions):
+        """The position after this one, or None where playback stops"""
+        position += 1
+        if position >= len(x_positions):
+            return 0 if self.loop_enabled else None
+        return position
+
+    def _prepare(self, position):
+        """Work out the voices for a position ahead of its beat"""
+        notes = self.note_manager.columns.get(position)
+        self.prepared = (position, self.note_manager.revision,
+                         self.sound_manager.prepare_notes_at_position(notes))
+
     def update_playback(self, x_positions):
         """Update playback state and play notes at current position"""
         if not self.is_playing:
             return
 
+        # Steps are due at fixed times from the start, so time spent elsewhere
+        # in the main loop delays a step but never the ones after it
         current_time = time.monotonic()
-        elapsed = current_time - self.last_playhead_time
-
-        # Move at tempo rate
-        if elapsed >= self.seconds_per_eighth:
-            # Stop all current active notes
-            self.sound_manager.stop_all_notes()
-
-            # Move playhead to next eighth note position
-            self.playhead_position += 1
-            self.last_playhead_time = current_time
-
-            # Check if we've reached the end
-            if self.playhead_position >= len(x_positions):
-                if self.loop_enabled:
-                    # Loop back to the beginning
-                    self.playhead_position = 0
-                    self.playhead.x = x_positions[0] - 1
-                else:
-                    # Stop playback if not looping
-                    self.stop_playback()
-                    return
-
-            # Update playhead position
-            self.playhead.x = x_positions[self.playhead_position] - 1
-
-            # Find all notes at current playhead position
-            current_x = x_positions[self.playhead_position]
-            notes_at_position = []
-
-            for x_pos, y_pos, midi_note, channel in self.note_manager.note_data:
-                if abs(x_pos - current_x) < 2:  # Note is at current position
-                    notes_at_position.append((x_pos, y_pos, midi_note, channel))
-
-            # Play all notes at the current position
-            if notes_at_position:
-                self.sound_manager.play_notes_at_position(notes_at_position)
+        if current_time < self.next_step_time:
+            return
+
+        lateness = current_time - self.next_step_time
+        self.steps_played += 1
+        self.total_lateness += lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+        self.next_step_time += self.seconds_per_eighth
+        if self.next_step_time <= current_time:
+            # More than a whole step behind, skip ahead rather than rushing to catch up
+            self.next_step_time = current_time + self.seconds_per_eighth
+
+        # Move playhead to next eighth note position
+        position = self._next_position(self.playhead_position, x_positions)
+        if position is None:
+            # Stop playback if not looping
+            self.stop_playback()
+            return
+        self.playhead_position = position
+
+        # Use the notes prepared last step unless they've changed since
+        if (self.prepared is None or self.prepared[0] != position or
+                self.prepared[1] != self.note_manager.revision):
+            self._prepare(position)
+        self.sound_manager.play_prepared_notes(self.prepared[2])
+
+        # Update playhead position
+        self.playhead.x = x_positions[position] - 1
+
+        # Get the next step ready while waiting for its beat
+        next_position = self._next_position(position, x_positions)
+        if next_position is None:
+            self.prepared = None
+        else:
+            self._prepare(next_position)
@@ -265,6 +265,13 @@ class SoundManager:
             5: [],  # Channel 6
         }
 
+        # Playback synth notes are made once per (channel, midi_note) and reused
+        self.synth_note_cache = {}
+        # Voices and notes sounding from the last playback step
+        self.playback_sample_voices = 0
+        self.playback_synth_notes = []
+        self.playback_midi_notes = []
+
         # Variables for timed release of preview notes
         self.note_release_time = 0
         self.note_to_release = None
@@ -294,95 +301,90 @@ class SoundManager:
 
     def play_notes_at_position(self, notes_data):
         """Play all notes at a specific position simultaneously"""
-        # Stop all sample voices first
-        for i in range(5):  # Use first 5 voices for WAV samples (0-4)
-            self.mixer.voice[i].stop()
-            self.active_voices[i] = False
+        self.play_prepared_notes(self.prepare_notes_at_position(notes_data))
 
-        # Clear the position to voice mapping
-        self.position_to_voice = {}
-        self.playback_voice_mapping = {}
+    def _playback_synth_note(self, midi_note, channel):
+        """Get the reusable synthio note for a playback channel and MIDI note"""
+        key = (channel, midi_note)
+        note = self.synth_note_cache.get(key)
+        if note is None:
+            note = synthio.Note(
+                440 * math.pow(2, (midi_note - 69) / 12),
+                waveform=self.channel_waveforms.get(channel, self.wave_sine),
+                amplitude=self.channel_amplitudes.get(channel, 1.0)
+            )
+            self.synth_note_cache[key] = note
+        return note
 
+    def prepare_notes_at_position(self, notes_data):
+        """Work out the samples, voices and notes for a position ahead of time,
+        so play_prepared_notes() has as little as possible to do on the beat"""
         # Group notes by channel type
         sample_notes = {
             0: [],  # Channel 1 (Lars WAV samples)
             1: [],  # Channel 2 (Heart WAV samples)
             2: []   # Channel 3 (Drum WAV samples)
         }
-
-        # Synthio channels (4-6)
-        synth_notes = {
-            3: [],  # Channel 4 (Sine wave)
-            4: [],  # Channel 5 (Triangle wave)
-            5: [],  # Channel 6 (Sawtooth wave)
-        }
-
+        synth_notes = []  # Channels 4-6 (synthio)
         midi_notes = {}    # Other channels (MIDI)
 
-        for x_pos, y_pos, note_val, channel in notes_data:
+        for x_pos, y_pos, note_val, channel in notes_data or ():
             if channel in [0, 1, 2]:  # Sample-based channels
                 sample_notes[channel].append((x_pos, y_pos, note_val))
             elif channel in [3, 4, 5]:  # Synthio channels
-                synth_notes[channel].append(note_val)
+                synth_notes.append(self._playback_synth_note(note_val, channel))
             else:  # Other channels (MIDI)
                 midi_notes[note_val] = channel
 
         # Voice allocation - we have 5 voices to distribute among sample notes
-        remaining_voices = 5
-        voice_index = 0
-
-        # Play sample notes for channels 1-3
+        total_notes = sum(len(notes) for notes in sample_notes.values())
+        volume_factor = 0.9 if total_notes <= 3 else 0.7 if total_notes <= 6 else 0.5
+        samples = []  # (sample, level, x_pos, y_pos, channel), one per voice
+        sample_sets = (self.samples, self.heart_samples, self.drum_samples)
         for channel, notes in sample_notes.items():
             for x_pos, y_pos, midi_note in notes:
-                if remaining_voices <= 0:
+                if len(samples) >= 5:
                     print(f"Warning: No more voices available for channel {channel+1}")
                     break
-
-                # Get the appropriate sample set
-                sample_set = None
-                if channel == 0:
-                    sample_set = self.samples
-                elif channel == 1:
-                    sample_set = self.heart_samples
-                elif channel == 2:
-                    sample_set = self.drum_samples
-
                 # Find the closest sample
+                sample_set = sample_sets[channel]
                 closest_note = min(sample_set.keys(), key=lambda x: abs(x - midi_note))
-                sample = sample_set[closest_note]
-
-                # Play the sample
-                self.mixer.voice[voice_index].play(sample, loop=False)
-                self.active_voices[voice_index] = True
-
-                # Store the position to voice mapping
-                position_key = (x_pos, y_pos)
-                self.position_to_voice[position_key] = voice_index
-                self.playback_voice_mapping[(x_pos, y_pos, channel)] = voice_index
+                samples.append((sample_set[closest_note], 0.7 * volume_factor,
+                                x_pos, y_pos, channel))
 
-                # Adjust volume
-                total_notes = sum(len(notes) for notes in sample_notes.values())
-                volume_factor = 0.9 if total_notes <= 3 else 0.7 if total_notes <= 6 else 0.5
-                self.mixer.voice[voice_index].level = 0.7 * volume_factor
+        return samples, synth_notes, list(midi_notes.items())
 
-                voice_index += 1
-                remaining_voices -= 1
+    def play_prepared_notes(self, prepared):
+        """Play notes from prepare_notes_at_position(), reusing the voices and
+        synth notes still sounding from the previous step"""
+        samples, synth_notes, midi_notes = prepared
 
-            # Log what we're playing
-            # Channel names commented out as it was unused
-            # channel_names = ["Lars", "Heart", "Drum"]
-            # print(f"Playing {channel_names[channel]} sample {closest_note} for note {midi_note}")
+        # Playing a voice restarts it, so only the leftover voices need stopping
+        self.position_to_voice = {}
+        self.playback_voice_mapping = {}
+        for voice_index, (sample, level, x_pos, y_pos, channel) in enumerate(samples):
+            voice = self.mixer.voice[voice_index]
+            voice.play(sample, loop=False)
+            voice.level = level
+            self.active_voices[voice_index] = True
+            self.position_to_voice[(x_pos, y_pos)] = voice_index
+            self.playback_voice_mapping[(x_pos, y_pos, channel)] = voice_index
+        for voice_index in range(len(samples), self.playback_sample_voices):
+            self.mixer.voice[voice_index].stop()
+            self.active_voices[voice_index] = False
+        self.playback_sample_voices = len(samples)
 
-        # Play synth notes for each channel (4-6)
+        # Swap the synth notes over in one go
         self.preview_mode = False
-        for channel, notes in synth_notes.items():
-            for note in notes:
-                self.play_synth_note(note, channel)
+        if synth_notes or self.playback_synth_notes:
+            self.synth.change(release=self.playback_synth_notes, press=synth_notes)
+        self.playback_synth_notes = synth_notes
 
-        # Play MIDI notes
-        for midi_note, channel in midi_notes.items():
+        for midi_note, channel in self.playback_midi_notes:
+            self.midi.send(NoteOff(midi_note, 0), channel=channel)
+        for midi_note, channel in midi_notes:
             self.midi.send(NoteOn(midi_note, 100), channel=channel)
-            self.active_notes[midi_note] = channel
+        self.playback_midi_notes = midi_notes
 
     def play_multi_sample(self, midi_note, channel=0):
         """Play the most appropriate sample for the given MIDI note"""
@@ -548,8 +550,18 @@ class SoundManager:
         self.position_to_voice = {}
         self.playback_voice_mapping = {}
 
+        # Stop all playback notes
+        for midi_note, channel in self.playback_midi_notes:
+            self.midi.send(NoteOff(midi_note, 0), channel=channel)
+        self.playback_midi_notes = []
+        self.playback_sample_voices = 0
+
         # Stop all synth notes
         try:
+            if self.playback_synth_notes:
+                self.synth.release(self.playback_synth_notes)
+                self.playback_synth_notes = []
+
             # Release notes from all channels
             for channel, notes in self.active_synth_notes.items():
                 for note in notes:
@@ -571,6 +583,7 @@ class SoundManager:
                 self.mixer.voice[5].play(self.synth)
 
                 # Reset all active notes
+                self.playback_synth_notes = []
                 self.active_synth_notes = {
                     3: [],  # Channel 4
                     4: [],  # Channel 5
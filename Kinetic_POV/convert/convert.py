@@ -8,10 +8,28 @@
 #
 # $ python convert.py image1.gif image2.png > graphics.h
 #
+# A directory may be given in place of (or alongside) image files, in which
+# case every image within it is converted.  Images are decoded and analyzed
+# in parallel worker processes, e.g. to build one header from a whole folder
+# of assets using 4 processes:
+#
+# $ python convert.py -j 4 -o graphics.h assets/
+#
+# With --cache DIR, each image's quantized palette, packed pixels and
+# per-column current profile are stored in DIR keyed by a hash of the file
+# contents (and the current/gamma settings below), so unchanged images are
+# not decoded or re-quantized on the next run.  --report prints each
+# image's peak and average column current and the brightness it will be
+# shown at, without generating any C output:
+#
+# $ python convert.py --cache .povcache --report assets/
+#
 # Ideal image dimensions are determined by hardware setup, e.g. LED poi
 # project uses 16 LEDs, so image height should match.  Width is limited
 # by AVR PROGMEM capacity -- very limited on Trinket!
 #
+# Requires NumPy and Pillow (pip install numpy pillow).
+#
 # Adafruit invests time and resources providing this open source code,
 # please support Adafruit and open-source hardware by purchasing
 # products from Adafruit!
@@ -21,8 +39,15 @@
 # See 'COPYING' file for additional notes.
 # --------------------------------------------------------------------------
 
-from PIL import Image
+import argparse
+import functools
+import hashlib
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
 
 # Establish peak and average current limits - a function of battery
 # capacity and desired run time.
@@ -37,11 +62,11 @@ mcuCurrent     = 20   # Est. current used by microcontrolled board (mA)
 wireLimit      = 1500 # Ampacity of battery wires (est 26 gauge) (milliamps)
 
 # Estimate average and peak LED currents, within some safety thresholds:
-if(runTime < 1.0): runTime = 1.0        # Don't exceed 1C rate from battery
+runTime = max(runTime, 1.0)             # Don't exceed 1C rate from battery
 cl = batterySize - mcuCurrent * runTime # After MCU, charge left for LEDs
-if cl < 0: cl = 0                       # Must be non-negative
+cl = max(cl, 0)                         # Must be non-negative
 avgC = cl / runTime / parallelStrips
-if avgC > wireLimit: avgC = wireLimit   # Don't exceed battery wire ampacity
+avgC = min(avgC, wireLimit)             # Don't exceed battery wire ampacity
 peakC = avgC * 2.2                      # Battery+wires OK w/brief peaks
 
 bR    = 1.0       # Can adjust
@@ -55,293 +80,330 @@ mAR   = 15.2 * bR # + current for 100% red
 mAG   =  8.7 * bG # + current for 100% green
 mAB   =  8.0 * bB # + current for 100% blue
 
-# --------------------------------------------------------------------------
+# File types picked up when a directory is passed on the command line
+IMAGE_EXTENSIONS = ('.bmp', '.gif', '.jpg', '.jpeg', '.png', '.tif', '.tiff')
 
-cols     = 0 # Current column number in output
-byteNum  = 0
-numBytes = 0
-
-def writeByte(n):
-	global cols, byteNum, numBytes
-
-	cols += 1                      # Increment column #
-	if cols >= 8:                  # If max column exceeded...
-		print                  # end current line
-		sys.stdout.write("  ") # and start new one
-		cols = 0               # Reset counter
-	sys.stdout.write("{0:#0{1}X}".format(n, 4))
-	byteNum += 1
-	if byteNum < numBytes:
-		sys.stdout.write(",")
-		if cols < 7:
-			sys.stdout.write(" ")
+# Bump this if load_image() output changes, to invalidate cached results
+CACHE_VERSION = 1
 
 # --------------------------------------------------------------------------
 
-numLEDs = 0
-images  = []
-
-# Initial pass loads each image & tracks tallest size overall
-
-for name in sys.argv[1:]: # For each image passed to script...
-	image        = Image.open(name)
-	image.pixels = image.load()
-	# Determine if image is truecolor vs. colormapped.
-	image.colors = image.getcolors(256)
-	if image.colors == None:
-		image.numColors = 257 # Image is truecolor
-	else:
-		# If 256 colors or less, that doesn't necessarily mean
-		# it's a non-truecolor image yet, just that it has few
-		# colors.  Check the image type and if it's truecolor or
-		# similar, convert the image to a paletted mode so it can
-		# be more efficiently stored.  Since there are few colors,
-		# this operation is lossless.
-		if (image.mode != '1' and image.mode != 'L' and
-		  image.mode != 'P'):
-			image = image.convert("P", palette="ADAPTIVE")
-			image.pixels = image.load()
-			image.colors = image.getcolors(256)
-		# image.colors is an unsorted list of tuples where each
-		# item is a pixel count and a color palette index.
-		# Unused palette indices (0 pixels) are not in list,
-		# so its length tells us the unique color count...
-		image.numColors = len(image.colors)
-		# The image & palette aren't necessarily optimally packed,
-		# e.g. might have a 216-color 'web safe' palette but only
-		# use a handful of colors.  In order to reduce the palette
-		# storage requirements, only the colors in use will be
-		# output.  The pixel indices in the image must be remapped
-		# to this new palette sequence...
-		remap = [0] * 256
-		for c in range(image.numColors): # For each color used...
-			# The original color index (image.colors[c][1])
-			# is reassigned to a sequential 'packed' index (c):
-			remap[image.colors[c][1]] = c
-		# Every pixel in image is then remapped through this table:
-		for y in range(image.size[1]):
-			for x in range(image.size[0]):
-				image.pixels[x, y] = remap[image.pixels[x, y]]
-		# The color palette associated with the image is still in
-		# its unpacked/unoptimal order; image pixel values no longer
-		# point to correct entries.  This is OK and we'll compensate
-		# for it later in the code.
-	image.name = name
-	image.bph  = image.size[1] # Byte-padded height (tweaked below)
-	images.append(image)
-
-	# 1- and 4-bit images are padded to the next byte boundary.
-	# Image size not fully validated - on purpose - in case of quick
-	# test with an existing (but non-optimal) file.  If too big or too
-	# small for the LED strip, just wastes some PROGMEM space or some
-	# LEDs will be lit wrong, usually no biggie.
-	if image.numColors <= 2:    # 1 bit/pixel, use 8-pixel blocks
-		if image.bph & 7: image.bph += 8 - (image.bph & 7)
-	elif image.numColors <= 16: # 4 bits/pixel, use 2-pixel blocks
-		if image.bph & 1: image.bph += 1
-
-	if image.bph > numLEDs: numLEDs = image.bph
-
-print ("// Don't edit this file!  It's software-generated.")
-print ("// See convert.py script instead.")
-print()
-print ("#define PALETTE1  0")
-print ("#define PALETTE4  1")
-print ("#define PALETTE8  2")
-print ("#define TRUECOLOR 3")
-print()
-print ("#define NUM_LEDS %d" % numLEDs)
-print()
-
-# Second pass estimates current of each column, then peak & overall average
-
-for imgNum, image in enumerate(images): # For each image in list...
-	sys.stdout.write("// %s%s\n\n" % (image.name,
-	  ' '.ljust(73 - len(image.name),'-')))
-	if image.numColors <= 256:
-		# Palette optimization requires some weird shenanigans...
-		# first, make a duplicate image where width=image.numColors
-		# and height=1.  This will have the same color palette as
-		# the original image, which may contain many unused entries.
-		lut = image.resize((image.numColors, 1))
-		lut.pixels = lut.load()
-		# The image.colors[] list contains the original palette
-		# indices of the colors actually in use.  Draw one pixel
-		# into the 'lut' image for each color index in use, in the
-		# order they appear in the color list...
-		for x in range(image.numColors):
-			lut.pixels[x, 0] = image.colors[x][1]
-		# ...then convert the lut image to RGB format to provide a
-		# list of (R,G,B) values representing the packed color list.
-		lut = list(lut.convert("RGB").getdata())
-
-		# Estimate current for each element of palette:
-		paletteCurrent = []
-		for i in range(image.numColors):
-			paletteCurrent.append(mA0 +
-			  pow((lut[i][0] / 255.0), gamma) * mAR +
-			  pow((lut[i][1] / 255.0), gamma) * mAG +
-			  pow((lut[i][2] / 255.0), gamma) * mAB)
-
-	# Estimate peak and average current for each column of image
-	colMaxC = 0.0 # Maximum column current
-	colAvgC = 0.0 # Average column current
-	for x in range(image.size[0]): # For each row...
-		mA = 0.0 # Sum current of each pixel's palette entry
-		for y in range(image.size[1]):
-			if image.numColors <= 256:
-				mA += paletteCurrent[image.pixels[x, y]]
-			else:
-				mA += (mA0 +
-				  pow((image.pixels[x, y][0] / 255.0),
-				  gamma) * mAR +
-				  pow((image.pixels[x, y][1] / 255.0),
-				  gamma) * mAG +
-				  pow((image.pixels[x, y][2] / 255.0),
-				  gamma) * mAB)
-		colAvgC += mA                 # Accumulate average (div later)
-		if mA > colMaxC: colMaxC = mA # Monitor peak
-	colAvgC /= image.size[0] # Sum div into average
-
-	s1 = peakC / colMaxC   # Scaling factor for peak current constraint
-	s2 = avgC  / colAvgC   # Scaling factor for average current constraint
-	if s2 < s1:  s1 = s2   # Use smaller of two (so both constraints met),
-	if s1 > 1.0: s1 = 1.0  # but never increase brightness
-
-	s1 *= 255.0   # (0.0-1.0) -> (0.0-255.0)
-	bR1 = bR * s1 # Scale color balance values
-	bG1 = bG * s1
-	bB1 = bB * s1
-
-	p        = 0 # Current pixel number in image
-	cols     = 7 # Force wrap on 1st output
-	byteNum  = 0
-
-	if image.numColors <= 256:
-		# Output gamma- and brightness-adjusted color palette:
-		print ("const uint8_t PROGMEM palette%02d[][3] = {" % imgNum)
-		for i in range(image.numColors):
-			sys.stdout.write("  { %3d, %3d, %3d }" % (
-			  int(pow((lut[i][0]/255.0),gamma)*bR1+0.5),
-			  int(pow((lut[i][1]/255.0),gamma)*bG1+0.5),
-			  int(pow((lut[i][2]/255.0),gamma)*bB1+0.5)))
-			if i < (image.numColors - 1): print (",")
-		print (" };")
-		print()
-
-		sys.stdout.write(
-		  "const uint8_t PROGMEM pixels%02d[] = {" % imgNum)
-
-		if image.numColors <= 2:
-			numBytes = image.size[0] * numLEDs / 8
-		elif image.numColors <= 16:
-			numBytes = image.size[0] * numLEDs / 2
-		elif image.numColors <= 256:
-			numBytes = image.size[0] * numLEDs
-		else:
-			numBytes = image.size[0] * numLEDs * 3
-
-		for x in range(image.size[0]):
-			if image.numColors <= 2:
-				for y in range(0, numLEDs, 8):
-					sum = 0
-					for bit in range(8):
-						y1 = y + bit
-						if y1 < image.size[1]:
-							sum += (
-							  image.pixels[x,
-							  y1] << bit)
-					writeByte(sum)
-			elif image.numColors <= 16:
-				for y in range(0, numLEDs, 2):
-					if y < image.size[1]:
-						p1 = image.pixels[x, y]
-					else:
-						p1 = 0
-					if (y + 1) < image.size[1]:
-						p2 = image.pixels[x, y + 1]
-					else:
-						p2 = 0
-					writeByte(p1 * 16 + p2)
-			elif image.numColors <= 256:
-				for y in range(numLEDs):
-					if y < image.size[1]:
-						writeByte(image.pixels[x, y])
-					else:
-						writeByte(0)
-			else:
-				for y in range(numLEDs):
-					if y < image.size[1]:
-						writeByte(image.pixels[x, y][0])
-						writeByte(image.pixels[x, y][1])
-						writeByte(image.pixels[x, y][2])
-					else:
-						writeByte(0)
-						writeByte(0)
-						writeByte(0)
-
-	else:
-		# Perform gamma- and brightness-adjustment on pixel data
-		sys.stdout.write(
-		  "const uint8_t PROGMEM pixels%02d[] = {" % imgNum)
-		numBytes = image.size[0] * numLEDs * 3
-
-		for x in range(image.size[0]):
-			for y in range(numLEDs):
-				if y < image.size[1]:
-					writeByte(int(pow((
-					  image.pixels[x, y][0] / 255.0),
-					  gamma) * bR1 + 0.5))
-					writeByte(int(pow((
-					  image.pixels[x, y][1] / 255.0),
-					  gamma) * bG1 + 0.5))
-					writeByte(int(pow((
-					  image.pixels[x, y][2] / 255.0),
-					  gamma) * bB1 + 0.5))
-				else:
-					writeByte(0)
-					writeByte(0)
-					writeByte(0)
-
-	print (" };") # end pixels[] array
-	print()
-
-# Last pass, print table of images...
-
-print ("typedef struct {")
-print ("  uint8_t        type;    // PALETTE[1,4,8] or TRUECOLOR")
-print ("  line_t         lines;   // Length of image (in scanlines")
-print ("  const uint8_t *palette; // -> PROGMEM color table (NULL if truecolor")
-print ("  const uint8_t *pixels;  // -> Pixel data in PROGMEM")
-print ("} image;")
-print()
-print ("const image PROGMEM images[] = {")
-
-for imgNum, image in enumerate(images): # For each image in list...
-	sys.stdout.write("  { ")
-	if image.numColors <= 2:
-		sys.stdout.write("PALETTE1 , ")
-	elif image.numColors <= 16:
-		sys.stdout.write("PALETTE4 , ")
-	elif image.numColors <= 256:
-		sys.stdout.write("PALETTE8 , ")
-	else:
-		sys.stdout.write("TRUECOLOR, ")
-
-	sys.stdout.write(" %3d, " % image.size[0])
-
-	if image.numColors <= 256:
-		sys.stdout.write("(const uint8_t *)palette%02d, " % imgNum)
-	else:
-		sys.stdout.write("NULL                      , ")
-
-	sys.stdout.write("pixels%02d }" % imgNum)
-
-	if imgNum < len(images) - 1:
-		print(",")
-	else:
-		print
-
-print ("};")
-print()
-print ("#define NUM_IMAGES (sizeof(images) / sizeof(images[0]))")
+# 256-entry lookup tables replace per-pixel pow() math.  GAMMA_LUT maps an
+# 8-bit component to 0.0-1.0 linear intensity; the current tables map it to
+# the milliamps drawn by that component of one LED.
+GAMMA_LUT = np.power(np.arange(256) / 255.0, gamma)
+CURRENT_LUT = np.stack((GAMMA_LUT * mAR, GAMMA_LUT * mAG, GAMMA_LUT * mAB))
+
+# Preformatted output token for every byte value
+HEX_TOKENS = np.array(["{0:#0{1}X}".format(n, 4) for n in range(256)])
+
+PALETTE1, PALETTE4, PALETTE8, TRUECOLOR = range(4)
+TYPE_NAMES = ("PALETTE1 ", "PALETTE4 ", "PALETTE8 ", "TRUECOLOR")
+
+
+def image_type(num_colors):
+    """Map a unique color count (257 = truecolor) to an output type."""
+    if num_colors <= 2:
+        return PALETTE1
+    if num_colors <= 16:
+        return PALETTE4
+    if num_colors <= 256:
+        return PALETTE8
+    return TRUECOLOR
+
+
+def load_image(name):
+    """Load and analyze one image file.  Returns a dict holding the packed
+    pixel array (palette indices, or RGB if truecolor), the packed RGB
+    palette (None if truecolor), byte-padded height and the estimated LED
+    current of each column.  Runs in a worker process in batch mode, so
+    everything returned is plain data."""
+    image = Image.open(name)
+    # Determine if image is truecolor vs. colormapped.
+    colors = image.getcolors(256)
+    if colors is None:
+        # Image is truecolor
+        pixels = np.asarray(image.convert("RGB"))
+        palette = None
+        num_colors = 257
+        column_current = (mA0 * pixels.shape[0] +
+                          CURRENT_LUT[0][pixels[..., 0]].sum(axis=0) +
+                          CURRENT_LUT[1][pixels[..., 1]].sum(axis=0) +
+                          CURRENT_LUT[2][pixels[..., 2]].sum(axis=0))
+    else:
+        # If 256 colors or less, that doesn't necessarily mean it's a
+        # non-truecolor image yet, just that it has few colors.  Convert
+        # truecolor-like modes to a paletted mode so it can be more
+        # efficiently stored.  Since there are few colors, this operation
+        # is lossless.
+        if image.mode == '1':
+            image = image.convert('L') # 0/255 either way, as a byte array
+        elif image.mode not in ('L', 'P'):
+            image = image.convert("P", palette="ADAPTIVE")
+            colors = image.getcolors(256)
+        # colors is an unsorted list of (pixel count, color index) tuples.
+        # Unused indices (0 pixels) are not in list, so its length tells
+        # us the unique color count.  Only the colors in use are output,
+        # so the pixel indices are remapped to this packed sequence...
+        num_colors = len(colors)
+        used = np.array([c[1] for c in colors], dtype=np.uint8)
+        remap = np.zeros(256, dtype=np.uint8)
+        remap[used] = np.arange(num_colors, dtype=np.uint8)
+        pixels = remap[np.asarray(image)]
+        # ...and the palette is reduced to the same packed order.
+        lut = Image.new(image.mode, (num_colors, 1))
+        if image.mode == 'P':
+            lut.putpalette(image.getpalette())
+        lut.frombytes(used.tobytes())
+        palette = np.asarray(lut.convert("RGB"))[0]
+        # Estimate current for each element of palette, then each column
+        palette_current = (mA0 + CURRENT_LUT[0][palette[:, 0]] +
+                           CURRENT_LUT[1][palette[:, 1]] +
+                           CURRENT_LUT[2][palette[:, 2]])
+        column_current = palette_current[pixels].sum(axis=0)
+
+    # 1- and 4-bit images are padded to the next byte boundary.
+    # Image size not fully validated - on purpose - in case of quick
+    # test with an existing (but non-optimal) file.  If too big or too
+    # small for the LED strip, just wastes some PROGMEM space or some
+    # LEDs will be lit wrong, usually no biggie.
+    bph = pixels.shape[0] # Byte-padded height
+    if num_colors <= 2:    # 1 bit/pixel, use 8-pixel blocks
+        bph = (bph + 7) & ~7
+    elif num_colors <= 16: # 4 bits/pixel, use 2-pixel blocks
+        bph = (bph + 1) & ~1
+
+    return {
+        "name": name,
+        "width": pixels.shape[1],
+        "height": pixels.shape[0],
+        "bph": bph,
+        "num_colors": num_colors,
+        "pixels": pixels,
+        "palette": palette,
+        "column_current": column_current,
+    }
+
+
+def cache_key(name):
+    """Hash of an image file's contents plus every setting that affects
+    load_image() results."""
+    digest = hashlib.sha1(repr((CACHE_VERSION, gamma, mA0, mAR, mAG,
+                                mAB)).encode())
+    with open(name, "rb") as f:
+        for block in iter(functools.partial(f.read, 1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cached(name, cache_dir=None):
+    """load_image() through an on-disk cache of .npz files in cache_dir.
+    Unchanged images are read back from the cache instead of being decoded
+    and quantized again.  With no cache_dir, just calls load_image()."""
+    if not cache_dir:
+        return load_image(name)
+    path = os.path.join(cache_dir, cache_key(name) + ".npz")
+    try:
+        with np.load(path) as data:
+            info = {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        info = None
+    if info is not None:
+        for key in ("width", "height", "bph", "num_colors"):
+            info[key] = int(info[key])
+        if info["num_colors"] > 256:
+            info["palette"] = None
+        info["name"] = name
+        return info
+
+    info = load_image(name)
+    os.makedirs(cache_dir, exist_ok=True)
+    data = {key: value for key, value in info.items()
+            if key != "name" and value is not None}
+    # Write to a temporary file and rename, so a concurrent or interrupted
+    # run never sees a partial cache entry
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "wb") as f:
+        np.savez(f, **data)
+    os.replace(tmp, path)
+    return info
+
+
+def brightness_scale(column_current):
+    """Return the 0.0-1.0 brightness scale that keeps an image's peak and
+    average column current within the battery limits."""
+    col_max = column_current.max() if column_current.size else 0.0
+    col_avg = column_current.mean() if column_current.size else 0.0
+    s1 = peakC / col_max if col_max > 0 else 1.0 # Peak current constraint
+    s2 = avgC / col_avg if col_avg > 0 else 1.0  # Average current constraint
+    # Use smaller of two (so both constraints met), but never increase
+    # brightness
+    return min(s1, s2, 1.0)
+
+
+def gamma_tables(scale):
+    """Gamma- and brightness-adjusted 8-bit output LUT for each channel."""
+    s = scale * 255.0 # (0.0-1.0) -> (0.0-255.0)
+    return [(GAMMA_LUT * (b * s) + 0.5).astype(np.uint8) for b in (bR, bG, bB)]
+
+
+def pack_pixels(info, num_leds):
+    """Return the PROGMEM pixel bytes for one image as a flat uint8 array,
+    column-major with each column padded to num_leds pixels."""
+    kind = image_type(info["num_colors"])
+    pixels = info["pixels"]
+    height, width = info["height"], info["width"]
+    if kind == TRUECOLOR:
+        luts = gamma_tables(brightness_scale(info["column_current"]))
+        columns = np.zeros((width, num_leds, 3), dtype=np.uint8)
+        for c in range(3):
+            columns[:, :height, c] = luts[c][pixels[..., c]].T
+        return columns.ravel()
+    # Pad each column up to a whole number of output bytes
+    per_byte = {PALETTE1: 8, PALETTE4: 2, PALETTE8: 1}[kind]
+    rows = -(-num_leds // per_byte) * per_byte
+    columns = np.zeros((width, rows), dtype=np.uint8)
+    columns[:, :height] = pixels.T
+    if kind == PALETTE1:
+        # LSB is topmost pixel of each 8-pixel block
+        return np.packbits(columns.reshape(width, -1, 8), axis=2,
+                           bitorder='little').ravel()
+    if kind == PALETTE4:
+        # High nybble is topmost pixel of each pair
+        return (columns[:, 0::2] * 16 + columns[:, 1::2]).ravel()
+    return columns.ravel()
+
+
+def format_bytes(data):
+    """Format a uint8 array as the body of a C array, 8 values per line."""
+    tokens = HEX_TOKENS[data].tolist()
+    lines = [", ".join(tokens[i:i + 8]) for i in range(0, len(tokens), 8)]
+    return "\n  " + ",\n  ".join(lines)
+
+
+def format_image(args):
+    """Generate the palette and pixel tables for one image as a string."""
+    img_num, info, num_leds = args
+    name = info["name"]
+    out = ["// %s%s\n\n" % (name, ' '.ljust(73 - len(name), '-'))]
+    if info["num_colors"] <= 256:
+        # Output gamma- and brightness-adjusted color palette:
+        luts = gamma_tables(brightness_scale(info["column_current"]))
+        palette = info["palette"]
+        out.append("const uint8_t PROGMEM palette%02d[][3] = {\n" % img_num)
+        out.append(",\n".join("  { %3d, %3d, %3d }" % (r, g, b) for r, g, b in
+                              zip(luts[0][palette[:, 0]].tolist(),
+                                  luts[1][palette[:, 1]].tolist(),
+                                  luts[2][palette[:, 2]].tolist())))
+        out.append(" };\n\n")
+    out.append("const uint8_t PROGMEM pixels%02d[] = {" % img_num)
+    out.append(format_bytes(pack_pixels(info, num_leds)))
+    out.append(" };\n\n") # end pixels[] array
+    return "".join(out)
+
+
+def expand_paths(paths):
+    """Expand any directories in the argument list to the image files
+    within them, sorted by name."""
+    names = []
+    for path in paths:
+        if os.path.isdir(path):
+            names.extend(sorted(
+                os.path.join(path, f) for f in os.listdir(path)
+                if f.lower().endswith(IMAGE_EXTENSIONS)))
+        else:
+            names.append(path)
+    return names
+
+
+def write_header(images, out, pool_map=map):
+    """Write the complete graphics header for a list of analyzed images."""
+    num_leds = max((info["bph"] for info in images), default=0)
+
+    out.write("// Don't edit this file!  It's software-generated.\n")
+    out.write("// See convert.py script instead.\n\n")
+    out.write("#define PALETTE1  0\n")
+    out.write("#define PALETTE4  1\n")
+    out.write("#define PALETTE8  2\n")
+    out.write("#define TRUECOLOR 3\n\n")
+    out.write("#define NUM_LEDS %d\n\n" % num_leds)
+
+    jobs = [(img_num, info, num_leds) for img_num, info in enumerate(images)]
+    for text in pool_map(format_image, jobs):
+        out.write(text)
+
+    # Last pass, print table of images...
+    out.write("typedef struct {\n")
+    out.write("  uint8_t        type;    // PALETTE[1,4,8] or TRUECOLOR\n")
+    out.write("  line_t         lines;   // Length of image (in scanlines)\n")
+    out.write("  const uint8_t *palette; "
+              "// -> PROGMEM color table (NULL if truecolor)\n")
+    out.write("  const uint8_t *pixels;  // -> Pixel data in PROGMEM\n")
+    out.write("} image;\n\n")
+    out.write("const image PROGMEM images[] = {\n")
+    entries = []
+    for img_num, info in enumerate(images):
+        if info["num_colors"] <= 256:
+            palette = "(const uint8_t *)palette%02d, " % img_num
+        else:
+            palette = "NULL                      , "
+        entries.append("  { %s,  %3d, %spixels%02d }" % (
+            TYPE_NAMES[image_type(info["num_colors"])], info["width"],
+            palette, img_num))
+    out.write(",\n".join(entries))
+    out.write("\n};\n\n")
+    out.write("#define NUM_IMAGES (sizeof(images) / sizeof(images[0]))\n")
+
+
+def write_report(images, out):
+    """Write each image's estimated per-strip column current and the
+    brightness it is scaled to in order to meet the battery limits."""
+    out.write("Limits: %.1f mA peak, %.1f mA average per strip\n\n" %
+              (peakC, avgC))
+    out.write("%-32s %-9s %5s %6s %9s %9s %7s\n" % (
+        "Image", "Type", "Width", "Colors", "Peak mA", "Avg mA", "Bright"))
+    for info in images:
+        column_current = info["column_current"]
+        out.write("%-32s %-9s %5d %6s %9.1f %9.1f %6.1f%%\n" % (
+            info["name"], TYPE_NAMES[image_type(info["num_colors"])].strip(),
+            info["width"],
+            info["num_colors"] if info["num_colors"] <= 256 else "-",
+            column_current.max() if column_current.size else 0.0,
+            column_current.mean() if column_current.size else 0.0,
+            brightness_scale(column_current) * 100.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert images to POV LED graphics tables.")
+    parser.add_argument("images", nargs="+",
+                        help="image files and/or directories of images")
+    parser.add_argument("-o", "--output", type=argparse.FileType("w"),
+                        default=sys.stdout, help="header file to write (default: stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: all CPUs)")
+    parser.add_argument("--cache", metavar="DIR",
+                        help="directory for cached image analysis results")
+    parser.add_argument("--report", action="store_true",
+                        help="print current/brightness per image, no C output")
+    args = parser.parse_args()
+
+    names = expand_paths(args.images)
+    load = functools.partial(load_cached, cache_dir=args.cache)
+    if args.jobs > 1 and len(names) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            images = list(pool.map(load, names))
+            if args.report:
+                write_report(images, args.output)
+            else:
+                write_header(images, args.output, pool.map)
+    else:
+        images = [load(name) for name in names]
+        if args.report:
+            write_report(images, args.output)
+        else:
+            write_header(images, args.output)
+
+
+if __name__ == "__main__":
+    main()
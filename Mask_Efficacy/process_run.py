@@ -2,57 +2,132 @@
 #
 # SPDX-License-Identifier: MIT
 
+import argparse
+import glob
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 import imageio
-from skimage.color import rgb2gray
 import matplotlib.pyplot as plt
 import numpy as np
 
 THRESH = 0.3
+CHUNK_FRAMES = 100
 
-RUN = int(input('Enter run number: '))
+# Integer luma, same weights as skimage rgb2gray scaled by 256, so
+# (R*54 + G*183 + B*19 + 128) >> 8 is the rounded gray level as a 0-255 uint8
+LUMA_R, LUMA_G, LUMA_B = 54, 183, 19
+THRESH_LEVEL = int(THRESH * 255)
 
-vid = imageio.get_reader('run_{:03d}.mp4'.format(RUN), 'ffmpeg')
+#----------
+# FUNCTIONS
+#----------
+def video_files(runs):
+    """Turn run numbers, file names and glob patterns into video file names."""
+    names = []
+    for run in runs:
+        if run.isdigit():
+            names.append('run_{:03d}.mp4'.format(int(run)))
+        else:
+            names.extend(sorted(glob.glob(run)) or [run])
+    return names
 
-#----------------
-# MAIN PROCESSING
-#----------------
-frame_data = []
-start = time.monotonic()
-# go through video frame by frame
-print("Processing", end='')
-for frame in vid:
-    print('.', end='', flush=True)
-    frame_bin = rgb2gray(frame) > THRESH
-    frame_count = np.count_nonzero(frame_bin == True)
-    frame_percent = 100 * frame_count / (1920*1080)
-    frame_data.append((frame_count, frame_percent))
-# overall stats
-avg_count = sum([x[0] for x in frame_data]) / len(frame_data)
-avg_percent = 100 * avg_count / (1920*1080)
-
-end = time.monotonic()
-print("\nProcessing done in {} secs.".format(end - start))
-print("Average Count = {}".format(avg_count))
-print("Average Percent = {}".format(avg_percent))
-
-#-------------
-# SAVE TO FILE
-#-------------
-print("Saving data to file...")
-with open('run_{:03d}.csv'.format(RUN), 'w') as fp:
-    for frame, data in enumerate(frame_data):
-        fp.write('{},{},{}\n'.format(frame, data[0], data[1]))
+def count_frame(frame, luma, scratch):
+    """Count pixels brighter than THRESH_LEVEL, luma and scratch are uint16
+    buffers the size of the frame, reused to avoid allocating per frame."""
+    np.multiply(frame[..., 0], LUMA_R, out=luma, dtype=np.uint16)
+    luma += np.multiply(frame[..., 1], LUMA_G, out=scratch, dtype=np.uint16)
+    luma += np.multiply(frame[..., 2], LUMA_B, out=scratch, dtype=np.uint16)
+    luma += 128
+    luma >>= 8
+    return np.count_nonzero(luma > THRESH_LEVEL)
+
+def process_chunk(filename, start, stop):
+    """Decode frames start to stop-1 and return (count, pixels) for each."""
+    results = []
+    luma = scratch = None
+    with imageio.get_reader(filename, 'ffmpeg') as vid:
+        for index in range(start, stop):
+            try:
+                frame = vid.get_data(index)
+            except IndexError:
+                # count_frames() can overestimate by a frame or two
+                break
+            if luma is None:
+                luma = np.empty(frame.shape[:2], dtype=np.uint16)
+                scratch = np.empty_like(luma)
+            results.append((count_frame(frame, luma, scratch), luma.size))
+    return results
+
+def process_run(filename, pool, chunk_frames=CHUNK_FRAMES):  # pylint: disable=too-many-locals
+    """Process one video in parallel chunks, streaming counts to its CSV."""
+    base = os.path.splitext(filename)[0]
+    with imageio.get_reader(filename, 'ffmpeg') as vid:
+        total_frames = vid.count_frames()
+    futures = [pool.submit(process_chunk, filename, start,
+                           min(start + chunk_frames, total_frames))
+               for start in range(0, total_frames, chunk_frames)]
+
+    counts = []
+    pixels = 0
+    start = time.monotonic()
+    print("Processing {} ({} frames)".format(filename, total_frames), end='')
+    with open(base + '.csv', 'w') as fp:
+        # chunks come back in frame order, written as soon as each is done
+        for future in futures:
+            for frame_count, pixels in future.result():
+                frame_percent = 100 * frame_count / pixels
+                fp.write('{},{},{}\n'.format(len(counts), frame_count,
+                                             frame_percent))
+                counts.append(frame_count)
+            fp.flush()
+            print('.', end='', flush=True)
+    end = time.monotonic()
+    if not counts:
+        print("\nNo frames in {}".format(filename))
+        return
+    # overall stats
+    avg_count = sum(counts) / len(counts)
+    avg_percent = 100 * avg_count / pixels
+
+    print("\nProcessing done in {} secs.".format(end - start))
+    print("Average Count = {}".format(avg_count))
+    print("Average Percent = {}".format(avg_percent))
+    plot_run(base, counts, avg_count, avg_percent)
 
 #---------
 # PLOTTING
 #---------
-print("Generating plots...")
-fig, ax = plt.subplots(1, figsize = (10,5))
-ax.set_title("RUN {:03d}\nTHRESH = {}, AVG_CNT = {:4.2}, AVG_PER = {:.3}".format(RUN, THRESH,avg_count, avg_percent))
-ax.set_xlabel("FRAME")
-ax.set_ylabel("COUNT")
-ax.plot([x[0] for x in frame_data])
-fig.savefig('run_{:03d}_plot.png'.format(RUN))
-
-print("DONE.")
+def plot_run(base, counts, avg_count, avg_percent):
+    print("Generating plots...")
+    fig, ax = plt.subplots(1, figsize = (10,5))
+    ax.set_title("{}\nTHRESH = {}, AVG_CNT = {:4.2}, AVG_PER = {:.3}".format(
+        os.path.basename(base).upper(), THRESH, avg_count, avg_percent))
+    ax.set_xlabel("FRAME")
+    ax.set_ylabel("COUNT")
+    ax.plot(counts)
+    fig.savefig(base + '_plot.png')
+    plt.close(fig)
+
+#----------------
+# MAIN PROCESSING
+#----------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Count pixels over THRESH in each frame of mask runs.')
+    parser.add_argument('runs', nargs='*',
+                        help='run numbers, video files or glob patterns '
+                             '(default: prompt for a run number)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='worker processes (default: all cores)')
+    parser.add_argument('--chunk', type=int, default=CHUNK_FRAMES,
+                        help='frames per work unit (default: {})'.format(
+                            CHUNK_FRAMES))
+    args = parser.parse_args()
+    run_args = args.runs or [input('Enter run number: ')]
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        for video in video_files(run_args):
+            process_run(video, executor, args.chunk)
+
+    print("DONE.")
@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: 2025 Melissa LeBlanc-Williams
+#
+# SPDX-License-Identifier: MIT
+"""
+Host-side (CPython, NOT CircuitPython) tick benchmark for the game logic.
+Plays every level in CHIPS.DAT headless with no display or audio, feeding
+a seeded pseudo-random stream of moves, and reports how many ticks per
+second GameLogic.advance_game() manages on each level and overall.
+
+$ python benchmark.py
+$ python benchmark.py --ticks 2000 --levels 1 10 120
+"""
+
+import argparse
+import random
+import time
+from headless import SilentAudio
+from definitions import UP, DOWN, LEFT, RIGHT, NONE
+from gamelogic import GameLogic
+
+DATA_FILE = "CHIPS.DAT"
+MOVES = (UP, DOWN, LEFT, RIGHT, NONE, NONE)
+
+def run_level(gamelogic, level, ticks, seed):
+    """Play ticks ticks of level with scripted input, return elapsed seconds"""
+    random.seed(seed + level)
+    moves = random.Random(seed * 7 + level)
+    script = [moves.choice(MOVES) for _ in range(ticks)]
+    gamelogic.set_level(level)
+    start = time.perf_counter()
+    for command in script:
+        gamelogic.advance_game(command)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Headless GameLogic tick benchmark over CHIPS.DAT levels.")
+    parser.add_argument("--ticks", type=int, default=1000,
+                        help="ticks to run per level (default: 1000)")
+    parser.add_argument("--levels", type=int, nargs="+",
+                        help="level numbers (default: all)")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="seed for scripted input and creatures (default: 1)")
+    args = parser.parse_args()
+
+    gamelogic = GameLogic(DATA_FILE, SilentAudio())
+    levels = args.levels or range(1, gamelogic.last_level + 1)
+    total_time = 0
+    slowest = (0, None)
+    for level in levels:
+        elapsed = run_level(gamelogic, level, args.ticks, args.seed)
+        total_time += elapsed
+        slowest = max(slowest, (elapsed, level))
+        # pylint: disable=protected-access
+        creatures, blocks = len(gamelogic._creature_pool), len(gamelogic._block_pool)
+        print(f"Level {level:3d}: {args.ticks / elapsed:9.0f} ticks/s "
+              f"{creatures:4d} creatures {blocks:4d} blocks")
+    total_ticks = args.ticks * len(levels)
+    print(f"{total_ticks} ticks in {total_time:.2f}s, "
+          f"{total_ticks / total_time:.0f} ticks/s, "
+          f"slowest level {slowest[1]} at {args.ticks / slowest[0]:.0f} ticks/s")
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ class Creature:
         self.hidden = False
         self.on_slip_list = False
         self.to_direction = NONE
+        self.order = 0  # Position in the game logic's creature or block pool
 
     def move(self, destination):
         if destination.y < self.cur_pos.y:
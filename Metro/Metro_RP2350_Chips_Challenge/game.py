@@ -6,11 +6,13 @@ from random import randint, random
 from time import sleep
 import sys
 import math
+from collections import OrderedDict
 import bitmaptools
 import adafruit_imageload
 import displayio
 from databuffer import DataBuffer
 from gamelogic import GameLogic
+from level import LEVEL_INDEX_FILE
 from point import Point
 from definitions import victory_messages, winning_message, final_levels
 from definitions import GM_NEWGAME, GM_NORMAL, GM_PAUSED, GM_LEVELWON, GM_CHIPDEAD, GM_GAMEWON
@@ -62,6 +64,11 @@ CHIPS_DIGITS_OFFSET = (INFO_OFFSET[0] + 26, INFO_OFFSET[1] + 123)
 ITEMS_OFFSET = (INFO_OFFSET[0] + 2, INFO_OFFSET[1] + 153)
 HINT_OFFSET = (INFO_OFFSET[0], INFO_OFFSET[1] + 96)
 
+# Top-over-bottom tile pairs kept composited, 576 bytes each at 24px
+TILE_CACHE_SIZE = 32
+# Marks a viewport slot as needing to be drawn
+TILE_UNDRAWN = 0xFF
+
 def get_victory_message(deaths):
     # go through victory message in reverse order
     for i in range(5, -1, -1):
@@ -81,6 +88,10 @@ class Game:
         self._gamelogic = GameLogic(data_file, audio)  # pylint: disable=too-many-function-args
         self._databuffer = DataBuffer()
         self._color_index = {}
+        # Tiles currently drawn in each viewport slot, row by row
+        self._viewport_top = bytearray([TILE_UNDRAWN] * 81)
+        self._viewport_bottom = bytearray(81)
+        self._tile_cache = OrderedDict()
         self._init_display()
         self._databuffer.set_data_structure({
             "info_drawn": False,
@@ -90,8 +101,7 @@ class Game:
             "chips_needed": -1,
             "keys": [False, False, False, False],
             "boots": [False, False, False, False],
-            "viewport_tiles_top": [[-1]*9 for _ in range(9)],
-            "viewport_tiles_bottom": [[-1]*9 for _ in range(9)],
+            "viewport_origin": None,
             "hint_visible": False,
             "pause_visible": False,
             "message_shown": False,
@@ -100,6 +110,9 @@ class Game:
         self._input_fields = InputFields()
         self._show_loading()
         self._savestate = SaveState()
+        if self._savestate.has_sdcard:
+            # Keep the level index on the SD card so CHIPS.DAT is only scanned once
+            self._gamelogic.current_level.index_file = "/sd/" + LEVEL_INDEX_FILE
         self._current_command_set = GAMEPLAY_COMMANDS
         self._keyboard = KeyboardBuffer(self._current_command_set.keys())
         self._deaths = 0
@@ -166,13 +179,12 @@ class Game:
         self._gamelogic.reset()
         self._remove_all_message_layers()
         self._databuffer.reset((
-            "viewport_tiles_top",
+            "viewport_origin",
             "level",
             "time_left",
             "chips_needed",
             "keys",
             "boots",
-            "viewport_tiles_top",
             "title_visible",
             "message_shown",
             "pause_visible",
@@ -749,17 +761,12 @@ Total Score: {score[3]}"""
         if 0xD0 <= top_tile <= 0xD3:
             top_tile -= 0xC2
 
-        # Bottom Layer
-        if top_tile > 0x40 and bottom_tile != TYPE_EMPTY: # Bottom Tile not visible
+        # Both layers visible, draw the composited pair in one blit
+        if top_tile > 0x40 and bottom_tile != TYPE_EMPTY:
             if 0xD0 <= bottom_tile <= 0xD3:
                 bottom_tile -= 0xC2
-            top_tile += 48  # Make top tile transparent
-            x_src = (bottom_tile // 16) * tile_size
-            y_src = (bottom_tile % 16) * tile_size
-            bitmaptools.blit(
-                buffer, self._images["spritesheet"], x, y, x_src, y_src,
-                x_src + tile_size, y_src + tile_size
-            )
+            bitmaptools.blit(buffer, self._get_tile_pair(top_tile, bottom_tile), x, y)
+            return
 
         # Top Layer
         x_src = (top_tile // 16) * tile_size
@@ -770,6 +777,95 @@ Total Score: {score[3]}"""
             skip_source_index=self._color_index["key_color"]
         )
 
+    def _get_tile_pair(self, top_tile, bottom_tile):
+        # Least recently used pairs are at the front of the cache
+        key = top_tile << 8 | bottom_tile
+        tile = self._tile_cache.pop(key, None)
+        if tile is None:
+            tile_size = self._tile_size
+            if len(self._tile_cache) >= TILE_CACHE_SIZE:
+                # Reuse the oldest bitmap rather than allocating another
+                tile = self._tile_cache.pop(next(iter(self._tile_cache)))
+            else:
+                tile = displayio.Bitmap(tile_size, tile_size, 256)
+            x_src = (bottom_tile // 16) * tile_size
+            y_src = (bottom_tile % 16) * tile_size
+            bitmaptools.blit(
+                tile, self._images["spritesheet"], 0, 0, x_src, y_src,
+                x_src + tile_size, y_src + tile_size
+            )
+            top_tile += 48  # Make top tile transparent
+            x_src = (top_tile // 16) * tile_size
+            y_src = (top_tile % 16) * tile_size
+            bitmaptools.blit(
+                tile, self._images["spritesheet"], 0, 0, x_src, y_src,
+                x_src + tile_size, y_src + tile_size,
+                skip_source_index=self._color_index["key_color"]
+            )
+        self._tile_cache[key] = tile
+        return tile
+
+    def _scroll_viewport(self, buffer, old_origin, new_origin):
+        # Shift the tiles still in view, leaving the exposed slots to be drawn
+        tile_size = self._tile_size
+        dx = new_origin[0] - old_origin[0]
+        dy = new_origin[1] - old_origin[1]
+        if not (-9 < dx < 9 and -9 < dy < 9):
+            self._viewport_top[:] = bytes([TILE_UNDRAWN] * 81)
+            return
+        x_src = VIEWPORT_OFFSET[0] + max(dx, 0) * tile_size
+        y_src = VIEWPORT_OFFSET[1] + max(dy, 0) * tile_size
+        # bitmaptools.blit() copies in a safe direction when the areas overlap
+        bitmaptools.blit(
+            buffer, buffer,
+            VIEWPORT_OFFSET[0] + max(-dx, 0) * tile_size,
+            VIEWPORT_OFFSET[1] + max(-dy, 0) * tile_size,
+            x_src, y_src,
+            x_src + (9 - abs(dx)) * tile_size, y_src + (9 - abs(dy)) * tile_size
+        )
+        old_top = bytes(self._viewport_top)
+        old_bottom = bytes(self._viewport_bottom)
+        slot = 0
+        for y_pos in range(dy, dy + 9):
+            for x_pos in range(dx, dx + 9):
+                if 0 <= x_pos < 9 and 0 <= y_pos < 9:
+                    self._viewport_top[slot] = old_top[y_pos * 9 + x_pos]
+                    self._viewport_bottom[slot] = old_bottom[y_pos * 9 + x_pos]
+                else:
+                    self._viewport_top[slot] = TILE_UNDRAWN
+                slot += 1
+
+    def _draw_viewport(self, buffer, data):
+        view_port = self._gamelogic.get_view_port()
+        origin = (view_port.x - 4, view_port.y - 4)
+        # Resetting the field leaves it empty, so nothing is drawn yet
+        if not data["viewport_origin"]:
+            self._viewport_top[:] = bytes([TILE_UNDRAWN] * 81)
+        elif data["viewport_origin"] != origin:
+            self._scroll_viewport(buffer, data["viewport_origin"], origin)
+        data["viewport_origin"] = origin
+
+        # Draw only the slots whose tiles changed
+        level = self._gamelogic.current_level
+        drawn_top = self._viewport_top
+        drawn_bottom = self._viewport_bottom
+        slot = 0
+        for y_pos in range(9):
+            position = (origin[1] + y_pos) * 32 + origin[0]
+            for x_pos in range(9):
+                top_tile = level.top[position]
+                bottom_tile = level.bottom[position]
+                if (drawn_top[slot] != top_tile or
+                    (top_tile >= 0x40 and drawn_bottom[slot] != bottom_tile)):
+                    drawn_top[slot] = top_tile
+                    drawn_bottom[slot] = bottom_tile
+                    self._draw_tile(
+                        buffer, x_pos * self._tile_size + VIEWPORT_OFFSET[0],
+                        y_pos * self._tile_size + VIEWPORT_OFFSET[1], top_tile, bottom_tile
+                    )
+                slot += 1
+                position += 1
+
     def _draw_frame(self):
         """
         This will be responsible for drawing everything to the buffer.
@@ -834,22 +930,7 @@ Total Score: {score[3]}"""
                     )
 
         if game_mode in (GM_NORMAL, GM_LEVELWON):
-            view_port = self._gamelogic.get_view_port()
-            for x_pos, x in enumerate(range(view_port.x - 4, view_port.x + 5)):
-                for y_pos, y in enumerate(range(view_port.y - 4, view_port.y + 5)):
-                    tile_position = Point(x, y)
-                    cell = self._gamelogic.current_level.get_cell(tile_position)
-                    top_tile = cell.top.id
-                    bottom_tile = cell.bottom.id
-                    if (data["viewport_tiles_top"][x_pos][y_pos] != top_tile or
-                        (top_tile >= 0x40 and
-                         data["viewport_tiles_bottom"][x_pos][y_pos] != bottom_tile)):
-                        data["viewport_tiles_top"][x_pos][y_pos] = top_tile
-                        data["viewport_tiles_bottom"][x_pos][y_pos] = bottom_tile
-                        self._draw_tile(
-                            buffer, x_pos * self._tile_size + VIEWPORT_OFFSET[0],
-                            y_pos * self._tile_size + VIEWPORT_OFFSET[1], top_tile, bottom_tile
-                        )
+            self._draw_viewport(buffer, data)
 
         self._draw_title_dialog()
         self._draw_hint()
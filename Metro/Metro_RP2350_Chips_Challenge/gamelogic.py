@@ -66,6 +66,10 @@ class GameLogic:
         self._sliplist = []
         self._creature_pool = []
         self._block_pool = []
+        # Pool members by (x, y), each cell kept in pool order
+        self._creature_at = {}
+        self._block_at = {}
+        self._pool_order = 0
         self.current_level = Level(data_file)
         self._current_input = NONE
         self._chips_needed = 0
@@ -324,7 +328,7 @@ class GameLogic:
             self.current_level.get_cell(ptPos).bottom.id = TYPE_EMPTY
         if not flags & CMM_NODEFERBUTTONS:
             creature.state |= CS_DEFERPUSH
-            result = self._advance_creature(creature, direction)
+        result = self._advance_creature(creature, direction)
         if not flags & CMM_NODEFERBUTTONS:
             creature.state &= ~CS_DEFERPUSH
         if not result:
@@ -360,24 +364,27 @@ class GameLogic:
         tile.state = 0
 
     def re_set_buttons(self):
-        for x in range(32):
-            for y in range(32):
-                self.current_level.get_cell(Point(x, y)).top.state &= ~FS_BUTTONDOWN
-                self.current_level.get_cell(Point(x, y)).bottom.state &= ~FS_BUTTONDOWN
+        for states in (self.current_level.top_state, self.current_level.bottom_state):
+            for position, state in enumerate(states):
+                if state & FS_BUTTONDOWN:
+                    states[position] = state & ~FS_BUTTONDOWN
 
     def handle_buttons(self):
+        # Check the state layers directly, column by column as before
+        level = self.current_level
+        top_state = level.top_state
+        bottom_state = level.bottom_state
         for x in range(32):
-            for y in range(32):
-                top = self.current_level.get_cell(Point(x, y)).top
-                bottom = self.current_level.get_cell(Point(x, y)).bottom
-                if top.state & FS_BUTTONDOWN:
-                    top.state &= ~FS_BUTTONDOWN
-                    tile_id = top.id
-                elif bottom.state & FS_BUTTONDOWN:
-                    bottom.state &= ~FS_BUTTONDOWN
-                    tile_id = bottom.id
+            for position in range(x, 1024, 32):
+                if top_state[position] & FS_BUTTONDOWN:
+                    top_state[position] &= ~FS_BUTTONDOWN
+                    tile_id = level.top[position]
+                elif bottom_state[position] & FS_BUTTONDOWN:
+                    bottom_state[position] &= ~FS_BUTTONDOWN
+                    tile_id = level.bottom[position]
                 else:
                     continue
+                y = position >> 5
                 if tile_id == TYPE_BUTTON_BLUE:
                     self._toggle_tanks(None)
                     self._audio.play("BUTTON_PUSHED")
@@ -618,9 +625,9 @@ class GameLogic:
                         creature.direction = self._last_slip_dir
 
 
-        creature.cur_pos = new_pos
+        self._set_position(creature, new_pos)
         self._add_creature_to_map(creature)
-        creature.cur_pos = old_pos
+        self._set_position(creature, old_pos)
 
         tile = cell.bottom
         if floor == TYPE_BUTTON_BLUE:
@@ -647,7 +654,7 @@ class GameLogic:
                 self._spring_trap(new_pos)
             self._audio.play("BUTTON_PUSHED")
 
-        creature.cur_pos = new_pos
+        self._set_position(creature, new_pos)
 
         if self.current_level.get_cell(old_pos).bottom.id == TYPE_CLONEMACHINE:
             self.current_level.get_cell(old_pos).bottom.state &= ~FS_CLONING
@@ -784,13 +791,13 @@ class GameLogic:
             tile = self.current_level.get_cell(dest).top
             if tile.id != TYPE_TELEPORT or (tile.state & FS_BROKEN):
                 continue
-            creature.cur_pos = dest
+            self._set_position(creature, dest)
             can_move = self._can_make_move(
                 creature,
                 creature.direction,
                 CMM_NOLEAVECHECK | CMM_NOEXPOSEWALLS | CMM_NODEFERBUTTONS |
                 CMM_NOFIRECHECK | CMM_TELEPORTPUSH)
-            creature.cur_pos = orig_pos
+            self._set_position(creature, orig_pos)
             if can_move:
                 break
         return dest
@@ -832,6 +839,10 @@ class GameLogic:
         self._chip.state = 0
         self._creature_pool = []
         self._block_pool = []
+        self._creature_at = {}
+        self._block_at = {}
+        self._pool_order = 0
+        self._sliplist = []
         self._set_button(NONE)
         self.dead_creatures = 0
         self.dead_blocks = 0
@@ -889,13 +900,51 @@ class GameLogic:
                 return slip.dir
         return NONE
 
+    @staticmethod
+    def _occupy(occupancy, creature):
+        # Insert by pool order so the first match is the one a pool scan finds
+        cell = occupancy.get((creature.cur_pos.x, creature.cur_pos.y))
+        if cell is None:
+            occupancy[(creature.cur_pos.x, creature.cur_pos.y)] = [creature]
+            return
+        index = len(cell)
+        while index and cell[index - 1].order > creature.order:
+            index -= 1
+        cell.insert(index, creature)
+
+    @staticmethod
+    def _vacate(occupancy, creature):
+        key = (creature.cur_pos.x, creature.cur_pos.y)
+        cell = occupancy.get(key)
+        if cell is None:
+            return False
+        for index, occupant in enumerate(cell):
+            if occupant is creature:
+                del cell[index]
+                if not cell:
+                    del occupancy[key]
+                return True
+        return False
+
+    def _set_position(self, creature, pos):
+        # Move a creature, keeping the occupancy index in step if it's pooled
+        for occupancy in (self._creature_at, self._block_at):
+            if self._vacate(occupancy, creature):
+                creature.cur_pos = pos
+                self._occupy(occupancy, creature)
+                return
+        creature.cur_pos = pos
+
     def _add_creature(self, tile_pos, direction, creature_type):
         new_creature = Creature(
             position=tile_pos,
             direction=direction,
             creature_type=creature_type
         )
+        new_creature.order = self._pool_order
+        self._pool_order += 1
         self._creature_pool.append(new_creature)
+        self._occupy(self._creature_at, new_creature)
         return new_creature
 
     def _remove_creature(self, creature):
@@ -908,6 +957,8 @@ class GameLogic:
             if self.status == SF_CHIPOKAY:
                 self.status = SF_CHIPNOTOKAY
         creature.hidden = True
+        # Hidden blocks are never returned by _get_block()
+        self._vacate(self._block_at, creature)
 
     def _remove_dead_creatures(self):
         for creature in self._creature_pool:
@@ -916,9 +967,9 @@ class GameLogic:
                 self.dead_creatures -= 1
 
     def _get_creature(self, pos, include_chip):
-        for creature in self._creature_pool:
-            if creature.cur_pos == pos:
-                return creature
+        cell = self._creature_at.get((pos.x, pos.y))
+        if cell:
+            return cell[0]
         if include_chip and self._chip.cur_pos == pos:
             return self._chip
         return None
@@ -928,19 +979,27 @@ class GameLogic:
         new_block.cur_pos = tile_pos
         new_block.direction = direction
         new_block.type = creature_type
+        new_block.order = self._pool_order
+        self._pool_order += 1
         self._block_pool.append(new_block)
+        self._occupy(self._block_at, new_block)
         return new_block
 
     def _remove_dead_blocks(self):
+        # Rebuild rather than remove() while iterating, which skipped blocks
+        blocks = []
         for block in self._block_pool:
             if block.hidden and not block.on_slip_list:
-                self._block_pool.remove(block)
+                self._vacate(self._block_at, block)
                 self.dead_blocks -= 1
+            else:
+                blocks.append(block)
+        self._block_pool = blocks
 
     def _get_block(self, pos):
-        for block in self._block_pool:
-            if block.cur_pos == pos and not block.hidden:
-                return block
+        cell = self._block_at.get((pos.x, pos.y))
+        if cell:
+            return cell[0]
         tile = self.current_level.get_cell(pos).top.id
         if creature_id(tile) == TYPE_BLOCK:
             creature_dir = creature_dir_id(tile)
@@ -1160,13 +1219,7 @@ class GameLogic:
         self._prepare()
 
         if self.get_tick() and not self.get_tick() & 1:
-            self._controller_dir = NONE
-            for creature in self._creature_pool:
-                if creature.hidden or (creature.state & CS_CLONING) or creature.type == TYPE_CHIP:
-                    continue
-                self._choose_move(creature)
-                if creature.to_direction != NONE:
-                    self._advance_creature(creature, creature.to_direction)
+            self._move_creatures()
             if self._check_for_ending():
                 self._finalize()
                 return
@@ -1200,6 +1253,15 @@ class GameLogic:
         self._create_clones()
         self._finalize()
 
+    def _move_creatures(self):
+        self._controller_dir = NONE
+        for creature in self._creature_pool:
+            if creature.hidden or (creature.state & CS_CLONING) or creature.type == TYPE_CHIP:
+                continue
+            self._choose_move(creature)
+            if creature.to_direction != NONE:
+                self._advance_creature(creature, creature.to_direction)
+
     def _create_clones(self):
         for creature in self._creature_pool:
             if creature.state & CS_CLONING:
@@ -0,0 +1,80 @@
+# SPDX-FileCopyrightText: 2025 Melissa LeBlanc-Williams
+#
+# SPDX-License-Identifier: MIT
+"""
+Host-side (CPython, NOT CircuitPython) stand-ins for the hardware the game
+talks to, so GameLogic can run with no display, speaker or serial keyboard.
+Used by benchmark.py and replay.py.
+"""
+
+import hashlib
+import sys
+
+try:
+    import micropython  # pylint: disable=unused-import
+except ImportError:
+    # definitions.py only needs const(), which is a no-op outside CircuitPython
+    class micropython:  # pylint: disable=invalid-name, too-few-public-methods
+        const = staticmethod(lambda value: value)
+    sys.modules["micropython"] = micropython
+
+class SilentAudio:
+    """Stands in for Audio, counting the sounds that would have played"""
+    def __init__(self):
+        self.played = {}
+
+    def play(self, sound_name, wait=False):
+        # pylint: disable=unused-argument
+        self.played[sound_name] = self.played.get(sound_name, 0) + 1
+
+class ScriptedKeyboard:
+    """Stands in for KeyboardBuffer, reading from keys queued with feed()
+    instead of the serial console"""
+    def __init__(self, valid_sequences):
+        self.key_buffer = ""
+        self._valid_sequences = valid_sequences
+
+    def feed(self, keys):
+        self.key_buffer += keys
+
+    def set_valid_sequences(self, valid_sequences):
+        self._valid_sequences = valid_sequences
+
+    def clear(self):
+        self.key_buffer = ""
+
+    def get_key(self):
+        if self.key_buffer:
+            for sequence in self._valid_sequences:
+                if self.key_buffer.startswith(sequence):
+                    self.key_buffer = self.key_buffer[len(sequence):]
+                    return sequence
+            self.key_buffer = self.key_buffer[1:]
+        return None
+
+class NullDisplay:
+    """Stands in for the display, counting the frames Game would have drawn"""
+    def __init__(self):
+        self.frames = 0
+
+    def draw(self, _gamelogic):
+        self.frames += 1
+
+def state_hash(gamelogic):
+    """SHA-1 of everything a tick can change: both map layers, chip,
+    inventory, creature and block pools, status and the tick count"""
+    # pylint: disable=protected-access
+    level = gamelogic.current_level
+    digest = hashlib.sha1()
+    for layer in (level.top, level.top_state, level.bottom, level.bottom_state):
+        digest.update(layer)
+    chip = gamelogic._chip
+    state = [gamelogic.status, gamelogic.get_tick(), gamelogic.get_chips_needed(),
+             gamelogic.keys, gamelogic.boots,
+             (chip.cur_pos.x, chip.cur_pos.y, chip.direction, chip.state)]
+    for pool in (gamelogic._creature_pool, gamelogic._block_pool):
+        state.append([(creature.cur_pos.x, creature.cur_pos.y, creature.type,
+                       creature.direction, creature.state, creature.hidden)
+                      for creature in pool])
+    digest.update(repr(state).encode())
+    return digest.hexdigest()
@@ -6,6 +6,9 @@
 #
 # pylint: disable=too-many-lines, wildcard-import, unused-wildcard-import
 
+import json
+import os
+import struct
 from point import Point
 from device import Device
 from definitions import TYPE_EMPTY, TYPE_SWITCHWALL_OPEN, TYPE_SWITCHWALL_CLOSED
@@ -21,15 +24,48 @@ FIELD_PASSWORD = 6
 FIELD_HINT = 7
 FIELD_MOVING_CREATURES = 10
 
+# Level offsets and passwords, built from the data file on first load
+LEVEL_INDEX_FILE = "chips_index.json"
+INDEX_VERSION = 1
+
+MAP_SIZE = 1024
+_EMPTY_LAYER = bytes(MAP_SIZE)
+# RLE runs are copied out of these with slice assignment, one per tile id
+_runs = {}
+
 class Tile:
     def __init__(self, tile_id=0, state=0):
         self.id = tile_id
         self.state = state
 
+class LayerTile:
+    """A tile in one of the level layers, reading and writing the
+    id and state straight from the layer's bytearrays"""
+    def __init__(self, ids, states, position):
+        self._ids = ids
+        self._states = states
+        self._position = position
+
+    @property
+    def id(self):
+        return self._ids[self._position]
+
+    @id.setter
+    def id(self, value):
+        self._ids[self._position] = value
+
+    @property
+    def state(self):
+        return self._states[self._position]
+
+    @state.setter
+    def state(self, value):
+        self._states[self._position] = value
+
 class Cell:
-    def __init__(self):
-        self.top = Tile()
-        self.bottom = Tile()
+    def __init__(self, level, position):
+        self.top = LayerTile(level.top, level.top_state, position)
+        self.bottom = LayerTile(level.bottom, level.bottom_state, position)
 
     def __repr__(self):
         return f"Top: {hex(self.top.id)} Bottom: {hex(self.bottom.id)}"
@@ -41,10 +77,14 @@ def read_int(file, byte_count):
 def position_to_coords(position):
     return Point(position % 32, position // 32)
 
+def decode_password(data):
+    return "".join([chr(c ^ 0x99) for c in data]).replace("\x99", "")
+
 class Level:
-    def __init__(self, data_file):
+    def __init__(self, data_file, index_file=None):
         # Initialize any variables
         self._data_file = data_file
+        self.index_file = index_file
         self.level_number = 0
         self.last_level = 0
         self.time_limit = 0
@@ -53,192 +93,248 @@ class Level:
         self.password = ""
         self.hint = ""
         self.title = ""
-        self.level_map = [Cell() for _ in range(1024)]
+        # Tile ids and states for each layer, indexed by y * 32 + x
+        self.top = bytearray(MAP_SIZE)
+        self.bottom = bytearray(MAP_SIZE)
+        self.top_state = bytearray(MAP_SIZE)
+        self.bottom_state = bytearray(MAP_SIZE)
+        # Cell views are created as needed and reused for every level
+        self._cells = [None] * MAP_SIZE
         self.traps = []
         self.cloners = []
         self.creatures = []
         self.passwords = {}
+        # (offset, length) of each level record in the data file
+        self._levels = None
+        self._record = None
+        self._record_view = None
+        self._record_level = 0
 
     def _reset_data(self):
-        self.level_map = [Cell() for _ in range(1024)]
-        self.traps = []
-        self.cloners = []
-        self.creatures = []
+        self.top[:] = _EMPTY_LAYER
+        self.bottom[:] = _EMPTY_LAYER
+        self.top_state[:] = _EMPTY_LAYER
+        self.bottom_state[:] = _EMPTY_LAYER
+        self.traps.clear()
+        self.cloners.clear()
+        self.creatures.clear()
 
     def get_cell(self, coords):
         if isinstance(coords, int):
-            coords = position_to_coords(coords)
-        return self.level_map[coords.y * 32 + coords.x]
-
-    def _update_cell_id(self, coords, tile_id, layer):
-        getattr(self.get_cell(coords), layer).id = tile_id
+            position = coords
+        else:
+            position = coords.y * 32 + coords.x
+        cell = self._cells[position]
+        if cell is None:
+            cell = Cell(self, position)
+            self._cells[position] = cell
+        return cell
 
     def _get_map_representation(self, layer):
         level_map = f"{layer} layer\n"
+        tiles = getattr(self, layer)
         for y in range(32):
             for x in range(32):
-                level_map += f"{hex(getattr(self.get_cell(Point(x, y)), layer).id)} "
+                level_map += f"{hex(tiles[y * 32 + x])} "
             level_map += "\n"
         return level_map
 
+    def _load_index(self):
+        """
+        Load the level offsets and passwords from the index file if it
+        matches the data file, otherwise build it and try to save it
+        """
+        file_size = os.stat(self._data_file)[6]
+        index = None
+        if self.index_file is not None:
+            try:
+                with open(self.index_file, "r") as file:
+                    index = json.load(file)
+                if index["version"] != INDEX_VERSION or index["size"] != file_size:
+                    index = None
+            except (OSError, ValueError, KeyError):
+                index = None
+        if index is None:
+            index = self._build_index(file_size)
+            if self.index_file is not None:
+                try:
+                    with open(self.index_file, "w") as file:
+                        json.dump(index, file)
+                except OSError:
+                    pass
+        self._levels = index["levels"]
+        self.last_level = len(self._levels)
+        self.passwords = {int(level): password
+                          for level, password in index["passwords"].items()}
+        # Every level is read into the same buffer
+        self._record = bytearray(max(length for _, length in self._levels))
+        self._record_view = memoryview(self._record)
+
+    def _build_index(self, file_size):
+        levels = []
+        passwords = {}
+        with open(self._data_file, "rb") as file:
+            # Read the first 4 bytes in little endian format
+            if read_int(file, 4) not in (0x0002AAAC, 0x0102AAAC):
+                raise ValueError("Not a CHIP file")
+            last_level = read_int(file, 2)
+            for _ in range(last_level):
+                level_bytes = read_int(file, 2)
+                offset = file.tell()
+                level_number = read_int(file, 2)
+                levels.append((offset, level_bytes))
+                file.seek(6, 1)
+                layer_bytes = read_int(file, 2)   # Number of bytes in the top layer
+                file.seek(layer_bytes, 1)   # Skip top layer
+                layer_bytes = read_int(file, 2)   # Number of bytes in the bottom layer
+                file.seek(layer_bytes, 1)   # Skip bottom layer
+                remaining_bytes = read_int(file, 2)
+                while remaining_bytes > 0:
+                    field_type = read_int(file, 1)
+                    field_size = read_int(file, 1)
+                    remaining_bytes -= (2 + field_size)
+                    if field_type == FIELD_PASSWORD:
+                        passwords[str(level_number)] = decode_password(file.read(field_size))
+                    else:
+                        file.seek(field_size, 1)
+                file.seek(offset + level_bytes)
+        return {
+            "version": INDEX_VERSION,
+            "size": file_size,
+            "levels": levels,
+            "passwords": passwords,
+        }
 
-    def _process_map_data(self, map_data, layer):
+    def _process_map_data(self, start, end, layer):
         """
-        Store RLE mapdata in uncompressed form
+        Store RLE mapdata from the record buffer in uncompressed form
         """
-        current_byte = 0
+        record = self._record
+        current_byte = start
         current_position = 0
-        while current_byte < len(map_data):
-            if map_data[current_byte] == 0xFF:
-                tile_id = map_data[current_byte + 2]
+        while current_byte < end and current_position < MAP_SIZE:
+            if record[current_byte] == 0xFF:
+                count = min(record[current_byte + 1], MAP_SIZE - current_position)
+                tile_id = record[current_byte + 2]
                 if 0x0E <= tile_id <= 0x11:
                     tile_id += 0xC2
-                for _ in range(map_data[current_byte + 1]):
-                    coords = position_to_coords(current_position)
-                    self._update_cell_id(coords, tile_id, layer)
-                    current_position += 1
+                run = _runs.get(tile_id)
+                if run is None:
+                    run = memoryview(bytes((tile_id,)) * 255)
+                    _runs[tile_id] = run
+                layer[current_position:current_position + count] = run[:count]
+                current_position += count
                 current_byte += 3
             else:
-                tile_id = map_data[current_byte]
-                if 0x0E <= tile_id <= 0x11:
-                    tile_id += 0xC2
-                coords = position_to_coords(current_position)
-                self._update_cell_id(coords, tile_id, layer)
-                current_position += 1
-                current_byte += 1
+                # Copy everything up to the next run in one go
+                run_start = current_byte
+                remap = False
+                while run_start < end and record[run_start] != 0xFF:
+                    if 0x0E <= record[run_start] <= 0x11:
+                        remap = True
+                    run_start += 1
+                count = min(run_start - current_byte, MAP_SIZE - current_position)
+                layer[current_position:current_position + count] = (
+                    self._record_view[current_byte:current_byte + count]
+                )
+                if remap:
+                    for position in range(current_position, current_position + count):
+                        if 0x0E <= layer[position] <= 0x11:
+                            layer[position] += 0xC2
+                current_position += count
+                current_byte += count
 
     def load(self, level_number):
         #pylint: disable=too-many-branches, too-many-locals
         # Reset the data prior to loading
         self._reset_data()
-        # Read the file and fill in the variables
-        with open(self._data_file, "rb") as file:
-            # Read the first 4 bytes in little endian format
-            if read_int(file, 4) not in (0x0002AAAC, 0x0102AAAC):
-                raise ValueError("Not a CHIP file")
-            self.last_level = read_int(file, 2)
-            if not 0 < level_number <= self.last_level:
-                raise ValueError("Invalid level number")
-            self.level_number = level_number
-            # Seek to the start of the level data for the specified level
-            while True:
-                level_bytes = read_int(file, 2)
-                if read_int(file, 2) == level_number:
-                    break
-                # Go to next level
-                file.seek(level_bytes - 2, 1)
-
-            # Read the level data
-            self.time_limit = read_int(file, 2)
-            self.chips_required = read_int(file, 2)
-            compression = read_int(file, 2)
-            if compression == COMPRESSED:
-                raise ValueError("Compressed levels not supported")
-
-            # Process the top map data
-            layer_bytes = read_int(file, 2)
-            map_data = file.read(layer_bytes)
-            self._process_map_data(map_data, "top")
-
-            # Process the bottom map data
-            layer_bytes = read_int(file, 2)
-            map_data = file.read(layer_bytes)
-            self._process_map_data(map_data, "bottom")
-
-            remaining_bytes = read_int(file, 2)
-            while remaining_bytes > 0:
-                field_type = read_int(file, 1)
-                field_size = read_int(file, 1)
-                remaining_bytes -= (2 + field_size)
-                if field_type == FIELD_TITLE:
-                    self.title = file.read(field_size).decode("utf-8").replace("\x00", "")
-                elif field_type == FIELD_HINT:
-                    self.hint = file.read(field_size).decode("utf-8").replace("\x00", "")
-                elif field_type == FIELD_PASSWORD:
-                    self.password = (
-                        "".join([chr(c ^ 0x99) for c in file.read(field_size)]).replace("\x99", "")
-                    )
-                elif field_type == FIELD_BEAR_TRAPS:
-                    trap_count = field_size // 10
-                    for _ in range(trap_count):
-                        button = Point(read_int(file, 2), read_int(file, 2))
-                        device = Point(read_int(file, 2), read_int(file, 2))
-                        self.traps.append(Device(button, device))
-                        file.seek(2, 1)
-                elif field_type == FIELD_CLONING_MACHINES:
-                    cloner_count = field_size // 8
-                    for _ in range(cloner_count):
-                        button = Point(read_int(file, 2), read_int(file, 2))
-                        device = Point(read_int(file, 2), read_int(file, 2))
-                        self.cloners.append(Device(button, device))
-                elif field_type == FIELD_MOVING_CREATURES:
-                    creature_count = field_size // 2
-                    for _ in range(creature_count):
-                        self.creatures.append(Point(
-                            read_int(file, 1),
-                            read_int(file, 1)
-                        ))
-
-            # Load passwords if not already loaded
-            if len(self.passwords) == 0:
-                self._load_passwords(file)
-
-    def _load_passwords(self, file):
-        file.seek(6)    # Skip the file header
-        while True:
-            file.seek(2, 1)
-            level_number = read_int(file, 2)
-            file.seek(6, 1)
-            layer_bytes = read_int(file, 2)   # Number of bytes in the top layer
-            file.seek(layer_bytes, 1)   # Skip top layer
-            layer_bytes = read_int(file, 2)   # Number of bytes in the top layer
-            file.seek(layer_bytes, 1)   # Skip bottom layer
-            remaining_bytes = read_int(file, 2)
-            while remaining_bytes > 0:
-                field_type = read_int(file, 1)
-                field_size = read_int(file, 1)
-                remaining_bytes -= (2 + field_size)
-                if field_type == FIELD_PASSWORD:
-                    password = file.read(field_size)
-                    self.passwords[level_number] = (
-                        "".join([chr(c ^ 0x99) for c in password]).replace("\x99", "")
-                    )
-                    file.seek(remaining_bytes, 1)
-                    break
-                file.seek(field_size, 1)
-            if len(self.passwords) == self.last_level:
-                break
+        if self._levels is None:
+            self._load_index()
+        if not 0 < level_number <= self.last_level:
+            raise ValueError("Invalid level number")
+        self.level_number = level_number
+        record = self._record
+        offset, length = self._levels[level_number - 1]
+        # Restarting the same level doesn't need to read the file again
+        if self._record_level != level_number:
+            with open(self._data_file, "rb") as file:
+                file.seek(offset)
+                file.readinto(self._record_view[:length])
+            self._record_level = level_number
 
-    def toggle_blocks(self):
-        for cell in self.level_map:
-            if cell.top.id == TYPE_SWITCHWALL_OPEN:
-                cell.top.id = TYPE_SWITCHWALL_CLOSED
-            elif cell.top.id == TYPE_SWITCHWALL_CLOSED:
-                cell.top.id = TYPE_SWITCHWALL_OPEN
+        # Read the level data
+        (_, self.time_limit, self.chips_required, compression,
+         layer_bytes) = struct.unpack_from("<HHHHH", record, 0)
+        if compression == COMPRESSED:
+            raise ValueError("Compressed levels not supported")
 
-            if cell.bottom.id == TYPE_SWITCHWALL_OPEN:
-                cell.bottom.id = TYPE_SWITCHWALL_CLOSED
-            elif cell.bottom.id == TYPE_SWITCHWALL_CLOSED:
-                cell.bottom.id = TYPE_SWITCHWALL_OPEN
+        # Process the top map data
+        position = 10
+        self._process_map_data(position, position + layer_bytes, self.top)
+        position += layer_bytes
+
+        # Process the bottom map data
+        layer_bytes = struct.unpack_from("<H", record, position)[0]
+        position += 2
+        self._process_map_data(position, position + layer_bytes, self.bottom)
+        position += layer_bytes
+
+        fields_end = position + 2 + struct.unpack_from("<H", record, position)[0]
+        position += 2
+        while position < fields_end:
+            field_type = record[position]
+            field_size = record[position + 1]
+            position += 2
+            field = self._record_view[position:position + field_size]
+            if field_type == FIELD_TITLE:
+                self.title = bytes(field).decode("utf-8").replace("\x00", "")
+            elif field_type == FIELD_HINT:
+                self.hint = bytes(field).decode("utf-8").replace("\x00", "")
+            elif field_type == FIELD_PASSWORD:
+                self.password = decode_password(field)
+            elif field_type == FIELD_BEAR_TRAPS:
+                for trap in range(field_size // 10):
+                    values = struct.unpack_from("<HHHH", record, position + trap * 10)
+                    self.traps.append(Device(Point(values[0], values[1]),
+                                             Point(values[2], values[3])))
+            elif field_type == FIELD_CLONING_MACHINES:
+                for cloner in range(field_size // 8):
+                    values = struct.unpack_from("<HHHH", record, position + cloner * 8)
+                    self.cloners.append(Device(Point(values[0], values[1]),
+                                               Point(values[2], values[3])))
+            elif field_type == FIELD_MOVING_CREATURES:
+                for creature in range(field_size // 2):
+                    self.creatures.append(Point(
+                        field[creature * 2],
+                        field[creature * 2 + 1]
+                    ))
+            position += field_size
+
+    def toggle_blocks(self):
+        for layer in (self.top, self.bottom):
+            for position in range(MAP_SIZE):
+                tile_id = layer[position]
+                if tile_id == TYPE_SWITCHWALL_OPEN:
+                    layer[position] = TYPE_SWITCHWALL_CLOSED
+                elif tile_id == TYPE_SWITCHWALL_CLOSED:
+                    layer[position] = TYPE_SWITCHWALL_OPEN
 
     def pop_tile(self, coords):
-        tile = Tile()
-        cell = self.get_cell(coords)
-        tile.id = cell.top.id
-        tile.state = cell.top.state
-        cell.top.id = cell.bottom.id
-        cell.top.state = cell.bottom.state
-        cell.bottom.id = TYPE_EMPTY
-        cell.bottom.state = 0
+        position = coords.y * 32 + coords.x
+        tile = Tile(self.top[position], self.top_state[position])
+        self.top[position] = self.bottom[position]
+        self.top_state[position] = self.bottom_state[position]
+        self.bottom[position] = TYPE_EMPTY
+        self.bottom_state[position] = 0
 
         return tile
 
     def push_tile(self, coords, tile):
-        cell = self.get_cell(coords)
-        cell.bottom.id = cell.top.id
-        cell.bottom.state = cell.top.state
-        cell.top.id = tile.id
-        cell.top.state = tile.state
+        position = coords.y * 32 + coords.x
+        self.bottom[position] = self.top[position]
+        self.bottom_state[position] = self.top_state[position]
+        self.top[position] = tile.id
+        self.top_state[position] = tile.state
 
     def __str__(self):
         # print the map ids from the level
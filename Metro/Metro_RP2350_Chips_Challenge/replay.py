@@ -0,0 +1,200 @@
+# SPDX-FileCopyrightText: 2025 Melissa LeBlanc-Williams
+#
+# SPDX-License-Identifier: MIT
+"""
+Host-side (CPython, NOT CircuitPython) record and replay harness for the
+game logic. Runs levels at unlimited speed through the same game mode
+handling and key mapping as Game.tick(), with headless.py standing in for
+the display, audio and keyboard.
+
+A recording holds, per level, the random seed used for creature moves, one
+move per tick and the state hash at the end. Replaying it checks that the
+game logic still ends each level in exactly the same state, and reports
+ticks per second along with the time spent moving creatures, working the
+slip list and doing floor movements.
+
+$ python replay.py record baseline.json --ticks 2000
+$ python replay.py replay baseline.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from headless import SilentAudio, ScriptedKeyboard, NullDisplay, state_hash
+from definitions import GAMEPLAY_COMMANDS, GM_NORMAL, GM_CHIPDEAD, GM_LEVELWON
+from definitions import UP_ARROW, DOWN_ARROW, LEFT_ARROW, RIGHT_ARROW, CTRL_R
+from definitions import NONE, RESTART_LEVEL
+from gamelogic import GameLogic
+
+DATA_FILE = "CHIPS.DAT"
+
+# One character per tick in a recording
+MOVE_KEYS = {
+    "U": UP_ARROW,
+    "D": DOWN_ARROW,
+    "L": LEFT_ARROW,
+    "R": RIGHT_ARROW,
+    "r": CTRL_R,
+    ".": "",
+}
+
+# GameLogic methods timed as phases of a tick
+PHASES = {
+    "creatures": "_move_creatures",
+    "slip list": "_update_slip_list",
+    "floor": "_floor_movements",
+}
+
+class HeadlessGame:
+    """Game.tick() without the display, starting straight into a level"""
+    def __init__(self, data_file):
+        self.audio = SilentAudio()
+        self.display = NullDisplay()
+        self.keyboard = ScriptedKeyboard(GAMEPLAY_COMMANDS.keys())
+        self.gamelogic = GameLogic(data_file, self.audio)
+        self.deaths = 0
+        self.phase_times = dict.fromkeys(PHASES, 0)
+        for phase, method in PHASES.items():
+            setattr(self.gamelogic, method,
+                    self._timed(phase, getattr(self.gamelogic, method)))
+
+    def _timed(self, phase, method):
+        def timed_method(*args):
+            start = time.perf_counter()
+            result = method(*args)
+            self.phase_times[phase] += time.perf_counter() - start
+            return result
+        return timed_method
+
+    def start(self, level, seed):
+        random.seed(seed)
+        self.deaths = 0
+        self.keyboard.clear()
+        self.gamelogic.set_level(level)
+
+    def tick(self):
+        """Run one tick, return False once the level is won"""
+        gamelogic = self.gamelogic
+        game_mode = gamelogic.get_game_mode()
+        key = self.keyboard.get_key()
+        self.keyboard.clear()
+        command = GAMEPLAY_COMMANDS[key] if key else NONE
+        if command == RESTART_LEVEL:
+            gamelogic.set_level(gamelogic.current_level_number)
+            command = NONE
+
+        if game_mode == GM_NORMAL:
+            gamelogic.advance_game(command)
+        elif game_mode == GM_CHIPDEAD:
+            self.deaths += 1
+            gamelogic.set_level(gamelogic.current_level_number)
+        elif game_mode == GM_LEVELWON:
+            return False
+
+        if not gamelogic.get_tick() or gamelogic.get_tick() & 1:
+            self.display.draw(gamelogic)
+        return True
+
+    def play(self, moves):
+        """Feed one move per tick until they run out or the level is won,
+        returning the number of ticks run"""
+        ticks = 0
+        for move in moves:
+            self.keyboard.feed(MOVE_KEYS[move])
+            ticks += 1
+            if not self.tick():
+                break
+        return ticks
+
+def scripted_moves(ticks, seed):
+    """Pseudo-random moves, holding each direction or pause for a few ticks"""
+    rng = random.Random(seed)
+    moves = []
+    while len(moves) < ticks:
+        moves.extend(rng.choice("UDLR..") * rng.randint(1, 8))
+    return "".join(moves[:ticks])
+
+def run(game, entry):
+    """Play one recorded level, returning the result to check or save"""
+    game.start(entry["level"], entry["seed"])
+    ticks = game.play(entry["moves"])
+    return {
+        "level": entry["level"],
+        "seed": entry["seed"],
+        "moves": entry["moves"][:ticks],
+        "ticks": ticks,
+        "deaths": game.deaths,
+        "hash": state_hash(game.gamelogic),
+    }
+
+def record(args):
+    game = HeadlessGame(args.data_file)
+    levels = args.levels or range(1, game.gamelogic.last_level + 1)
+    recording = []
+    for level in levels:
+        seed = args.seed * 1000 + level
+        moves = args.moves or scripted_moves(args.ticks, seed)
+        recording.append(run(game, {"level": level, "seed": seed, "moves": moves}))
+        print(f"Level {level:3d}: {recording[-1]['ticks']} ticks, {recording[-1]['hash']}")
+    with open(args.recording, "w") as recording_file:
+        json.dump({"data_file": args.data_file, "levels": recording}, recording_file, indent=1)
+    return True
+
+def replay(args):
+    with open(args.recording) as recording_file:
+        recording = json.load(recording_file)
+    game = HeadlessGame(args.data_file or recording["data_file"])
+    ticks = 0
+    failures = 0
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for entry in recording["levels"]:
+            result = run(game, entry)
+            ticks += result["ticks"]
+            if result["hash"] != entry["hash"]:
+                failures += 1
+                print(f"Level {entry['level']:3d}: MISMATCH after {result['ticks']} ticks, "
+                      f"{result['hash']} != {entry['hash']}")
+    elapsed = time.perf_counter() - start
+
+    print(f"{ticks} ticks in {elapsed:.2f}s, {ticks / elapsed:.0f} ticks/s, "
+          f"{game.display.frames} frames, {failures} mismatches")
+    for phase, phase_time in game.phase_times.items():
+        print(f"  {phase:10s} {phase_time * 1000:9.1f}ms "
+              f"{100 * phase_time / elapsed:5.1f}% {phase_time * 1e6 / ticks:8.1f}us/tick")
+    return not failures
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Record and replay headless GameLogic runs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser(
+        "record", help="play levels with scripted input and save the results")
+    record_parser.add_argument("recording", help="JSON file to write")
+    record_parser.add_argument("--levels", type=int, nargs="+",
+                               help="level numbers (default: all)")
+    record_parser.add_argument("--ticks", type=int, default=1000,
+                               help="ticks of scripted input per level (default: 1000)")
+    record_parser.add_argument("--seed", type=int, default=1,
+                               help="seed for input and creatures (default: 1)")
+    record_parser.add_argument("--moves",
+                               help="moves to use instead of scripted input, one per "
+                                    "tick from U, D, L, R, . (none) and r (restart)")
+    record_parser.add_argument("--data-file", default=DATA_FILE,
+                               help=f"level data (default: {DATA_FILE})")
+    record_parser.set_defaults(action=record)
+    replay_parser = subparsers.add_parser(
+        "replay", help="replay a recording, timing it and checking state hashes")
+    replay_parser.add_argument("recording", help="JSON file from record")
+    replay_parser.add_argument("--repeat", type=int, default=1,
+                               help="times to replay the recording (default: 1)")
+    replay_parser.add_argument("--data-file",
+                               help="level data (default: as recorded)")
+    replay_parser.set_defaults(action=replay)
+    args = parser.parse_args()
+    sys.exit(0 if args.action(args) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -2,40 +2,145 @@
 #
 # SPDX-License-Identifier: MIT
 
-import paho.mqtt.publish as publish
+import os
+import threading
 import time
+import paho.mqtt.client as mqtt
 
 AIO_USERNAME = 'YOURUSERNAMEHERE'
 AIO_KEY = 'YOURKEYHERE'
+AIO_HOST = 'io.adafruit.com'
+AIO_PORT = 1883
 
 AIO_TOPIC =       AIO_USERNAME + '/feeds/redlight'
 AIO_YELLOWTOPIC = AIO_USERNAME + '/feeds/yellowlight'
 AIO_GREENTOPIC =  AIO_USERNAME + '/feeds/greenlight'
 
+# seconds the yellow and green lights stay on per event
+PULSE_TIME = 1
+# Lambda freezes the process as soon as the handler returns, so there the
+# handler waits for its pulses to finish; anywhere else they run behind it
+WAIT_FOR_PULSES = 'AWS_LAMBDA_FUNCTION_NAME' in os.environ
+
+
+class Publisher(object):
+	"""One MQTT session kept open across webhooks, connected on first use.
+
+	Publishes use QoS 1 so anything sent while a warm but stale connection
+	is being re-established gets resent once the network thread reconnects.
+	"""
+
+	def __init__(self):
+		self._client = None
+		self._lock = threading.Lock()
+		self._acked = threading.Condition()
+		self.sent = 0
+		self.acked = 0
+
+	def _connect(self):
+		with self._lock:
+			if self._client is None:
+				client = mqtt.Client()
+				client.username_pw_set(AIO_USERNAME, AIO_KEY)
+				client.on_publish = self._on_publish
+				client.connect(AIO_HOST, AIO_PORT)
+				client.loop_start()
+				self._client = client
+		return self._client
+
+	def _on_publish(self, client, userdata, mid):
+		with self._acked:
+			self.acked += 1
+			self._acked.notify_all()
+
+	def publish(self, topic, payload):
+		self._connect().publish(topic, payload=payload, qos=1)
+		with self._acked:
+			self.sent += 1
+
+	def flush(self, timeout=10):
+		"""Wait until the broker has acknowledged everything published"""
+		deadline = time.time() + timeout
+		with self._acked:
+			while self.acked < self.sent and time.time() < deadline:
+				self._acked.wait(deadline - time.time())
+			return self.acked >= self.sent
+
+
+class Pulses(object):
+	"""Turns topics ON now and OFF PULSE_TIME later from a background thread.
+
+	Pulses on a topic that is still ON are coalesced: no second ON is sent,
+	the pending OFF just moves back.
+	"""
+
+	def __init__(self, publisher):
+		self._publisher = publisher
+		self._off_times = {}
+		self._changed = threading.Condition()
+		self._thread = None
+
+	def pulse(self, topic):
+		with self._changed:
+			if topic not in self._off_times:
+				self._publisher.publish(topic, 'ON')
+			self._off_times[topic] = time.time() + PULSE_TIME
+			if self._thread is None:
+				self._thread = threading.Thread(target=self._run)
+				self._thread.daemon = True
+				self._thread.start()
+			self._changed.notify_all()
+
+	def _run(self):
+		with self._changed:
+			while True:
+				if not self._off_times:
+					self._changed.wait()
+					continue
+				topic = min(self._off_times, key=self._off_times.get)
+				delay = self._off_times[topic] - time.time()
+				if delay > 0:
+					self._changed.wait(delay)
+					continue
+				del self._off_times[topic]
+				self._publisher.publish(topic, 'OFF')
+				self._changed.notify_all()
+
+	def wait(self):
+		"""Block until every pending pulse has turned OFF"""
+		with self._changed:
+			while self._off_times:
+				self._changed.wait()
+
+
+# module level, so warm Lambda invocations reuse the connection
+publisher = Publisher()
+pulses = Pulses(publisher)
+
 def webhook_handler(event, context):
 	print('Starting webhook handler!')
 	action = event.get('action')
 	print('Issue action: {0}'.format(action))
-	auth = {'username': AIO_USERNAME, 'password': AIO_KEY}
 
 	# for issues opened & closed
 	if action == 'closed':
-		publish.single(AIO_TOPIC, payload='OFF', hostname='io.adafruit.com', auth=auth)
+		publisher.publish(AIO_TOPIC, 'OFF')
 	elif action in ('opened', 'reopened'):
-		publish.single(AIO_TOPIC, payload='ON', hostname='io.adafruit.com', auth=auth)
+		publisher.publish(AIO_TOPIC, 'ON')
 	# starring & watching
 	elif action == 'started':
-		publish.single(AIO_YELLOWTOPIC, payload='ON', hostname='io.adafruit.com', auth=auth)
-		time.sleep(1)
-		publish.single(AIO_YELLOWTOPIC, payload='OFF', hostname='io.adafruit.com', auth=auth)
+		pulses.pulse(AIO_YELLOWTOPIC)
 	# look for pushes
 	elif "commits" in event:
-		publish.single(AIO_GREENTOPIC, payload='ON', hostname='io.adafruit.com', auth=auth)
-		time.sleep(1)
-		publish.single(AIO_GREENTOPIC, payload='OFF', hostname='io.adafruit.com', auth=auth)
+		pulses.pulse(AIO_GREENTOPIC)
 
+	if WAIT_FOR_PULSES:
+		pulses.wait()
+		publisher.flush()
 	return 'OK'
 
 
 if __name__ == '__main__':
 	webhook_handler({'action': 'started'}, {})
+	pulses.wait()
+	publisher.flush()
@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: 2019 Anne Barela for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Load test for webhook_handler() against a local MQTT broker, for example
+mosquitto running on this machine:
+
+	$ mosquitto -p 1883 &
+	$ python load_test.py --webhooks 2000
+	$ python load_test.py --webhooks 50 --single
+
+Fires a burst of mixed GitHub events (issues opened/closed, stars, pushes)
+through the handler and reports webhooks handled per second, then how long
+the remaining pulses and broker acknowledgements took to drain. --single
+times the old way, one publish.single() connection per light change, with
+the pulse sleep left out.
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import time
+import paho.mqtt.publish as publish
+import code as tower
+
+EVENTS = (
+	{'action': 'opened'},
+	{'action': 'started'},
+	{'commits': []},
+	{'action': 'closed'},
+	{'action': 'started'},
+	{'commits': []},
+)
+
+def single_handler(event, context):
+	"""The original handler without its time.sleep(1)"""
+	action = event.get('action')
+	auth = {'username': tower.AIO_USERNAME, 'password': tower.AIO_KEY}
+	messages = []
+	if action == 'closed':
+		messages = [(tower.AIO_TOPIC, 'OFF')]
+	elif action in ('opened', 'reopened'):
+		messages = [(tower.AIO_TOPIC, 'ON')]
+	elif action == 'started':
+		messages = [(tower.AIO_YELLOWTOPIC, 'ON'), (tower.AIO_YELLOWTOPIC, 'OFF')]
+	elif "commits" in event:
+		messages = [(tower.AIO_GREENTOPIC, 'ON'), (tower.AIO_GREENTOPIC, 'OFF')]
+	for topic, payload in messages:
+		publish.single(topic, payload=payload, hostname=tower.AIO_HOST,
+					   port=tower.AIO_PORT, auth=auth)
+	return 'OK'
+
+def main():
+	parser = argparse.ArgumentParser(description='Webhook handler load test.')
+	parser.add_argument('--host', default='localhost',
+						help='MQTT broker (default: localhost)')
+	parser.add_argument('--port', type=int, default=1883,
+						help='MQTT broker port (default: 1883)')
+	parser.add_argument('--webhooks', type=int, default=1000,
+						help='webhooks to send (default: 1000)')
+	parser.add_argument('--single', action='store_true',
+						help='time one publish.single() per message instead')
+	args = parser.parse_args()
+
+	tower.AIO_HOST = args.host
+	tower.AIO_PORT = args.port
+	tower.WAIT_FOR_PULSES = False
+	handler = single_handler if args.single else tower.webhook_handler
+	events = itertools.islice(itertools.cycle(EVENTS), args.webhooks)
+
+	start = time.time()
+	with contextlib.redirect_stdout(io.StringIO()):
+		for event in events:
+			handler(event, {})
+	handled = time.time() - start
+	print('{} webhooks in {:.3f}s, {:.0f} webhooks/s'.format(
+		args.webhooks, handled, args.webhooks / handled))
+
+	if not args.single:
+		tower.pulses.wait()
+		acked = tower.publisher.flush()
+		print('{} publishes, {} acknowledged, drained {:.3f}s after the burst{}'.format(
+			tower.publisher.sent, tower.publisher.acked,
+			time.time() - start - handled, '' if acked else ' (timed out)'))
+
+if __name__ == '__main__':
+	main()
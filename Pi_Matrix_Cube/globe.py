@@ -45,6 +45,11 @@ or --led-gpio-slowdown=N, and then the following:
                   this relationship). Units for both are arbitrary; use
                   millimeters, inches, whatever, it's the ratio that's
                   important.
+  -n            : Use NumPy renderer. Each frame is one vectorized lookup
+                  into the map for every sample of every face, averaged
+                  per pixel and shown with a single canvas update. Keeps
+                  frame rate up with more antialiasing or larger matrices,
+                  but requires NumPy.
 
 -rgb-matrix has the following single-character abbreviations for
 some configurables: -b (--led-brightness), -c (--led-chain),
@@ -71,6 +76,15 @@ import time
 from rgbmatrix import RGBMatrix, RGBMatrixOptions
 from PIL import Image
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Only required for -n option
+
+# NumPy renderer keeps longitudes as fixed-point integers w/this many
+# fractional bits, so the per-frame rotation is integer add/shift/mod.
+LON_FRACTION_BITS = 12
+
 VERTS = (
     (0, 1, 3),  # Vertex indices for UL, UR, LL of top face matrix
     (0, 4, 1),  # " left
@@ -132,6 +146,10 @@ class Globe:
         self.imgbuf = None  # Image is rendered to this RGB buffer
         self.spin_time = 10.0
         self.chain_length = 6
+        self.map_array = None  # NumPy renderer: map pixels, (N, 3) ndarray
+        self.lon_fixed = None  # NumPy renderer: longitude table, fixed-point
+        self.lat_offset = None  # NumPy renderer: latitude * map width
+        self.frame = None  # NumPy renderer: full canvas RGB buffer
 
     # pylint: disable=too-many-branches, too-many-statements
     def setup(self):
@@ -328,6 +346,11 @@ class Globe:
             default=1.0,
             type=float,
         )
+        parser.add_argument(
+            "-n",
+            action="store_true",
+            help="Use NumPy renderer (faster, requires NumPy)",
+        )
 
         parser.set_defaults(drop_privileges=True)
         parser.set_defaults(pointy=False)
@@ -340,6 +363,10 @@ class Globe:
             )
             return True
 
+        if args.n and np is None:
+            print(os.path.basename(__file__) + ": error: -n requires NumPy")
+            return True
+
         if args.led_chain * args.led_parallel != 6:
             print(
                 os.path.basename(__file__)
@@ -463,11 +490,32 @@ class Globe:
                             )
                             ll_index += 1
 
+        if args.n:
+            self.setup_numpy()
+
         return False
 
+    def setup_numpy(self):
+        """Convert the longitude & latitude tables to integer arrays for
+        render_numpy(), and allocate its reusable full-canvas buffer."""
+        self.map_array = np.frombuffer(self.map_data, dtype=np.uint8).reshape(
+            -1, 3
+        )
+        self.lon_fixed = (
+            np.array(self.longitude) * (1 << LON_FRACTION_BITS)
+        ).astype(np.int32)
+        self.lat_offset = np.array(self.latitude, dtype=np.int32) * self.map_width
+        rows = 6 // self.chain_length
+        self.frame = np.empty(
+            (rows * self.matrix_size, self.chain_length * self.matrix_size, 3),
+            dtype=np.uint8,
+        )
+
     def run(self):
         """Main loop."""
         start_time, frames = time.monotonic(), 0
+        report_time = start_time + 1.0
+        render = self.render if self.frame is None else self.render_numpy
 
         while True:
             elapsed = time.monotonic() - start_time
@@ -490,12 +538,16 @@ class Globe:
             )
             if self.spin_time > 0:
                 loffset = self.map_width - loffset
-            self.render(loffset)
+            render(loffset)
 
             # Swap double-buffered canvas, show frames per second
+            # (once per second, printing is not free)
             self.canvas = self.matrix.SwapOnVSync(self.canvas)
             frames += 1
-            print(frames / (time.monotonic() - start_time))
+            now = time.monotonic()
+            if now >= report_time:
+                print(frames / (now - start_time))
+                report_time = now + 1.0
 
     # pylint: disable=too-many-locals
     def render(self, loffset):
@@ -542,6 +594,38 @@ class Globe:
             yoffset = (face // self.chain_length) * self.matrix_size
             self.canvas.SetImage(image, offset_x=xoffset, offset_y=yoffset)
 
+    def render_numpy(self, loffset):
+        """Vectorized equivalent of render(), using tables from setup_numpy().
+        Rotation is one gather from the map for all samples of all faces,
+        then a mean-reduce over each pixel's samples."""
+        size = self.matrix_size
+        samples = self.samples_per_pixel
+        rows = 6 // self.chain_length
+        column = (
+            (self.lon_fixed + int(loffset * (1 << LON_FRACTION_BITS)))
+            >> LON_FRACTION_BITS
+        ) % self.map_width
+        rgb = self.map_array[self.lat_offset + column]
+        if samples > 1:
+            # uint32, as 255 * samples no longer fits uint16 from -a 17 up
+            rgb = rgb.reshape(-1, samples, 3).sum(axis=1, dtype=np.uint32)
+            rgb = (rgb // samples).astype(np.uint8)
+        # Faces are contiguous in rgb; arrange them as laid out on canvas
+        self.frame.reshape((rows, size, self.chain_length, size, 3))[:] = (
+            rgb.reshape(rows, self.chain_length, size, size, 3)
+            .transpose(0, 2, 1, 3, 4)
+        )
+        image = Image.frombuffer(
+            "RGB",
+            (self.frame.shape[1], self.frame.shape[0]),
+            self.frame,
+            "raw",
+            "RGB",
+            0,
+            1,
+        )
+        self.canvas.SetImage(image)
+
 
 # pylint: disable=superfluous-parens
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: 2022 Phillip Burgess for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Host-side (no matrix needed) check of globe.py. Renders the same frames
+with render() and render_numpy() into a stand-in canvas and compares them,
+including at antialiasing levels where 255 * samples passes 16 bits.
+
+$ python test_globe.py
+"""
+
+import os
+import sys
+import types
+import numpy
+
+class Canvas:
+    """Collects SetImage() calls into one RGB array"""
+    def __init__(self, width, height):
+        self.pixels = numpy.zeros((height, width, 3), dtype=numpy.uint8)
+
+    def SetImage(self, image, offset_x=0, offset_y=0):  # pylint: disable=invalid-name
+        data = numpy.asarray(image.convert("RGB"))
+        height, width = data.shape[:2]
+        self.pixels[offset_y:offset_y + height, offset_x:offset_x + width] = data
+
+class RGBMatrix:
+    """Just enough of rgbmatrix.RGBMatrix for Globe.setup()"""
+    def __init__(self, options):
+        self.width = options.cols * options.chain_length
+        self.height = options.rows * options.parallel
+
+    def CreateFrameCanvas(self):  # pylint: disable=invalid-name
+        return Canvas(self.width, self.height)
+
+try:
+    import rgbmatrix  # pylint: disable=unused-import
+except ImportError:
+    sys.modules["rgbmatrix"] = types.SimpleNamespace(
+        RGBMatrix=RGBMatrix, RGBMatrixOptions=types.SimpleNamespace)
+
+from globe import Globe  # pylint: disable=wrong-import-position
+
+def make_globe(antialias, size=8, chain=3):
+    """Globe at a small matrix size, set up for both renderers"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.argv = ["globe.py", "-n", "-a", str(antialias),
+                "-r", str(size), "--led-cols", str(size),
+                "-c", str(chain), "-P", str(6 // chain),
+                "-i", os.path.join(here, "maps", "earth.jpg")]
+    globe = Globe()
+    assert not globe.setup(), "setup failed"
+    return globe
+
+def render_both(globe, loffset):
+    """Frame from render() and from render_numpy(), each on a new canvas"""
+    height, width = globe.frame.shape[:2]
+    globe.canvas = Canvas(width, height)
+    globe.render(loffset)
+    expected = globe.canvas.pixels.astype(int)
+    globe.canvas = Canvas(width, height)
+    globe.render_numpy(loffset)
+    return expected, globe.canvas.pixels.astype(int)
+
+def check(antialias):
+    globe = make_globe(antialias)
+    worst = 0
+    for loffset in (0.0, 123.4, globe.map_width * 0.75):
+        expected, actual = render_both(globe, loffset)
+        # The fixed-point longitude can land a rare sample on the
+        # neighbouring map column, so allow a few counts on a few pixels.
+        error = numpy.abs(actual - expected)
+        worst = max(worst, error.max())
+        assert error.max() <= 8, \
+            "-a {} max error {}".format(antialias, error.max())
+        assert numpy.mean(error > 0) < 0.01, \
+            "-a {} {:.1%} of values differ".format(antialias, numpy.mean(error > 0))
+    return worst
+
+def main():
+    for antialias in (1, 2, 4, 16, 17, 20):
+        print("-a {:2d}: max error {}".format(antialias, check(antialias)))
+    print("ok")
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,9 @@
 # SPDX-License-Identifier: MIT
 
 import os
+import threading
 import time
+from collections import OrderedDict
 import digitalio
 import board
 from PIL import Image, ImageOps
@@ -18,6 +20,10 @@ cs_pin = digitalio.DigitalInOut(board.CE0)
 dc_pin = digitalio.DigitalInOut(board.D25)
 reset_pin = digitalio.DigitalInOut(board.D24)
 
+# Upper limit on decoded frames held for the current, next and previous
+# Gifs, least recently used Gifs are dropped first
+PREFETCH_BYTES = 32 * 1024 * 1024
+
 def init_button(pin):
     button = digitalio.DigitalInOut(pin)
     button.switch_to_input()
@@ -30,8 +36,94 @@ class Frame:
         self.duration = duration
         self.image = None
 
+class Animation:
+    def __init__(self, frames, loop, nbytes):
+        self.frames = frames
+        self.loop = loop
+        self.nbytes = nbytes
+
 # pylint: enable=too-few-public-methods
 
+class Prefetcher:
+    """Decodes upcoming Gifs on a background thread while the current one
+    plays. Decoded animations are kept within a memory budget, dropping the
+    least recently used ones first, but never the one playing."""
+
+    def __init__(self, decode, budget=PREFETCH_BYTES):
+        self._decode = decode
+        self._budget = budget
+        self._animations = OrderedDict()
+        self._pending = []
+        self._current = None
+        self._decoding = None
+        # Errors from background decodes, raised by get() on the main thread
+        self._errors = {}
+        self._condition = threading.Condition()
+        thread = threading.Thread(target=self._worker, daemon=True)
+        thread.start()
+
+    def get(self, index):
+        with self._condition:
+            self._current = index
+            if index in self._pending:
+                self._pending.remove(index)
+            # Already being decoded in the background, wait for it to finish
+            while self._decoding == index:
+                self._condition.wait()
+            if index in self._errors:
+                raise self._errors.pop(index)
+            if index in self._animations:
+                self._animations.move_to_end(index)
+                return self._animations[index]
+        animation = self._decode(index)
+        with self._condition:
+            self._store(index, animation)
+        return animation
+
+    def prefetch(self, indices):
+        with self._condition:
+            # Replaces any requests that haven't started yet
+            self._pending = [
+                index
+                for index in indices
+                if index != self._current
+                and index not in self._animations
+                and index not in self._errors
+            ]
+            self._condition.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                index = self._pending.pop(0)
+                self._decoding = index
+            animation = error = None
+            try:
+                animation = self._decode(index)
+            except Exception as decode_error:  # pylint: disable=broad-except
+                error = decode_error
+            finally:
+                # Always clear _decoding, or get() would wait on it forever
+                with self._condition:
+                    self._decoding = None
+                    if error is not None:
+                        self._errors[index] = error
+                    elif animation is not None:
+                        self._store(index, animation)
+                    self._condition.notify_all()
+
+    def _store(self, index, animation):
+        # Call with the condition held
+        self._animations[index] = animation
+        total = sum(animation.nbytes for animation in self._animations.values())
+        for key in list(self._animations):
+            if total <= self._budget:
+                break
+            if key != self._current:
+                total -= self._animations.pop(key).nbytes
+
 class AnimatedGif:
     def __init__(self, display, width=None, height=None, folder=None):
         self._frame_count = 0
@@ -40,6 +132,7 @@ class AnimatedGif:
         self._duration = 0
         self._gif_files = []
         self._frames = []
+        self._prefetcher = Prefetcher(self.decode)
 
         if width is not None:
             self._width = width
@@ -76,24 +169,23 @@ class AnimatedGif:
             print("No Gif files found in current folder")
             exit()  # pylint: disable=consider-using-sys-exit
 
-    def preload(self):
-        image = Image.open(self._gif_files[self._index])
-        print("Loading {}...".format(self._gif_files[self._index]))
+    def decode(self, index):
+        # Runs on the prefetch thread too, so only touches its own locals
+        image = Image.open(self._gif_files[index])
         if "duration" in image.info:
-            self._duration = image.info["duration"]
+            duration = image.info["duration"]
         else:
-            self._duration = 0
+            duration = 0
         if "loop" in image.info:
-            self._loop = image.info["loop"]
+            loop = image.info["loop"]
         else:
-            self._loop = 1
-        self._frame_count = image.n_frames
-        self._frames.clear()
-        for frame in range(self._frame_count):
+            loop = 1
+        frames = []
+        for frame in range(image.n_frames):
             image.seek(frame)
             # Create blank image for drawing.
             # Make sure to create image with mode 'RGB' for full color.
-            frame_object = Frame(duration=self._duration)
+            frame_object = Frame(duration=duration)
             if "duration" in image.info:
                 frame_object.duration = image.info["duration"]
             frame_object.image = ImageOps.pad(  # pylint: disable=no-member
@@ -103,7 +195,21 @@ class AnimatedGif:
                 color=(0, 0, 0),
                 centering=(0.5, 0.5),
             )
-            self._frames.append(frame_object)
+            frames.append(frame_object)
+        image.close()
+        return Animation(frames, loop, len(frames) * self._width * self._height * 3)
+
+    def preload(self):
+        print("Loading {}...".format(self._gif_files[self._index]))
+        animation = self._prefetcher.get(self._index)
+        self._frames = animation.frames
+        self._loop = animation.loop
+        self._frame_count = len(self._frames)
+        # Decode the neighbours while this one plays
+        count = len(self._gif_files)
+        self._prefetcher.prefetch(
+            [(self._index + 1) % count, (self._index - 1 + count) % count]
+        )
 
     def play(self):
         self.preload()
@@ -114,9 +220,13 @@ class AnimatedGif:
         if not self._gif_files:
             print("There are no Gif Images loaded to Play")
             return False
+        deadline = time.monotonic()
         while True:
             for frame_object in self._frames:
-                start_time = time.monotonic()
+                # Each frame is due one duration after the previous one was
+                # due, so display update time comes out of the delay instead
+                # of adding to it. Restart the schedule if running late.
+                deadline = max(deadline, time.monotonic())
                 self.display.image(frame_object.image)
                 _cur_advance_btn_val = self.advance_button.value
                 _cur_back_btn_val = self.back_button.value
@@ -129,8 +239,11 @@ class AnimatedGif:
 
                 _prev_back_btn_val = _cur_back_btn_val
                 _prev_advance_btn_val = _cur_advance_btn_val
-                while time.monotonic() < (start_time + frame_object.duration / 1000):
-                    pass
+                deadline += frame_object.duration / 1000
+                # Sleep rather than spin so the prefetch thread can run
+                remaining_delay = deadline - time.monotonic()
+                if remaining_delay > 0:
+                    time.sleep(remaining_delay)
 
             if self._loop == 1:
                 return True
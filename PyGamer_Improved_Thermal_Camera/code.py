@@ -9,7 +9,9 @@ PyGamer/PyBadge Thermal Camera Project
 
 import time
 import gc
+import math
 import board
+import bitmaptools
 import keypad
 import busio
 from ulab import numpy as np
@@ -17,10 +19,9 @@ import displayio
 import neopixel
 from analogio import AnalogIn
 from digitalio import DigitalInOut
-from simpleio import map_range, tone
+from simpleio import tone
 from adafruit_display_text.label import Label
 from adafruit_bitmap_font import bitmap_font
-from adafruit_display_shapes.rect import Rect
 import adafruit_amg88xx
 from index_to_rgb.iron import index_to_rgb
 from thermalcamera_converters import celsius_to_fahrenheit, fahrenheit_to_celsius
@@ -87,11 +88,13 @@ board.DISPLAY.root_group = splash
 SENSOR_AXIS = 8
 
 # Display grid parameters
-GRID_AXIS = (2 * SENSOR_AXIS) - 1  # Number of cells per axis
+INTERPOLATION = 2  # Cells per sensor pixel step; 2 gives 15x15, 4 gives 29x29
+GRID_AXIS = (INTERPOLATION * (SENSOR_AXIS - 1)) + 1  # Number of cells per axis
 GRID_SIZE = HEIGHT  # Axis size (pixels) for a square grid
 GRID_X_OFFSET = WIDTH - GRID_SIZE  # Right-align grid with display boundary
 CELL_SIZE = GRID_SIZE // GRID_AXIS  # Size of a grid cell in pixels
 PALETTE_SIZE = 100  # Number of display colors in spectral palette (must be > 0)
+BLACK_INDEX = PALETTE_SIZE + 1  # Palette index after the spectrum
 
 # Set up the 2-D sensor data narray
 SENSOR_DATA = np.array(range(SENSOR_AXIS**2)).reshape((SENSOR_AXIS, SENSOR_AXIS))
@@ -99,8 +102,8 @@ SENSOR_DATA = np.array(range(SENSOR_AXIS**2)).reshape((SENSOR_AXIS, SENSOR_AXIS)
 GRID_DATA = np.array(range(GRID_AXIS**2)).reshape((GRID_AXIS, GRID_AXIS)) / (
     GRID_AXIS**2
 )
-# Set up the histogram accumulation narray
-# HISTOGRAM = np.zeros(GRID_AXIS)
+# Spectrum palette index of each histogram column
+HISTO_COLORS = [round(_col / GRID_AXIS * PALETTE_SIZE) for _col in range(GRID_AXIS)]
 
 # Convert default alarm and min/max range values from config file
 ALARM_C = fahrenheit_to_celsius(ALARM_F)
@@ -136,15 +139,15 @@ def flash_status(text="", duration=0.05):
 
 def update_image_frame(selfie=False):
     """Get camera data and update display"""
-    for _row in range(0, GRID_AXIS):
-        for _col in range(0, GRID_AXIS):
-            if selfie:
-                color_index = GRID_DATA[GRID_AXIS - 1 - _row][_col]
-            else:
-                color_index = GRID_DATA[GRID_AXIS - 1 - _row][GRID_AXIS - 1 - _col]
-            color = index_to_rgb(round(color_index * PALETTE_SIZE, 0) / PALETTE_SIZE)
-            if color != image_group[((_row * GRID_AXIS) + _col)].fill:
-                image_group[((_row * GRID_AXIS) + _col)].fill = color
+    # Quantize the whole grid to spectrum palette indices in one pass; the
+    # palette's index_to_rgb() clamps the same way, so clip to its ends
+    color_indices = np.array(
+        np.clip(GRID_DATA * PALETTE_SIZE + 0.5, 0, PALETTE_SIZE), dtype=np.uint8
+    )
+    bitmaptools.arrayblit(image_bitmap, color_indices)
+    # The camera sees the scene mirrored; let the tile grid flip it
+    image_tile.flip_x = not selfie
+    image_tile.flip_y = True
 
 
 def update_histo_frame():
@@ -152,37 +155,45 @@ def update_histo_frame():
     min_histo.text = str(MIN_RANGE_F)  # Display the legend
     max_histo.text = str(MAX_RANGE_F)
 
-    histogram = np.zeros(GRID_AXIS)  # Clear histogram accumulation array
-    # Collect camera data and calculate the histogram
-    for _row in range(0, GRID_AXIS):
-        for _col in range(0, GRID_AXIS):
-            histo_index = int(map_range(GRID_DATA[_col, _row], 0, 1, 0, GRID_AXIS - 1))
-            histogram[histo_index] = histogram[histo_index] + 1
+    # Collect camera data and calculate the histogram; ulab has no bincount,
+    # so bin the whole grid at once and count each bin with one comparison
+    histo_indices = np.array(
+        np.clip(GRID_DATA * (GRID_AXIS - 1), 0, GRID_AXIS - 1), dtype=np.uint8
+    )
+    histogram = [np.sum(histo_indices == _col) for _col in range(GRID_AXIS)]
 
-    histo_scale = np.max(histogram) / (GRID_AXIS - 1)
+    histo_scale = max(histogram) / (GRID_AXIS - 1)
     if histo_scale <= 0:
         histo_scale = 1
 
-    # Display the histogram
+    # Display the histogram, one black and one colored run per column
+    image_tile.flip_x = False
+    image_tile.flip_y = False
     for _col in range(0, GRID_AXIS):
-        for _row in range(0, GRID_AXIS):
-            if histogram[_col] / histo_scale > GRID_AXIS - 1 - _row:
-                image_group[((_row * GRID_AXIS) + _col)].fill = index_to_rgb(
-                    round((_col / GRID_AXIS), 3)
-                )
-            else:
-                image_group[((_row * GRID_AXIS) + _col)].fill = BLACK
+        bar_top = max(0, math.floor(GRID_AXIS - 1 - histogram[_col] / histo_scale) + 1)
+        bitmaptools.fill_region(image_bitmap, _col, 0, _col + 1, bar_top, BLACK_INDEX)
+        bitmaptools.fill_region(
+            image_bitmap, _col, bar_top, _col + 1, GRID_AXIS, HISTO_COLORS[_col]
+        )
 
 
 def ulab_bilinear_interpolation():
-    """2x bilinear interpolation to upscale the sensor data array; by @v923z
-    and @David.Glaude."""
-    GRID_DATA[1::2, ::2] = SENSOR_DATA[:-1, :]
-    GRID_DATA[1::2, ::2] += SENSOR_DATA[1:, :]
-    GRID_DATA[1::2, ::2] /= 2
-    GRID_DATA[::, 1::2] = GRID_DATA[::, :-1:2]
-    GRID_DATA[::, 1::2] += GRID_DATA[::, 2::2]
-    GRID_DATA[::, 1::2] /= 2
+    """Bilinear interpolation to upscale the sensor data array by
+    INTERPOLATION; based on the 2x version by @v923z and @David.Glaude."""
+    for step in range(1, INTERPOLATION):
+        weight = step / INTERPOLATION
+        GRID_DATA[step::INTERPOLATION, ::INTERPOLATION] = SENSOR_DATA[:-1, :] * (
+            1 - weight
+        )
+        GRID_DATA[step::INTERPOLATION, ::INTERPOLATION] += SENSOR_DATA[1:, :] * weight
+    for step in range(1, INTERPOLATION):
+        weight = step / INTERPOLATION
+        GRID_DATA[::, step::INTERPOLATION] = GRID_DATA[::, :-1:INTERPOLATION] * (
+            1 - weight
+        )
+        GRID_DATA[::, step::INTERPOLATION] += (
+            GRID_DATA[::, INTERPOLATION::INTERPOLATION] * weight
+        )
 
 
 # pylint: disable=too-many-branches
@@ -210,10 +221,10 @@ def setup_mode():
         while setup_state == "SELECT_PARAM":
             param_index = max(0, min(2, param_index))
             status_label.text = SETUP_COLORS[param_index][0]
-            image_group[param_index + 226].color = BLACK
+            param_labels[param_index].color = BLACK
             status_label.color = BLACK
             time.sleep(0.25)
-            image_group[param_index + 226].color = SETUP_COLORS[param_index][1]
+            param_labels[param_index].color = SETUP_COLORS[param_index][1]
             status_label.color = WHITE
             time.sleep(0.25)
 
@@ -233,15 +244,15 @@ def setup_mode():
                     setup_state = "EXIT"  # Next state
 
         # Adjust parameter value
-        param_value = int(image_group[param_index + 230].text)
+        param_value = int(param_values[param_index].text)
 
         while setup_state == "ADJUST_VALUE":
             param_value = max(32, min(157, param_value))
-            image_group[param_index + 230].text = str(param_value)
-            image_group[param_index + 230].color = BLACK
+            param_values[param_index].text = str(param_value)
+            param_values[param_index].color = BLACK
             status_label.color = BLACK
             time.sleep(0.05)
-            image_group[param_index + 230].color = SETUP_COLORS[param_index][1]
+            param_values[param_index].color = SETUP_COLORS[param_index][1]
             status_label.color = WHITE
             time.sleep(0.2)
 
@@ -290,83 +301,82 @@ play_tone(880, 0.1)  # Musical note A5
 mkr_t0 = time.monotonic()  # Time marker: Define Display Elements
 image_group = displayio.Group(scale=1)
 
-# Define the foundational thermal image grid cells; image_group[0:224]
-#   image_group[#] = image_group[ (row * GRID_AXIS) + column ]
-for row in range(0, GRID_AXIS):
-    for col in range(0, GRID_AXIS):
-        cell_x = (col * CELL_SIZE) + GRID_X_OFFSET
-        cell_y = row * CELL_SIZE
-        cell = Rect(
-            x=cell_x,
-            y=cell_y,
-            width=CELL_SIZE,
-            height=CELL_SIZE,
-            fill=None,
-            outline=None,
-            stroke=0,
-        )
-        image_group.append(cell)
+# Define the foundational thermal image grid; image_group[0]
+#   one bitmap pixel per grid cell, scaled up to CELL_SIZE by its group
+image_palette = displayio.Palette(BLACK_INDEX + 1)
+for index in range(0, PALETTE_SIZE + 1):
+    image_palette[index] = index_to_rgb(index / PALETTE_SIZE)
+image_palette[BLACK_INDEX] = BLACK
+image_bitmap = displayio.Bitmap(GRID_AXIS, GRID_AXIS, BLACK_INDEX + 1)
+image_tile = displayio.TileGrid(image_bitmap, pixel_shader=image_palette)
+image_cells = displayio.Group(scale=CELL_SIZE, x=GRID_X_OFFSET)
+image_cells.append(image_tile)
+image_group.append(image_cells)
 
 # Define labels and values
 status_label = Label(font_0, text="", color=None)
 status_label.anchor_point = (0.5, 0.5)
 status_label.anchored_position = ((WIDTH // 2) + (GRID_X_OFFSET // 2), HEIGHT // 2)
-image_group.append(status_label)  # image_group[225]
+image_group.append(status_label)  # image_group[1]
 
 alarm_label = Label(font_0, text="alm", color=WHITE)
 alarm_label.anchor_point = (0, 0)
 alarm_label.anchored_position = (1, 16)
-image_group.append(alarm_label)  # image_group[226]
+image_group.append(alarm_label)  # image_group[2]
 
 max_label = Label(font_0, text="max", color=RED)
 max_label.anchor_point = (0, 0)
 max_label.anchored_position = (1, 46)
-image_group.append(max_label)  # image_group[227]
+image_group.append(max_label)  # image_group[3]
 
 min_label = Label(font_0, text="min", color=CYAN)
 min_label.anchor_point = (0, 0)
 min_label.anchored_position = (1, 106)
-image_group.append(min_label)  # image_group[228]
+image_group.append(min_label)  # image_group[4]
 
 ave_label = Label(font_0, text="ave", color=YELLOW)
 ave_label.anchor_point = (0, 0)
 ave_label.anchored_position = (1, 76)
-image_group.append(ave_label)  # image_group[229]
+image_group.append(ave_label)  # image_group[5]
 
 alarm_value = Label(font_0, text=str(ALARM_F), color=WHITE)
 alarm_value.anchor_point = (0, 0)
 alarm_value.anchored_position = (1, 5)
-image_group.append(alarm_value)  # image_group[230]
+image_group.append(alarm_value)  # image_group[6]
 
 max_value = Label(font_0, text=str(MAX_RANGE_F), color=RED)
 max_value.anchor_point = (0, 0)
 max_value.anchored_position = (1, 35)
-image_group.append(max_value)  # image_group[231]
+image_group.append(max_value)  # image_group[7]
 
 min_value = Label(font_0, text=str(MIN_RANGE_F), color=CYAN)
 min_value.anchor_point = (0, 0)
 min_value.anchored_position = (1, 95)
-image_group.append(min_value)  # image_group[232]
+image_group.append(min_value)  # image_group[8]
 
 ave_value = Label(font_0, text="---", color=YELLOW)
 ave_value.anchor_point = (0, 0)
 ave_value.anchored_position = (1, 65)
-image_group.append(ave_value)  # image_group[233]
+image_group.append(ave_value)  # image_group[9]
 
 min_histo = Label(font_0, text="", color=None)
 min_histo.anchor_point = (0, 0.5)
 min_histo.anchored_position = (GRID_X_OFFSET, 121)
-image_group.append(min_histo)  # image_group[234]
+image_group.append(min_histo)  # image_group[10]
 
 max_histo = Label(font_0, text="", color=None)
 max_histo.anchor_point = (1, 0.5)
 max_histo.anchored_position = (WIDTH - 2, 121)
-image_group.append(max_histo)  # image_group[235]
+image_group.append(max_histo)  # image_group[11]
 
 range_histo = Label(font_0, text="-RANGE-", color=None)
 range_histo.anchor_point = (0.5, 0.5)
 range_histo.anchored_position = ((WIDTH // 2) + (GRID_X_OFFSET // 2), 121)
-image_group.append(range_histo)  # image_group[236]
+image_group.append(range_histo)  # image_group[12]
+
+# Setup mode parameter labels and values, in SETUP_COLORS order
+param_labels = (alarm_label, max_label, min_label)
+param_values = (alarm_value, max_value, min_value)
 
 # ###--- PRIMARY PROCESS SETUP ---###
 mkr_t1 = time.monotonic()  # Time marker: Primary Process Setup
@@ -410,8 +420,8 @@ while True:
     # Normalize temperature to index values and interpolate
     mkr_t5 = time.monotonic()  # Time marker: Normalize and Interpolate
     SENSOR_DATA = (SENSOR_DATA - MIN_RANGE_C) / (MAX_RANGE_C - MIN_RANGE_C)
-    GRID_DATA[::2, ::2] = SENSOR_DATA  # Copy sensor data to the grid array
-    ulab_bilinear_interpolation()  # Interpolate to produce 15x15 result
+    GRID_DATA[::INTERPOLATION, ::INTERPOLATION] = SENSOR_DATA  # Copy sensor data to the grid
+    ulab_bilinear_interpolation()  # Interpolate to produce GRID_AXIS x GRID_AXIS result
 
     # Display image or histogram
     mkr_t6 = time.monotonic()  # Time marker: Display Image
@@ -8,6 +8,7 @@ import array
 import math
 import gc
 import board
+import bitmaptools
 import busio
 import audioio
 import audiocore
@@ -132,6 +133,8 @@ class ReflowOvenControl(object):
             self.config = json.load(fpr)
             fpr.close()
         self.sensor_status = False
+        self.setpoints = None
+        self.setpoints_profile = None
         with open("/profiles/" + self.config["profile"] + ".json", mode="r") as fpr:
             self.sprofile = json.load(fpr)
             fpr.close()
@@ -148,7 +151,7 @@ class ReflowOvenControl(object):
         self.beep = Beep()
         self.set_state("ready")
         if self.sensor_status:
-            if self.sensor.temperature >= 50:
+            if self.offtemp >= 50:
                 self.last_state = "wait"
                 self.set_state("wait")
 
@@ -157,18 +160,27 @@ class ReflowOvenControl(object):
         self.offtime = 0
         self.enable(False)
         self.reflow_start = 0
-
-    def get_profile_temp(self, seconds):
-        x1 = self.sprofile["profile"][0][0]
-        y1 = self.sprofile["profile"][0][1]
-        for point in self.sprofile["profile"]:
+        if self.setpoints_profile is not self.sprofile:
+            self.compile_profile()
+
+    def compile_profile(self):
+        """Interpolate the profile points once into a setpoint per second"""
+        points = self.sprofile["profile"]
+        self.setpoints = array.array("H", [0] * points[-1][0])
+        x1 = points[0][0]
+        y1 = points[0][1]
+        for point in points:
             x2 = point[0]
             y2 = point[1]
-            if x1 <= seconds < x2:
-                temp = y1 + (y2 - y1) * (seconds - x1) // (x2 - x1)
-                return temp
+            for seconds in range(x1, x2):
+                self.setpoints[seconds] = int(y1 + (y2 - y1) * (seconds - x1) // (x2 - x1))
             x1 = x2
             y1 = y2
+        self.setpoints_profile = self.sprofile
+
+    def get_profile_temp(self, seconds):
+        if 0 <= seconds < len(self.setpoints):
+            return self.setpoints[seconds]
         return 0
 
     def set_state(self, state):
@@ -177,16 +189,18 @@ class ReflowOvenControl(object):
         self.last_state = state
 
     # pylint: disable=too-many-branches, too-many-statements
-    def check_state(self):
-        try:
-            temp = self.sensor.temperature
-        except AttributeError:
-            temp = 32  # sensor not available, use 32 for testing
-            self.sensor_status = False
-            # message.text = "Temperature sensor missing"
+    def check_state(self, temp=None):
+        # read the sensor once per check, unless the caller already has
+        if temp is None:
+            try:
+                temp = self.sensor.temperature
+            except AttributeError:
+                temp = 32  # sensor not available, use 32 for testing
+                self.sensor_status = False
+                # message.text = "Temperature sensor missing"
         self.beep.refresh()
         if self.state == "wait":
-            self.enable(False)
+            self.enable(False, temp)
             if self.state != self.last_state:
                 # change in status, time for a beep!
                 self.beep.play(0.1)
@@ -197,12 +211,12 @@ class ReflowOvenControl(object):
                 timer_data.text = format_time(0)
 
         if self.state == "ready":
-            self.enable(False)
+            self.enable(False, temp)
         if self.state == "start" and temp >= 50:
             self.set_state("preheat")
         if self.state == "start":
             message.text = "Starting"
-            self.enable(True)
+            self.enable(True, temp)
         if self.state == "preheat" and temp >= self.sprofile["stages"]["soak"][1]:
             self.set_state("soak")
         if self.state == "preheat":
@@ -228,56 +242,54 @@ class ReflowOvenControl(object):
             if self.last_state != "reflow":
                 self.reflow_start = time.monotonic()
         if self.state == "cool":
-            self.enable(False)
+            self.enable(False, temp)
             message.text = "Cool Down, Open Door"
 
         if self.state in ("start", "preheat", "soak", "reflow"):
             if self.state != self.last_state:
                 # change in status, time for a beep!
                 self.beep.play(0.1)
-            # oven temp control here
-            # check range of calibration to catch any humps in the graph
-            checktime = 0
-            checktimemax = self.config["calibrate_seconds"]
-            checkoven = False
-            if not self.control:
-                checktimemax = max(
-                    0,
-                    self.config["calibrate_seconds"]
-                    - (time.monotonic() - self.offtime),
-                )
-            while checktime <= checktimemax:
-                check_temp = self.get_profile_temp(int(timediff + checktime))
-                if (
-                    temp + self.config["calibrate_temp"] * checktime / checktimemax
-                    < check_temp
-                ):
-                    checkoven = True
-                    break
-                checktime += 5
-            if not checkoven:
-                # hold oven temperature
-                if (
-                    self.state in ("start", "preheat", "soak")
-                    and self.offtemp > self.sensor.temperature
-                ):
-                    checkoven = True
-            self.enable(checkoven)
-
-    # turn oven on or off
-    def enable(self, enable):
+            self.enable(self.heat_needed(temp), temp)
+
+    def heat_needed(self, temp):
+        """Oven temp control: should the oven be on, given the current temp"""
+        # check range of calibration to catch any humps in the graph
+        checktime = 0
+        checktimemax = self.config["calibrate_seconds"]
+        if not self.control:
+            checktimemax = max(
+                0,
+                self.config["calibrate_seconds"]
+                - (time.monotonic() - self.offtime),
+            )
+        while checktime <= checktimemax:
+            check_temp = self.get_profile_temp(int(timediff + checktime))
+            # checktimemax is 0 once the oven has been off long enough
+            rise = 0
+            if checktime:
+                rise = self.config["calibrate_temp"] * checktime / checktimemax
+            if temp + rise < check_temp:
+                return True
+            checktime += 5
+        # hold oven temperature
+        return self.state in ("start", "preheat", "soak") and self.offtemp > temp
+
+    # turn oven on or off, temp saves reading the sensor again
+    def enable(self, enable, temp=None):
         try:
             self.oven.value = enable
             self.control = enable
+            if temp is None:
+                temp = self.sensor.temperature
             if enable:
                 self.offtime = 0
                 self.ontime = time.monotonic()
-                self.ontemp = self.sensor.temperature
+                self.ontemp = temp
                 print("oven on")
             else:
                 self.offtime = time.monotonic()
                 self.ontime = 0
-                self.offtemp = self.sensor.temperature
+                self.offtemp = temp
                 print("oven off")
         except AttributeError:
             # bad sensor
@@ -355,23 +367,20 @@ class Graph(object):
         if y is None:
             return
         offset = size // 2
-        for xx in range(x - offset, x + offset + 1):
-            if xx in range(self.xstart, self.xstart + self.width):
-                for yy in range(y - offset, y + offset + 1):
-                    if yy in range(self.ystart, self.ystart + self.height):
-                        try:
-                            yy = GHEIGHT - yy
-                            plot[xx, yy] = color
-                        except IndexError:
-                            pass
+        # clip the point to the graph, then to the plot bitmap (flipped in y)
+        x1 = max(x - offset, self.xstart, 0)
+        x2 = min(x + offset + 1, self.xstart + self.width, GWIDTH)
+        y1 = max(GHEIGHT - min(y + offset, self.ystart + self.height - 1), 0)
+        y2 = min(GHEIGHT - max(y - offset, self.ystart) + 1, GHEIGHT)
+        if x1 < x2 and y1 < y2:
+            bitmaptools.fill_region(plot, x1, y1, x2, y2, color)
 
 
 def draw_profile(graph, profile):
     global label_reflow
 
     """Update the display with current info."""
-    for i in range(GWIDTH * GHEIGHT):
-        plot[i] = 0
+    plot.fill(0)
 
     # draw stage lines
     # preheat
@@ -772,9 +781,10 @@ def default_view():
             board.DISPLAY.refresh_soon()
         oven.beep.refresh()  # this allows beeps less than one second in length
         try:
-            oven_temp = int(oven.sensor.temperature)
+            temp = oven.sensor.temperature
+            oven_temp = int(temp)
         except AttributeError:
-            oven_temp = 32  # testing
+            temp = oven_temp = 32  # testing
             oven.sensor_status = False
             message.text = "Bad/missing temp sensor"
         if oven.control != last_control:
@@ -845,7 +855,7 @@ def default_view():
             # update once per second when oven is active
             if oven.state != "ready" and time.monotonic() - second_timer >= 1.0:
                 second_timer = time.monotonic()
-                oven.check_state()
+                oven.check_state(temp)
                 if oven.state == "preheat" and last_state != "preheat":
                     timer = time.monotonic()  # reset timer at start of preheat
                 timediff = int(time.monotonic() - timer)
@@ -0,0 +1,270 @@
+# SPDX-FileCopyrightText: 2019 Dan Cogliano for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Host-side (CPython, NOT CircuitPython) reflow simulator for code.py.
+
+Runs the ReflowOvenControl class from code.py, unchanged, against a thermal
+model of a toaster oven standing in for the MCP9600 and the power relay.
+Whole profiles run at many times real time, and each run reports how
+closely the oven followed the profile and what each control check cost.
+
+New control strategies can be tried by subclassing ReflowOvenControl and
+overriding heat_needed(), see STRATEGIES below.
+
+$ python oven_sim.py
+$ python oven_sim.py --profile sn42bi573ag04 --strategy setpoint
+$ python oven_sim.py --all --trace run.csv
+"""
+
+import argparse
+import array
+import ast
+import contextlib
+import io
+import json
+import os
+import time
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class OvenModel:
+    """Toaster oven as two thermal masses: the heating elements, and the air
+    and board the thermocouple sees. Heat stored in the elements keeps the
+    oven rising after the relay opens, which is the overshoot that
+    codecalibrate measures for config.json."""
+
+    # pylint: disable=too-many-instance-attributes, too-many-arguments
+    def __init__(self, power=1500, ambient=25, element_mass=300,
+                 coupling=30, oven_mass=600, loss=3, door_loss=30):
+        self.power = power                  # W with the relay closed
+        self.ambient = ambient              # C
+        self.element_mass = element_mass    # J/C
+        self.coupling = coupling            # W/C, elements to oven
+        self.oven_mass = oven_mass          # J/C
+        self.loss = loss                    # W/C, oven to room
+        self.door_loss = door_loss          # W/C, oven to room, door open
+        self.element_temp = ambient
+        self.oven_temp = ambient
+        self.door_open = False
+        self.relay = types.SimpleNamespace(value=False, direction=None)
+        self.sensor = ThermocoupleModel(self)
+        self.switches = 0
+
+    def step(self, seconds):
+        heat = self.coupling * (self.element_temp - self.oven_temp)
+        loss = (self.door_loss if self.door_open else self.loss) * (
+            self.oven_temp - self.ambient)
+        self.element_temp += (self.power * self.relay.value - heat) * seconds / self.element_mass
+        self.oven_temp += (heat - loss) * seconds / self.oven_mass
+
+
+class ThermocoupleModel:
+    """MCP9600 stand-in, reading the oven model at the chip's resolution"""
+
+    def __init__(self, model):
+        self.model = model
+        self.reads = 0
+
+    @property
+    def temperature(self):
+        self.reads += 1
+        return round(self.model.oven_temp * 16) / 16
+
+
+class SimClock:
+    """Stands in for the time module, so the controller sees simulated time"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class SilentBeep:
+    def play(self, duration=0.1):
+        pass
+
+    def stop(self):
+        pass
+
+    def refresh(self):
+        pass
+
+
+def load_controller(model, clock):
+    """Build ReflowOvenControl from code.py with the hardware replaced by
+    the model, returning the namespace it runs in"""
+    with open(os.path.join(HERE, "code.py")) as source_file:
+        tree = ast.parse(source_file.read())
+    body = [node for node in tree.body
+            if isinstance(node, ast.ClassDef) and node.name == "ReflowOvenControl"]
+
+    def board_open(path, mode="r"):
+        return open(os.path.join(HERE, path.lstrip("/")), mode)
+
+    namespace = {
+        "__name__": "code",
+        "array": array,
+        "json": json,
+        "open": board_open,
+        "print": lambda *args, **kwargs: None,
+        "time": clock,
+        "board": types.SimpleNamespace(D4="D4", SCL="SCL", SDA="SDA"),
+        "busio": types.SimpleNamespace(I2C=lambda *args, **kwargs: None),
+        "digitalio": types.SimpleNamespace(
+            DigitalInOut=lambda pin: model.relay,
+            Direction=types.SimpleNamespace(OUTPUT="output")),
+        "MCP9600": lambda *args: model.sensor,
+        "Beep": SilentBeep,
+        "message": types.SimpleNamespace(text=""),
+        "timer_data": types.SimpleNamespace(text=""),
+        "sgraph": None,
+        "draw_profile": lambda graph, profile: None,
+        "format_time": lambda seconds: "",
+        "timediff": 0,
+    }
+    exec(compile(ast.Module(body, []), "code.py", "exec"), namespace)  # pylint: disable=exec-used
+    return namespace
+
+
+def setpoint_strategy(base, namespace):
+    class SetpointControl(base):
+        """Plain on/off around the current setpoint, no look-ahead"""
+
+        def heat_needed(self, temp):
+            return temp < self.get_profile_temp(namespace["timediff"])
+
+    return SetpointControl
+
+
+# name: function(ReflowOvenControl, its namespace) returning the class to run
+STRATEGIES = {
+    "lookahead": lambda base, namespace: base,     # code.py as it is
+    "setpoint": setpoint_strategy,
+}
+
+
+# pylint: disable=too-many-locals
+def simulate(profile_name, strategy="lookahead", step=0.1, model=None):
+    """Run one profile from a cold start until cool down, returning a summary
+    and the per second trace"""
+    model = model or OvenModel()
+    clock = SimClock()
+    namespace = load_controller(model, clock)
+    controller = STRATEGIES[strategy](namespace["ReflowOvenControl"], namespace)
+    oven = controller("D4")
+    namespace["oven"] = oven
+    if profile_name != oven.config["profile"]:
+        # as change_profile() does
+        with open(os.path.join(HERE, "profiles", profile_name + ".json")) as profile_file:
+            oven.sprofile = json.load(profile_file)
+        oven.reset()
+    profile = oven.sprofile
+    end_time = profile["time_range"][1]
+
+    trace = []
+    check_times = []
+    reads = model.sensor.reads
+    last_relay = model.relay.value
+    steps_per_second = round(1 / step)
+    oven.set_state("start")
+    timer = clock.now
+    last_state = oven.state
+    while namespace["timediff"] < end_time:
+        for _ in range(steps_per_second):
+            model.step(step)
+            clock.sleep(step)
+        # once a second, as default_view() does
+        temp = model.sensor.temperature
+        start = time.perf_counter()
+        oven.check_state(temp)
+        check_times.append(time.perf_counter() - start)
+        if oven.state == "preheat" and last_state != "preheat":
+            timer = clock.now
+        last_state = oven.state
+        namespace["timediff"] = int(clock.now - timer)
+        model.door_open = oven.state == "cool"
+        if model.relay.value != last_relay:
+            model.switches += 1
+            last_relay = model.relay.value
+        trace.append((namespace["timediff"], temp, oven.get_profile_temp(namespace["timediff"]),
+                      oven.state, model.relay.value))
+        if oven.state == "cool" and temp < profile["stages"]["preheat"][1]:
+            break
+
+    # how well the oven tracks the rising part of the profile, after that
+    # the setpoint falls faster than a closed oven can cool
+    profile_peak = max(profile["profile"], key=lambda point: point[1])
+    active = [(temp - setpoint, seconds) for seconds, temp, setpoint, state, _ in trace
+              if state in ("preheat", "soak", "reflow") and seconds <= profile_peak[0]]
+    peak = max(trace, key=lambda row: row[1])
+    return {
+        "profile": profile_name,
+        "strategy": strategy,
+        "seconds": clock.now,
+        "final_state": oven.state,
+        "checks": len(check_times),
+        "check_us": 1e6 * sum(check_times) / len(check_times),
+        "check_max_us": 1e6 * max(check_times),
+        "reads_per_check": (model.sensor.reads - reads) / len(check_times),
+        "switches": model.switches,
+        "overshoot": max(active)[0] if active else 0,
+        "undershoot": -min(active)[0] if active else 0,
+        "peak": peak[1],
+        "peak_time": peak[0],
+        "profile_peak": profile_peak[1],
+        "above_melting": sum(1 for row in trace if row[1] >= profile["melting_point"]),
+    }, trace
+
+
+def report(summary, wall):
+    print("{profile} ({strategy}): {final_state} after {seconds:.0f}s simulated".format(**summary)
+          + ", {:.0f}x real time".format(summary["seconds"] / wall))
+    print("  peak {peak:.1f}C at {peak_time}s (profile {profile_peak}C), "
+          "{above_melting}s above melting point".format(**summary))
+    print("  overshoot {overshoot:.1f}C, undershoot {undershoot:.1f}C, "
+          "{switches} relay switches".format(**summary))
+    print("  {checks} checks, {check_us:.1f}us mean, {check_max_us:.1f}us max, "
+          "{reads_per_check:.2f} sensor reads per check".format(**summary))
+
+
+def main():
+    profiles = sorted(name[:-5] for name in os.listdir(os.path.join(HERE, "profiles"))
+                      if name.endswith(".json"))
+    with open(os.path.join(HERE, "config.json")) as config_file:
+        default_profile = json.load(config_file)["profile"]
+    parser = argparse.ArgumentParser(
+        description="Simulate reflow profiles with code.py's oven control.")
+    parser.add_argument("--profile", default=default_profile, choices=profiles,
+                        help="profile to run (default: from config.json)")
+    parser.add_argument("--all", action="store_true", help="run every profile")
+    parser.add_argument("--strategy", default="lookahead", choices=sorted(STRATEGIES),
+                        help="control strategy (default: lookahead, as code.py)")
+    parser.add_argument("--power", type=float, default=1500,
+                        help="oven power in W (default: 1500)")
+    parser.add_argument("--trace", help="write a per second CSV trace of the last run")
+    args = parser.parse_args()
+
+    for profile_name in profiles if args.all else [args.profile]:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary, trace = simulate(profile_name, args.strategy,
+                                      model=OvenModel(power=args.power))
+        report(summary, time.perf_counter() - start)
+    if args.trace:
+        with open(args.trace, "w") as trace_file:
+            trace_file.write("seconds,temp,setpoint,state,relay\n")
+            for row in trace:
+                trace_file.write("{},{},{},{},{}\n".format(*row[:4], int(row[4])))
+
+
+if __name__ == "__main__":
+    main()
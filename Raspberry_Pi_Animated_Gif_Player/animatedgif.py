@@ -2,10 +2,35 @@
 #
 # SPDX-License-Identifier: MIT
 
+import hashlib
+import json
+import mmap
 import os
+import threading
 import time
+from collections import OrderedDict
 from PIL import Image, ImageOps
 
+# Decoded frames are kept in this subfolder of the Gif folder, one raw file
+# of display-sized RGB frames per Gif and display size
+CACHE_FOLDER = ".gifcache"
+INDEX_FILE = "index.json"
+# Gifs that decode to more than this many bytes are streamed in frame by
+# frame while playing instead of being fully decoded before the first frame
+STREAM_BYTES = 16 * 1024 * 1024
+# Upper limit on decoded frames held open for the current, next and
+# previous Gifs, least recently used Gifs are closed first
+PREFETCH_BYTES = 64 * 1024 * 1024
+
+
+def file_hash(filename):
+    digest = hashlib.sha1()
+    with open(filename, "rb") as gif_file:
+        for chunk in iter(lambda: gif_file.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 # pylint: disable=too-few-public-methods
 class Frame:
     def __init__(self, duration=0):
@@ -16,6 +41,209 @@ class Frame:
 # pylint: enable=too-few-public-methods
 
 
+class FrameCache:
+    """Display-sized RGB frames for one Gif, memory-mapped from a raw cache
+    file. Frames missing from the cache are decoded the first time they are
+    requested and written through, and the finished file is renamed into
+    place once every frame has been decoded. Safe to fill from a background
+    thread while frames are being read."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        filename,
+        size,
+        frame_count,
+        *,
+        duration=0,
+        durations=None,
+        cache_file=None,
+        on_complete=None,
+    ):
+        self._filename = filename
+        self._size = size
+        self._cache_file = cache_file
+        self._on_complete = on_complete
+        self._image = None
+        self._raw_file = None
+        self._lock = threading.Lock()
+        self.frame_bytes = size[0] * size[1] * 3
+        self.frame_count = frame_count
+        self.duration = duration
+        self.nbytes = length = self.frame_bytes * frame_count
+        if (
+            durations is not None
+            and cache_file is not None
+            and os.path.exists(cache_file)
+            and os.path.getsize(cache_file) == length
+        ):
+            self.durations = durations
+            self.remaining = 0
+            with open(cache_file, "rb") as raw_file:
+                self._map = mmap.mmap(raw_file.fileno(), 0, access=mmap.ACCESS_READ)
+            return
+
+        self.durations = [duration] * frame_count
+        self.remaining = frame_count
+        self._decoded = bytearray(frame_count)
+        self._image = Image.open(filename)
+        self._map = None
+        if cache_file is not None:
+            try:
+                self._raw_file = open(cache_file + ".tmp", "w+b")
+                self._raw_file.truncate(length)
+                self._map = mmap.mmap(self._raw_file.fileno(), length)
+            except OSError as error:
+                print("Unable to cache {}: {}".format(filename, error))
+                self._close_raw_file()
+        if self._map is None:
+            self._map = mmap.mmap(-1, length)
+
+    def __len__(self):
+        return self.frame_count
+
+    def __getitem__(self, index):
+        with self._lock:
+            if self.remaining and not self._decoded[index]:
+                self._decode(index)
+            offset = index * self.frame_bytes
+            frame_object = Frame(duration=self.durations[index])
+            frame_object.image = Image.frombytes(
+                "RGB", self._size, self._map[offset : offset + self.frame_bytes]
+            )
+        return frame_object
+
+    def _decode(self, index):
+        self._image.seek(index)
+        if "duration" in self._image.info:
+            self.durations[index] = self._image.info["duration"]
+        # Make sure to create image with mode 'RGB' for full color.
+        padded = ImageOps.pad(  # pylint: disable=no-member
+            self._image.convert("RGB"),
+            self._size,
+            method=Image.NEAREST,
+            color=(0, 0, 0),
+            centering=(0.5, 0.5),
+        )
+        offset = index * self.frame_bytes
+        self._map[offset : offset + self.frame_bytes] = padded.tobytes()
+        self._decoded[index] = 1
+        self.remaining -= 1
+        if not self.remaining:
+            self._finish()
+
+    def fill(self):
+        # Lock per frame so playback can read frames in between
+        for index in range(self.frame_count):
+            with self._lock:
+                if not self.remaining or self._map.closed:
+                    break
+                if not self._decoded[index]:
+                    self._decode(index)
+
+    def _finish(self):
+        self._image.close()
+        self._image = None
+        if self._raw_file is None:
+            return
+        try:
+            self._map.flush()
+            os.replace(self._raw_file.name, self._cache_file)
+        except OSError as error:
+            print("Unable to cache {}: {}".format(self._filename, error))
+            return
+        finally:
+            self._close_raw_file()
+        if self._on_complete is not None:
+            self._on_complete(self.durations)
+
+    def _close_raw_file(self):
+        if self._raw_file is not None:
+            self._raw_file.close()
+            self._raw_file = None
+
+    def close(self):
+        with self._lock:
+            if self._image is not None:
+                self._image.close()
+                self._image = None
+            self._map.close()
+            if self._raw_file is not None:
+                # Incomplete, throw away the partial cache file
+                name = self._raw_file.name
+                self._close_raw_file()
+                try:
+                    os.remove(name)
+                except OSError:
+                    pass
+
+
+class Prefetcher:
+    """Opens and decodes upcoming Gifs on a background thread while the
+    current one plays. Open animations are kept within a memory budget,
+    closing the least recently used ones first, but never the one playing
+    or the one being decoded."""
+
+    def __init__(self, open_frames, budget=PREFETCH_BYTES):
+        self._open_frames = open_frames
+        self._budget = budget
+        self._animations = OrderedDict()
+        self._pending = []
+        self._current = None
+        self._filling = None
+        self._condition = threading.Condition()
+        thread = threading.Thread(target=self._worker, daemon=True)
+        thread.start()
+
+    def _open(self, index):
+        # Call with the condition held
+        animation = self._animations.get(index)
+        if animation is None:
+            animation = self._open_frames(index)
+            self._animations[index] = animation
+        self._animations.move_to_end(index)
+        return animation
+
+    def get(self, index):
+        with self._condition:
+            self._current = index
+            if index in self._pending:
+                self._pending.remove(index)
+            animation = self._open(index)
+            self._evict()
+        return animation
+
+    def prefetch(self, indices):
+        with self._condition:
+            # Replaces any requests that haven't started yet
+            self._pending = [index for index in indices if index != self._current]
+            self._condition.notify()
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                index = self._pending.pop(0)
+                animation = self._open(index)
+                self._filling = index
+                self._evict()
+            animation.fill()
+            with self._condition:
+                self._filling = None
+                self._evict()
+
+    def _evict(self):
+        total = sum(animation.nbytes for animation in self._animations.values())
+        for index in list(self._animations):
+            if total <= self._budget:
+                break
+            if index not in (self._current, self._filling):
+                animation = self._animations.pop(index)
+                total -= animation.nbytes
+                animation.close()
+
+
 class AnimatedGif:
     def __init__(self, display, include_delays=True, folder=None):
         self._frame_count = 0
@@ -23,7 +251,12 @@ class AnimatedGif:
         self._index = 0
         self._duration = 0
         self._gif_files = []
-        self._frames = []
+        self._frames = None
+        self._file_index = {}
+        self._cache_index = {}
+        self._cache_folder = None
+        self._index_lock = threading.Lock()
+        self._prefetcher = Prefetcher(self.open_frames)
         self._running = True
         self.display = display
         self.include_delays = include_delays
@@ -37,50 +270,136 @@ class AnimatedGif:
     def back(self):
         self._index = (self._index - 1 + len(self._gif_files)) % len(self._gif_files)
 
+    def load_index(self, folder):
+        self._cache_folder = os.path.join(folder, CACHE_FOLDER)
+        try:
+            os.makedirs(self._cache_folder, exist_ok=True)
+        except OSError as error:
+            print("Frame cache disabled: {}".format(error))
+            self._cache_folder = None
+            return
+        try:
+            with open(os.path.join(self._cache_folder, INDEX_FILE)) as index_file:
+                index = json.load(index_file)
+            self._file_index = index["files"]
+            self._cache_index = index["frames"]
+        except (OSError, ValueError, KeyError):
+            self._file_index = {}
+            self._cache_index = {}
+
+    def save_index(self):
+        if self._cache_folder is None:
+            return
+        filename = os.path.join(self._cache_folder, INDEX_FILE)
+        # Frame caches may complete on the prefetch thread
+        with self._index_lock:
+            try:
+                with open(filename + ".tmp", "w") as index_file:
+                    json.dump(
+                        {"files": self._file_index, "frames": self._cache_index},
+                        index_file,
+                    )
+                os.replace(filename + ".tmp", filename)
+            except OSError as error:
+                print("Unable to save {}: {}".format(filename, error))
+
+    @staticmethod
+    def scan_file(gif_file, stat):
+        # Only called for new or changed files, everything else comes from
+        # the index without opening the Gif
+        with Image.open(gif_file) as image:
+            info = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "animated": image.is_animated,
+            }
+            if image.is_animated:
+                info["frames"] = image.n_frames
+                image.seek(0)
+                info["duration"] = image.info.get("duration", 0)
+                info["loop"] = image.info.get("loop", 1)
+                info["hash"] = file_hash(gif_file)
+        return info
+
     def load_files(self, folder):
+        self.load_index(folder)
         gif_files = [f for f in os.listdir(folder) if f.endswith(".gif")]
         gif_folder = folder
         if gif_folder[:-1] != "/":
             gif_folder += "/"
-        for gif_file in gif_files:
-            image = Image.open(gif_folder + gif_file)
+        file_index = {}
+        for gif_file in sorted(gif_files):
+            gif_file = gif_folder + gif_file
+            stat = os.stat(gif_file)
+            info = self._file_index.get(gif_file)
+            if (
+                info is None
+                or info["mtime"] != stat.st_mtime
+                or info["size"] != stat.st_size
+            ):
+                info = self.scan_file(gif_file, stat)
+            file_index[gif_file] = info
             # Only add animated Gifs
-            if image.is_animated:
-                self._gif_files.append(gif_folder + gif_file)
+            if info["animated"]:
+                self._gif_files.append(gif_file)
+        self._file_index = file_index
+        self.prune_cache()
+        self.save_index()
 
         print("Found", self._gif_files)
         if not self._gif_files:
             print("No Gif files found in current folder")
             exit()  # pylint: disable=consider-using-sys-exit
 
+    def prune_cache(self):
+        # Drop cached frames of Gifs that were removed or changed
+        if self._cache_folder is None:
+            return
+        hashes = {info.get("hash") for info in self._file_index.values()}
+        for cache_file in os.listdir(self._cache_folder):
+            key = cache_file.split(".")[0]
+            if cache_file != INDEX_FILE and key.split("-")[0] not in hashes:
+                self._cache_index.pop(key, None)
+                try:
+                    os.remove(os.path.join(self._cache_folder, cache_file))
+                except OSError:
+                    pass
+
+    def cache_complete(self, key, durations):
+        self._cache_index[key] = durations
+        self.save_index()
+
+    def open_frames(self, index):
+        info = self._file_index[self._gif_files[index]]
+        key = "{}-{}x{}".format(info["hash"], self._width, self._height)
+        cache_file = None
+        if self._cache_folder is not None:
+            cache_file = os.path.join(self._cache_folder, key + ".rgb")
+        return FrameCache(
+            self._gif_files[index],
+            (self._width, self._height),
+            info["frames"],
+            duration=info["duration"],
+            durations=self._cache_index.get(key),
+            cache_file=cache_file,
+            on_complete=lambda durations: self.cache_complete(key, durations),
+        )
+
     def preload(self):
-        image = Image.open(self._gif_files[self._index])
-        print("Loading {}...".format(self._gif_files[self._index]))
-        if "duration" in image.info:
-            self._duration = image.info["duration"]
-        else:
-            self._duration = 0
-        if "loop" in image.info:
-            self._loop = image.info["loop"]
-        else:
-            self._loop = 1
-        self._frame_count = image.n_frames
-        self._frames.clear()
-        for frame in range(self._frame_count):
-            image.seek(frame)
-            # Create blank image for drawing.
-            # Make sure to create image with mode 'RGB' for full color.
-            frame_object = Frame(duration=self._duration)
-            if "duration" in image.info:
-                frame_object.duration = image.info["duration"]
-            frame_object.image = ImageOps.pad(  # pylint: disable=no-member
-                image.convert("RGB"),
-                (self._width, self._height),
-                method=Image.NEAREST,
-                color=(0, 0, 0),
-                centering=(0.5, 0.5),
-            )
-            self._frames.append(frame_object)
+        gif_file = self._gif_files[self._index]
+        info = self._file_index[gif_file]
+        print("Loading {}...".format(gif_file))
+        self._duration = info["duration"]
+        self._loop = info["loop"]
+        self._frame_count = info["frames"]
+        self._frames = self._prefetcher.get(self._index)
+        if self._frames.nbytes <= STREAM_BYTES:
+            self._frames.fill()
+        # Decode the neighbours while this one plays
+        count = len(self._gif_files)
+        self._prefetcher.prefetch(
+            [(self._index + 1) % count, (self._index - 1 + count) % count]
+        )
 
     def play(self):
         self.preload()
@@ -91,6 +410,7 @@ class AnimatedGif:
             print("There are no Gif Images loaded to Play")
             return False
         self.update_display(self._frames[current_frame].image)
+        deadline = time.monotonic()
         while self._running:
             action = self.get_next_value()
             if action:
@@ -104,13 +424,15 @@ class AnimatedGif:
                 else:
                     current_frame += 1
                 current_frame %= self._frame_count
+                # Schedule against the previous frame's deadline so that
+                # fetching and display update time is absorbed by the delay,
+                # restarting the schedule after an idle or late frame
+                deadline = max(deadline, time.monotonic())
                 frame_object = self._frames[current_frame]
-                start_time = time.monotonic()
                 self.update_display(frame_object.image)
                 if self.include_delays:
-                    remaining_delay = frame_object.duration / 1000 - (
-                        time.monotonic() - start_time
-                    )
+                    deadline += frame_object.duration / 1000
+                    remaining_delay = deadline - time.monotonic()
                     if remaining_delay > 0:
                         time.sleep(remaining_delay)
                 last_action = action
@@ -5,48 +5,231 @@ import math
 import random
 import tkinter as tk
 import time
+import numpy as np
 from palette import Palette
 
+# pylint: disable=too-many-instance-attributes
+
+class NumberField:
+    """
+    Positions, offsets, sizes and alphas of a grid of DataNumbers, kept in
+    NumPy arrays so numbers easing home and dodging the mouse move in one
+    vectorized step per frame. Tk is only sent the items that changed.
+    """
+    AVOIDANCE_RADIUS = 100
+    MAX_REPEL_DISTANCE = 12
+    MIN_MOVE = 0.05  # pixels, smaller moves aren't worth a Tk call
+
+    def __init__(self, canvas: tk.Canvas, count: int):
+        self.canvas = canvas
+        self.numbers = []
+        self.text_ids = np.zeros(count, dtype=int)
+        self.home_x = np.zeros(count)
+        self.home_y = np.zeros(count)
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.mouse_offset_x = np.zeros(count)
+        self.mouse_offset_y = np.zeros(count)
+        self.wiggle_offset_x = np.zeros(count)
+        self.wiggle_offset_y = np.zeros(count)
+        self.base_size = np.zeros(count)
+        self.size = np.zeros(count)
+        self.alpha = np.full(count, 255.0)
+        self.bin_it = np.zeros(count, dtype=bool)
+        # what each item should look like...
+        self.display_x = np.zeros(count)
+        self.display_y = np.zeros(count)
+        self.font_size = np.zeros(count, dtype=int)
+        self.text = [None] * count
+        self.fill = [None] * count
+        self.fill_override = [None] * count  # for one frame only
+        self.state = ['normal'] * count
+        # ...and what Tk was last told
+        self.shown_x = np.zeros(count)
+        self.shown_y = np.zeros(count)
+        self.shown_font_size = np.zeros(count, dtype=int)
+        self.shown = [None] * count
+        # items a DataNumber laid out itself since the last flush
+        self.staged = np.zeros(count, dtype=bool)
+        self.restyle = np.zeros(count, dtype=bool)
+
+    def add(self, number):
+        """Take on a newly drawn DataNumber, returning its index"""
+        index = len(self.numbers)
+        self.numbers.append(number)
+        self.text_ids[index] = number.text_id
+        return index
+
+    def place(self, index, x, y, size, text, fill):
+        """Record where and how an item was created"""
+        self.home_x[index] = self.x[index] = x
+        self.home_y[index] = self.y[index] = y
+        self.base_size[index] = self.size[index] = size
+        self.display_x[index] = self.shown_x[index] = x
+        self.display_y[index] = self.shown_y[index] = y
+        self.font_size[index] = self.shown_font_size[index] = int(size)
+        self.text[index] = text
+        self.fill[index] = fill
+        self.shown[index] = (text, fill, 'normal')
+
+    def stage(self, index, text, font_size, fill, display_x, display_y, fill_override=None):
+        """Lay out one item, to be sent to Tk on the next flush()"""
+        self.text[index] = text
+        self.font_size[index] = font_size
+        self.fill[index] = fill
+        self.fill_override[index] = fill_override
+        self.state[index] = 'normal'
+        self.display_x[index] = display_x
+        self.display_y[index] = display_y
+        self.staged[index] = True
+        self.restyle[index] = True
+
+    def hide(self, index):
+        self.state[index] = 'hidden'
+        self.staged[index] = True
+        self.restyle[index] = True
+
+    def binned(self):
+        """The numbers on their way to a bin"""
+        return [self.numbers[index] for index in np.flatnonzero(self.bin_it)]
+
+    def step(self, mouse_x, mouse_y):
+        """Ease the numbers not being binned toward home and away from the mouse"""
+        free = ~self.bin_it
+        self.x[free] += (self.home_x[free] - self.x[free]) * 0.1
+        self.y[free] += (self.home_y[free] - self.y[free]) * 0.1
+        self.size[free] += (self.base_size[free] - self.size[free]) * 0.1
+        self.avoid_mouse(free, mouse_x, mouse_y)
+        # anything a DataNumber laid out itself this frame stays as it is
+        free &= ~self.staged
+        self.display_x[free] = (self.x + self.smooth(self.wiggle_offset_x)
+                                + self.smooth(self.mouse_offset_x))[free]
+        self.display_y[free] = (self.y + self.smooth(self.wiggle_offset_y)
+                                + self.smooth(self.mouse_offset_y))[free]
+        self.font_size[free] = self.size[free].astype(int)
+
+    def avoid_mouse(self, free, mouse_x, mouse_y):
+        """Push numbers near the mouse away from it, and let the rest drift back"""
+        dx = self.x - mouse_x
+        dy = self.y - mouse_y
+        distance = np.hypot(dx, dy)
+        near = free & (distance < self.AVOIDANCE_RADIUS)
+        # right under the mouse there's no away, so pick one
+        under = near & (distance <= 0.1)
+        if under.any():
+            angle = np.random.uniform(0, 2 * math.pi, np.count_nonzero(under))
+            dx[under] = 0.1 * np.cos(angle)
+            dy[under] = 0.1 * np.sin(angle)
+        # push out along (dx, dy), harder the closer to the mouse
+        normalized_distance = 1.0 - (distance / self.AVOIDANCE_RADIUS)
+        repel = (self.MAX_REPEL_DISTANCE * normalized_distance * normalized_distance * 0.8
+                 / np.maximum(distance, 0.1))
+        self.mouse_offset_x[near] = (dx * repel)[near]
+        self.mouse_offset_y[near] = (dy * repel)[near]
+        far = free & ~near
+        for offset in (self.mouse_offset_x, self.mouse_offset_y):
+            offset[far] *= 0.95
+            offset[far & (np.abs(offset) < 0.05)] = 0
+
+    def flush(self):
+        """Send Tk whatever changed since the last flush"""
+        moved = np.flatnonzero((np.abs(self.display_x - self.shown_x) >= self.MIN_MOVE)
+                               | (np.abs(self.display_y - self.shown_y) >= self.MIN_MOVE))
+        for index in moved:
+            self.canvas.coords(int(self.text_ids[index]),
+                               self.display_x[index], self.display_y[index])
+        self.shown_x[moved] = self.display_x[moved]
+        self.shown_y[moved] = self.display_y[moved]
+
+        self.restyle |= self.font_size != self.shown_font_size
+        lingering = []
+        for index in np.flatnonzero(self.restyle):
+            fill = self.fill_override[index] or self.fill[index]
+            if self.fill_override[index]:
+                # back to the usual color next frame, unless staged again
+                self.fill_override[index] = None
+                lingering.append(index)
+            text, shown_fill, state = self.shown[index]
+            changes = {}
+            if self.state[index] != state:
+                changes['state'] = self.state[index]
+            if self.state[index] == 'normal':
+                if self.text[index] != text:
+                    changes['text'] = self.text[index]
+                if fill != shown_fill:
+                    changes['fill'] = fill
+                if self.font_size[index] != self.shown_font_size[index]:
+                    changes['font'] = ('Courier', int(self.font_size[index]))
+                    self.shown_font_size[index] = self.font_size[index]
+                text, shown_fill = self.text[index], fill
+            if changes:
+                self.canvas.itemconfig(int(self.text_ids[index]), **changes)
+            self.shown[index] = (text, shown_fill, self.state[index])
+        self.restyle[:] = False
+        self.restyle[lingering] = True
+        self.staged[:] = False
+
+    @staticmethod
+    def smooth(offset):
+        return np.round(offset * 10) / 10
+
+
+def _field_value(name, kind=float):
+    """A DataNumber attribute stored in its NumberField array of the same name"""
+    def get(self):
+        return kind(getattr(self.field, name)[self.index])
+
+    def set_value(self, value):
+        getattr(self.field, name)[self.index] = value
+
+    return property(get, set_value)
+
+
 class DataNumber:
     active_bin = None
 
+    home_x = _field_value('home_x')
+    home_y = _field_value('home_y')
+    x = _field_value('x')
+    y = _field_value('y')
+    mouse_offset_x = _field_value('mouse_offset_x')
+    mouse_offset_y = _field_value('mouse_offset_y')
+    wiggle_offset_x = _field_value('wiggle_offset_x')
+    wiggle_offset_y = _field_value('wiggle_offset_y')
+    base_size = _field_value('base_size')
+    size = _field_value('size')
+    alpha = _field_value('alpha')
+    bin_it = _field_value('bin_it', bool)
+
     @classmethod
     def reset_active_bin(cls):
         """Reset the class-level active bin tracker"""
         cls.active_bin = None
 
-    def __init__(self, x: int, y: int, canvas: tk.Canvas, base_size: int = 35, palette=Palette):
+    def __init__(self, x: int, y: int, field: NumberField, base_size: int = 35, palette=Palette):
         """
-        Initialize a data number for macrodata refinement
+        Initialize a data number for macrodata refinement, keeping its
+        position and motion in field
         """
         self.num = random.randint(0, 9)
-        self.home_x = x
-        self.home_y = y
-        self.x = x
-        self.y = y
-        self.mouse_offset_x = 0
-        self.mouse_offset_y = 0
         self.palette = palette
         self.color = self.palette.FG
-        self.alpha = 255
-        self.base_size = base_size
-        self.size = base_size
         self.refined = False
-        self.bin_it = False
         self.bin = None
         self.bin_pause_time = 2
         self.bin_pause = self.bin_pause_time
-        self.canvas = canvas
+        self.field = field
+        self.canvas = field.canvas
         self.text_id = self.canvas.create_text(
-            self.x, self.y,
+            x, y,
             text=str(self.num),
-            font=('Courier', self.size),
+            font=('Courier', base_size),
             fill=self.color,
             anchor='center'
         )
+        self.index = field.add(self)
+        field.place(self.index, x, y, base_size, str(self.num), self.color)
         self.needs_refinement = False
-        self.wiggle_offset_x = 0
-        self.wiggle_offset_y = 0
 
     def refine(self, bin_obj=None, bins_list=None):
         """
@@ -70,6 +253,7 @@ class DataNumber:
             if DataNumber.active_bin.is_full():
                 DataNumber.active_bin = target_bin
             self.bin = DataNumber.active_bin
+        self.bin.claim_number(self.text_id)
         return True
 
     def get_non_full_bin_for_position(self, bins_list):
@@ -114,6 +298,8 @@ class DataNumber:
                         self.wiggle_offset_y = 0
                         self.mouse_offset_x = 0
                         self.mouse_offset_y = 0
+                        # leave the bin before it restacks for the new number
+                        self.bin.release_number(self.text_id)
                         self.bin.add_number()
                         self.reset()
                         return
@@ -126,9 +312,6 @@ class DataNumber:
                 if distance >= 20:
                     self.alpha = self.map_value(current_distance, fade_start_distance, 20, 255, 55)
                 self.update_display()
-                if hasattr(self.bin, 'level_elements'):
-                    for element_id in self.bin.level_elements.values():
-                        self.canvas.tag_raise(self.text_id, element_id)
                 self.bin.last_refined_time = int(time.time() * 1000)
             else:
                 self.bin_pause -= 1
@@ -136,9 +319,6 @@ class DataNumber:
                     pulse_size = self.base_size * (1.0 + 0.5 *
                                  (1.0 - (self.bin_pause / self.bin_pause_time)))
                     self.set_size(pulse_size)
-                    if hasattr(self.bin, 'level_elements'):
-                        for element_id in self.bin.level_elements.values():
-                            self.canvas.tag_raise(self.text_id, element_id)
 
     def reset(self):
         """Reset the number after being binned."""
@@ -151,6 +331,8 @@ class DataNumber:
         self.mouse_offset_y = 0
         self.refined = False
         self.bin_it = False
+        if self.bin is not None:
+            self.bin.release_number(self.text_id)
         self.bin = None
         self.color = self.palette.FG
         self.alpha = 255
@@ -160,13 +342,6 @@ class DataNumber:
         if not still_active and DataNumber.active_bin is not None:
             DataNumber.active_bin = None
 
-    def go_home(self):
-        """Move the number back to its home position with easing."""
-        self.x = self.lerp(self.x, self.home_x, 0.1)
-        self.y = self.lerp(self.y, self.home_y, 0.1)
-        self.size = self.lerp(self.size, self.base_size, 0.1)
-        self.update_display()
-
     def set_size(self, sz):
         """Set the size of the number."""
         self.size = sz
@@ -190,49 +365,38 @@ class DataNumber:
         """Update the display of this number."""
         self.update_display()
 
-    def update_display(self):
-        """Update the text display with current properties and improved alpha handling"""
+    def update_display(self, fill=None, nudge_x=0, nudge_y=0):
+        """
+        Lay out the text with current properties and improved alpha handling,
+        fill and the nudges apply to this frame only
+        """
         if self.bin_it:
             digit_size = self.lerp(self.size, self.size * 2.5,
                         self.map_value(self.bin_pause, self.bin_pause_time, 0, 0, 1))
         else:
             digit_size = self.size
-        font = ('Courier', int(digit_size))
         clamped_alpha = max(0, min(255, self.alpha))
         if clamped_alpha == 0:
-            self.canvas.itemconfig(self.text_id, state='hidden')
+            self.field.hide(self.index)
             return
-        else:
-            self.canvas.itemconfig(self.text_id, state='normal')
-        if clamped_alpha < 255:
-            bg_color = self.palette.BG
-            fg_color = self.color
-            alpha_ratio = clamped_alpha / 255.0
-            if alpha_ratio < 0.05:
-                display_color = self.blend_colors(bg_color, fg_color, 0.05)
-            else:
-                display_color = self.blend_colors(bg_color, fg_color, alpha_ratio)
-        else:
-            display_color = self.color
-        self.canvas.itemconfig(self.text_id,
-                            text=str(self.num),
-                            font=font,
-                            fill=display_color)
-        if not hasattr(self, 'wiggle_offset_x'):
-            self.wiggle_offset_x = 0
-        if not hasattr(self, 'wiggle_offset_y'):
-            self.wiggle_offset_y = 0
-        if not hasattr(self, 'mouse_offset_x'):
-            self.mouse_offset_x = 0
-        if not hasattr(self, 'mouse_offset_y'):
-            self.mouse_offset_y = 0
+        display_color = self.fade(self.color, clamped_alpha)
+        if fill is not None:
+            fill = self.fade(fill, clamped_alpha)
         smooth_wiggle_x = round(self.wiggle_offset_x * 10) / 10
         smooth_wiggle_y = round(self.wiggle_offset_y * 10) / 10
         smooth_mouse_x = round(self.mouse_offset_x * 10) / 10
         smooth_mouse_y = round(self.mouse_offset_y * 10) / 10
-        display_x = self.x + smooth_wiggle_x + smooth_mouse_x
-        display_y = self.y + smooth_wiggle_y + smooth_mouse_y
-        self.canvas.coords(self.text_id, display_x, display_y)
+        display_x = self.x + nudge_x + smooth_wiggle_x + smooth_mouse_x
+        display_y = self.y + nudge_y + smooth_wiggle_y + smooth_mouse_y
+        self.field.stage(self.index, str(self.num), int(digit_size), display_color,
+                         display_x, display_y, fill)
+
+    def fade(self, color, alpha):
+        """Color blended into the background for alpha below 255"""
+        if alpha < 255:
+            alpha_ratio = alpha / 255.0
+            return self.blend_colors(self.palette.BG, color, max(0.05, alpha_ratio))
+        return color
 
     def resize(self, new_x, new_y):
         """Update the home position when the window is resized."""
@@ -242,25 +406,19 @@ class DataNumber:
     def show_wiggle(self, proximity_factor=0):
         """Make the number threatening"""
         if self.needs_refinement and not self.bin_it:
-            original_x, original_y = self.x, self.y
-            smooth_x = round(self.wiggle_offset_x * 10) / 10
-            smooth_y = round(self.wiggle_offset_y * 10) / 10
-            self.x += smooth_x
-            self.y += smooth_y
-            original_color = self.color
             base_pulse = 0.7
             wave1 = math.sin(time.time() * 0.9) * 0.15
             wave2 = math.sin(time.time() * 1.8) * 0.05
             highlight_intensity = base_pulse + wave1 + wave2 + (proximity_factor * 0.2)
             highlight_intensity = max(0.6, min(1.0, highlight_intensity))
             if highlight_intensity > 0.82:
-                self.color = self.palette.SELECT
+                highlight = self.palette.SELECT
             else:
                 blend_amount = (highlight_intensity - 0.6) / 0.22
-                self.color = self.blend_colors(self.palette.FG, self.palette.SELECT, blend_amount)
-            self.update_display()
-            self.x, self.y = original_x, original_y
-            self.color = original_color
+                highlight = self.blend_colors(self.palette.FG, self.palette.SELECT, blend_amount)
+            self.update_display(fill=highlight,
+                                nudge_x=round(self.wiggle_offset_x * 10) / 10,
+                                nudge_y=round(self.wiggle_offset_y * 10) / 10)
 
     @staticmethod
     def lerp(start, end, amt):
@@ -53,6 +53,9 @@ class Bin:
         self.visual_elements = {}
         self.level_elements = {}
         self.progress_bar_elements = {}
+        # canvas tag on the numbers headed for this bin
+        self.numbers_tag = f"bin_{index}_numbers"
+        self.restacked = False
 
         self.create_visual_elements()
 
@@ -202,6 +205,16 @@ class Bin:
         self.canvas.tag_raise(self.progress_bar_elements['outline'])
         self.canvas.tag_raise(self.progress_bar_elements['fill'])
         self.canvas.tag_raise(self.progress_bar_elements['text'])
+        self.canvas.tag_raise(self.numbers_tag, self.level_elements['right_lid'])
+        self.restacked = True
+
+    def claim_number(self, text_id):
+        """Draw a number headed for this bin over the bin, until released"""
+        self.canvas.addtag_withtag(self.numbers_tag, text_id)
+        self.canvas.tag_raise(text_id, self.level_elements['right_lid'])
+
+    def release_number(self, text_id):
+        self.canvas.dtag(text_id, self.numbers_tag)
 
     def is_full(self):
         total_levels = sum(self.levels.values())
@@ -13,7 +13,7 @@ import time
 import random
 import tkinter as tk
 from PIL import Image, ImageTk, ImageFont, ImageDraw
-from data import DataNumber
+from data import DataNumber, NumberField
 from data_bin import Bin
 from palette import Palette
 try: # blinka with haptics?
@@ -114,6 +114,7 @@ class MacrodataRefinementTerminal:
         self.number_spacing = 50
         self.margin = 80
         self.data_numbers = []
+        self.number_field = None
         self.ui_elements = {}
         self.selection_start = None
         self.selection_rect = None
@@ -196,44 +197,6 @@ class MacrodataRefinementTerminal:
         self.mouse_x = event.x
         self.mouse_y = event.y
 
-    def apply_mouse_avoidance(self, number):
-        """
-        Apply an avoidance effect where numbers move away from the mouse cursor
-        """
-        if not hasattr(number, 'mouse_offset_x'):
-            number.mouse_offset_x = 0
-        if not hasattr(number, 'mouse_offset_y'):
-            number.mouse_offset_y = 0
-        if self.screen != 2 or number.bin_it:
-            return
-        dx = number.x - self.mouse_x
-        dy = number.y - self.mouse_y
-        distance = math.sqrt(dx*dx + dy*dy)
-        avoidance_radius = 100
-        max_repel_distance = 12
-        if distance < avoidance_radius:
-            normalized_distance = 1.0 - (distance / avoidance_radius)
-            repel_factor = normalized_distance * normalized_distance * 0.8
-            repel_distance = max_repel_distance * repel_factor
-            if distance > 0.1:
-                repel_x = (dx / distance) * repel_distance
-                repel_y = (dy / distance) * repel_distance
-            else:
-                angle = random.uniform(0, 2 * math.pi)
-                repel_x = math.cos(angle) * repel_distance
-                repel_y = math.sin(angle) * repel_distance
-            number.mouse_offset_x = repel_x
-            number.mouse_offset_y = repel_y
-        else:
-            if hasattr(number, 'mouse_offset_x') and number.mouse_offset_x != 0:
-                number.mouse_offset_x *= 0.95
-                if abs(number.mouse_offset_x) < 0.05:
-                    number.mouse_offset_x = 0
-            if hasattr(number, 'mouse_offset_y') and number.mouse_offset_y != 0:
-                number.mouse_offset_y *= 0.95
-                if abs(number.mouse_offset_y) < 0.05:
-                    number.mouse_offset_y = 0
-
     def save_progress(self, filepath=None):
         """
         Save the current progress and bin data to a JSON file.
@@ -626,6 +589,7 @@ class MacrodataRefinementTerminal:
         self.data_numbers.clear()
         num_columns = 22
         num_rows = 8
+        self.number_field = NumberField(self.canvas, num_rows * num_columns)
         usable_width = self.screen_width - (2 * self.margin)
         header_height = 40
         bottom_line_y = self.screen_height - self.margin - 80 - 25
@@ -641,17 +605,16 @@ class MacrodataRefinementTerminal:
             for col in range(num_columns):
                 x = start_x + (col * horizontal_spacing)
                 y = start_y + (row * vertical_spacing)
-                data_number = DataNumber(x, y, self.canvas, self.base_size, palette=self.palette)
+                data_number = DataNumber(x, y, self.number_field, self.base_size,
+                                         palette=self.palette)
                 self.data_numbers.append(data_number)
 
     def update_numbers(self):
         """Update the number animations"""
         if self.screen == 2:
-            for number in self.data_numbers:
-                if number.bin_it:
-                    number.go_bin()
-                else:
-                    number.go_home()
+            for number in self.number_field.binned():
+                number.go_bin()
+            self.number_field.step(self.mouse_x, self.mouse_y)
 
     def update_bins(self):
         """Update the bin animations and ensure proper z-ordering"""
@@ -659,19 +622,20 @@ class MacrodataRefinementTerminal:
             self.update_total_refined()
             self.check_for_completion()
 
+            # bins raise their own numbers when they restack,
+            # after that only the frame needs to go back on top
+            restacked = False
             for bin_obj in self.bins:
                 bin_obj.update()
+                restacked = restacked or bin_obj.restacked
+                bin_obj.restacked = False
+            if restacked:
                 if 'bottom_shield' in self.ui_elements:
                     self.canvas.tag_raise(self.ui_elements['bottom_shield'])
                 if 'bottom_frame' in self.ui_elements:
                     self.canvas.tag_raise(self.ui_elements['bottom_frame'])
                 if 'serial' in self.ui_elements:
                     self.canvas.tag_raise(self.ui_elements['serial'])
-                for number in self.data_numbers:
-                    if number.bin_it and number.bin == bin_obj:
-                        if hasattr(bin_obj, 'level_elements'):
-                            for element_id in bin_obj.level_elements.values():
-                                self.canvas.tag_raise(number.text_id, element_id)
 
     def toggle_screen(self, event):
         """Toggle between logo and number screens with autosave"""
@@ -749,6 +713,7 @@ class MacrodataRefinementTerminal:
             for number in self.data_numbers:
                 self.canvas.delete(number.text_id)
             self.data_numbers.clear()
+            self.number_field = None
             if hasattr(self, 'top_progress_elements'):
                 for element_id in self.top_progress_elements.values():
                     self.canvas.delete(element_id)
@@ -1044,8 +1009,6 @@ class MacrodataRefinementTerminal:
         else:
             self.update_bins()
             self.update_numbers()
-            for number in self.data_numbers:
-                self.apply_mouse_avoidance(number)
             if self.waiting_for_next_wiggle:
                 self.next_wiggle_timer += 1
                 self.next_wiggle_delay = random.randint(180, 240)
@@ -1057,6 +1020,7 @@ class MacrodataRefinementTerminal:
                   and self.wiggle_timer == 0):
                 self.select_random_wiggle_group()
             self.wiggle_selected_numbers()
+            self.number_field.flush()
         self.root.after(20, self.animate)
 
     def run(self):
@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: 2019 Carter Nelson for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+'''
+Fast matplotlib to TFT renderer for the tft_sidekick_*.py monitors.
+
+The figure background (axes, grid, ticks, titles) is drawn once and cached.
+Each frame restores that background, draws only the line artists on top,
+converts the canvas buffer straight to RGB565 with numpy and sends only the
+display rows that changed since the last frame.
+'''
+
+import time
+import numpy as np
+
+# Changed rows closer together than this are sent as one block, since each
+# block costs a window set on top of its pixel data
+ROW_GAP = 4
+
+class BlitRenderer:
+    '''Draws lines over a cached figure background and pushes changed rows
+    to an adafruit_rgb_display display.'''
+
+    def __init__(self, disp, fig, lines, show_frame_time=True):
+        self.disp = disp
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.lines = lines
+        self.frame_time = 0
+        self.rows_sent = 0
+        self._background = None
+        self._frame = None
+        self._pixels = None
+        self._scratch = None
+        self._readout = None
+        for line in lines:
+            line.set_animated(True)
+        if show_frame_time:
+            self._readout = fig.text(0.99, 0.01, '', ha='right', va='bottom',
+                                     fontsize=6, color='#808080', animated=True)
+        fig.tight_layout()
+
+    def invalidate(self):
+        '''Redraw the background on the next frame, call after changing
+        anything other than line data, like axis limits.'''
+        self._background = None
+
+    def update(self):
+        '''Draw the lines and send whatever changed to the display.'''
+        start = time.monotonic()
+        if self._background is None:
+            # full draw skips animated artists, leaving the bare background
+            self.canvas.draw()
+            self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        else:
+            self.canvas.restore_region(self._background)
+        for line in self.lines:
+            line.axes.draw_artist(line)
+        if self._readout is not None:
+            self._readout.set_text('{:.0f} ms'.format(self.frame_time * 1000))
+            self.fig.draw_artist(self._readout)
+        self._send(self._to_rgb565(np.asarray(self.canvas.buffer_rgba())))
+        self.frame_time = time.monotonic() - start
+
+    def _to_rgb565(self, rgba):
+        # match the orientation disp.image() would use
+        rotation = self.disp.rotation
+        if rotation:
+            rgba = np.rot90(rgba, rotation // 90)
+        if self._pixels is None or self._pixels.shape != rgba.shape[:2]:
+            self._pixels = np.empty(rgba.shape[:2], dtype='>u2')
+            self._scratch = np.empty(rgba.shape[:2], dtype=np.uint16)
+        pixels, scratch = self._pixels, self._scratch
+        # RRRRRGGG GGGBBBBB, big endian as the display expects
+        np.bitwise_and(rgba[..., 0], 0xF8, out=scratch, dtype=np.uint16)
+        scratch <<= 8
+        pixels[...] = scratch
+        np.bitwise_and(rgba[..., 1], 0xFC, out=scratch, dtype=np.uint16)
+        scratch <<= 3
+        pixels |= scratch
+        np.right_shift(rgba[..., 2], 3, out=scratch, dtype=np.uint16)
+        pixels |= scratch
+        return pixels
+
+    def _send(self, pixels):
+        height, width = pixels.shape
+        if self._frame is None or self._frame.shape != pixels.shape:
+            self._frame = np.empty_like(pixels)
+            changed = np.arange(height)
+        else:
+            changed = np.flatnonzero((pixels != self._frame).any(axis=1))
+        self.rows_sent = len(changed)
+        if not self.rows_sent:
+            return
+        # split into runs of changed rows, merging small gaps
+        breaks = np.flatnonzero(np.diff(changed) > ROW_GAP)
+        firsts = np.concatenate(([changed[0]], changed[breaks + 1]))
+        lasts = np.concatenate((changed[breaks], [changed[-1]]))
+        #pylint: disable=protected-access
+        for first, last in zip(firsts, lasts):
+            self.disp._block(0, first, width - 1, last,
+                             pixels[first:last + 1].tobytes())
+        self._frame[...] = pixels
@@ -12,8 +12,8 @@ import digitalio
 import adafruit_rgb_display.ili9341 as ili9341
 # Matplotlib
 import matplotlib.pyplot as plt
-# Python Imaging Library
-from PIL import Image
+# Cached background renderer
+from blit_renderer import BlitRenderer
 
 #pylint: disable=bad-continuation
 #==| User Config |========================================================
@@ -107,6 +107,9 @@ for plot, config in enumerate(PLOT_CONFIG):
         lines.append(line)
     plot_lines.append(lines)
 
+# Setup renderer, only the lines and frame time get redrawn each update
+renderer = BlitRenderer(disp, fig, [line for lines in plot_lines for line in lines])
+
 def update_plot():
     # update lines with latest data
     for plot, lines in enumerate(plot_lines):
@@ -114,16 +117,14 @@ def update_plot():
             line.set_ydata(y_data[plot][index])
         # autoscale if not specified
         if 'ylim' not in PLOT_CONFIG[plot].keys():
+            ylim = ax[plot].get_ylim()
             ax[plot].relim()
             ax[plot].autoscale_view()
-    # draw the plots
-    canvas = plt.get_current_fig_manager().canvas
-    plt.tight_layout()
-    canvas.draw()
-    # transfer into PIL image and display
-    image = Image.frombytes('RGB', canvas.get_width_height(),
-                            canvas.tostring_rgb())
-    disp.image(image)
+            # new limits mean new tick labels, so redraw the background
+            if ax[plot].get_ylim() != ylim:
+                renderer.invalidate()
+    # draw the lines over the cached background and send changed rows
+    renderer.update()
 
 print("looping")
 while True:
@@ -14,54 +14,164 @@ Copyright (c) 2019 Adafruit Industries
 Licensed under the MIT license.
 
 All text above must be included in any redistribution.
+
+Usage:
+    python display_lidar_pi.py                          # live points
+    python display_lidar_pi.py --grid --decay 0.85      # live occupancy grid
+    python display_lidar_pi.py --record scans.jsonl     # live, saving scans
+    python display_lidar_pi.py --replay scans.jsonl     # replay and time
+
+Replay runs as fast as it can and reports scans per second, so it also
+works as a benchmark; set SDL_VIDEODRIVER=dummy to run it without a screen.
 """
 
+import argparse
+import json
 import os
-from math import cos, sin, pi, floor
+import time
+from math import pi
+import numpy as np
 import pygame
-from adafruit_rplidar import RPLidar
-
-# Set up pygame and the display
-os.putenv('SDL_FBDEV', '/dev/fb1')
-pygame.init()
-lcd = pygame.display.set_mode((320,240))
-pygame.mouse.set_visible(False)
-lcd.fill((0,0,0))
-pygame.display.update()
-
-# Setup the RPLidar
-PORT_NAME = '/dev/ttyUSB0'
-lidar = RPLidar(None, PORT_NAME)
-
-# used to scale data to fit on the screen
-max_distance = 0
-
-#pylint: disable=redefined-outer-name,global-statement
-def process_data(data):
-    global max_distance
-    lcd.fill((0,0,0))
-    for angle in range(360):
-        distance = data[angle]
-        if distance > 0:                  # ignore initially ungathered data points
-            max_distance = max([min([5000, distance]), max_distance])
-            radians = angle * pi / 180.0
-            x = distance * cos(radians)
-            y = distance * sin(radians)
-            point = (160 + int(x / max_distance * 119), 120 + int(y / max_distance * 119))
-            lcd.set_at(point, pygame.Color(255, 255, 255))
-    pygame.display.update()
 
+WIDTH = 320
+HEIGHT = 240
+CENTER_X = 160
+CENTER_Y = 120
+RADIUS = 119                # screen pixels for max_distance
+DISTANCE_LIMIT = 5000       # max_distance never scales past this (mm)
+
+class ScanRenderer:
+    """Turns whole scans into screen pixels with numpy.
+
+    Angles are binned at `resolution` degrees with sine and cosine looked
+    up from tables built once. In point mode the latest distance for every
+    bin is drawn, as each scan only fills in some of them. In grid mode
+    each scan is added to an occupancy grid that fades by `decay` per scan,
+    so a few scans build up into a steadier picture.
+    """
+
+    def __init__(self, resolution=1.0, grid=False, decay=0.9):
+        self.bins = int(round(360 / resolution))
+        radians = np.arange(self.bins) * (360 / self.bins) * pi / 180.0
+        self.cos_table = np.cos(radians)
+        self.sin_table = np.sin(radians)
+        self.grid = grid
+        self.decay = decay
+        # used to scale data to fit on the screen
+        self.max_distance = 0
+        self.distances = np.zeros(self.bins)
+        self.occupancy = np.zeros((WIDTH, HEIGHT), dtype=np.float32)
+        # surfarray indexes pixels [x][y]
+        self.pixels = np.zeros((WIDTH, HEIGHT, 3), dtype=np.uint8)
+
+    def add_scan(self, scan):
+        """Take a scan of (quality, angle, distance) measurements"""
+        if not scan:
+            return
+        measurements = np.asarray(scan, dtype=float)
+        bins = (measurements[:, 1] * (self.bins / 360)).astype(int) % self.bins
+        distances = measurements[:, 2]
+        self.max_distance = max(self.max_distance,
+                                min(DISTANCE_LIMIT, distances.max()))
+        if self.grid:
+            self.occupancy *= self.decay
+            valid = distances > 0   # ignore ungathered data points
+            if self.max_distance and valid.any():
+                x, y = self._to_screen(bins[valid], distances[valid])
+                self.occupancy[x, y] = 1.0
+        else:
+            self.distances[bins] = distances
+
+    def _to_screen(self, bins, distances):
+        x = (distances * self.cos_table[bins] / self.max_distance * RADIUS).astype(int)
+        y = (distances * self.sin_table[bins] / self.max_distance * RADIUS).astype(int)
+        x += CENTER_X
+        y += CENTER_Y
+        # distances past DISTANCE_LIMIT can land off screen
+        visible = (x >= 0) & (x < WIDTH) & (y >= 0) & (y < HEIGHT)
+        return x[visible], y[visible]
+
+    def draw(self, surface):
+        """Blit the current image to surface"""
+        if self.grid:
+            np.multiply(self.occupancy[:, :, None], 255, out=self.pixels,
+                        casting='unsafe')
+        else:
+            self.pixels.fill(0)
+            bins = np.flatnonzero(self.distances)
+            if len(bins):  # pylint: disable=len-as-condition
+                x, y = self._to_screen(bins, self.distances[bins])
+                self.pixels[x, y] = 255
+        pygame.surfarray.blit_array(surface, self.pixels)
+
+def live_scans(port_name, record_file=None):
+    """Yield scans from the RPLidar, saving them one per line if asked"""
+    from adafruit_rplidar import RPLidar  # pylint: disable=import-outside-toplevel
+    lidar = RPLidar(None, port_name)
+    try:
+        print(lidar.info)
+        for scan in lidar.iter_scans():
+            if record_file:
+                record_file.write(json.dumps(scan) + '\n')
+            yield scan
+    finally:
+        lidar.stop()
+        lidar.disconnect()
+
+def recorded_scans(replay_file):
+    """Yield scans saved with --record"""
+    for line in replay_file:
+        if line.strip():
+            yield json.loads(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Display RPLidar scans.')
+    parser.add_argument('--port', default='/dev/ttyUSB0',
+                        help='RPLidar serial port (default: /dev/ttyUSB0)')
+    parser.add_argument('--resolution', type=float, default=1.0,
+                        help='angular resolution in degrees (default: 1.0)')
+    parser.add_argument('--grid', action='store_true',
+                        help='show a decaying occupancy grid of recent scans')
+    parser.add_argument('--decay', type=float, default=0.9,
+                        help='grid fade per scan, 0 to 1 (default: 0.9)')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--record', type=argparse.FileType('w'),
+                        help='save live scans to a file')
+    source.add_argument('--replay', type=argparse.FileType('r'),
+                        help='show scans from a --record file instead of the RPLidar')
+    args = parser.parse_args()
+
+    # Set up pygame and the display
+    os.putenv('SDL_FBDEV', '/dev/fb1')
+    pygame.init()
+    lcd = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.mouse.set_visible(False)
+    lcd.fill((0, 0, 0))
+    pygame.display.update()
 
-scan_data = [0]*360
+    renderer = ScanRenderer(args.resolution, args.grid, args.decay)
+    if args.replay:
+        scans = recorded_scans(args.replay)
+    else:
+        scans = live_scans(args.port, args.record)
 
-try:
-    print(lidar.info)
-    for scan in lidar.iter_scans():
-        for (_, angle, distance) in scan:
-            scan_data[min([359, floor(angle)])] = distance
-        process_data(scan_data)
+    count = 0
+    render_time = 0
+    start = time.monotonic()
+    try:
+        for scan in scans:
+            render_start = time.monotonic()
+            renderer.add_scan(scan)
+            renderer.draw(lcd)
+            render_time += time.monotonic() - render_start
+            pygame.display.update()
+            count += 1
+    except KeyboardInterrupt:
+        print('Stoping.')
+    elapsed = time.monotonic() - start
+    if count:
+        print('{} scans in {:.2f}s, {:.1f} scans/s, {:.2f}ms per scan rendering'.format(
+            count, elapsed, count / elapsed, 1000 * render_time / count))
 
-except KeyboardInterrupt:
-    print('Stoping.')
-lidar.stop()
-lidar.disconnect()
+if __name__ == '__main__':
+    main()
@@ -3,10 +3,32 @@
 #
 # SPDX-License-Identifier: MIT
 
-import time
+"""Benchmark the kernels the ulab demos use, each written in plain Python
+and with ulab, over a range of input sizes.  Results are printed as one
+JSON document so runs can be saved and compared.
+
+On a board, copy this as code.py.  On a computer, run host.py, which
+stands NumPy in for ulab and runs this file unchanged."""
+
+import json
 import math
+import sys
+import time
+import ulab
 from ulab import numpy as np
 
+try:
+    from ulab.utils import spectrogram
+except ImportError:
+    from ulab.scipy.signal import spectrogram
+
+# Each timing repeats its kernel for at least this long...
+MIN_TIME_NS = 200_000_000
+# ...or this many times, whichever comes first
+MAX_REPEAT = 1000
+
+# ### RMS, as in the original benchmark and cluepulse ###
+
 def mean(values):
     return sum(values) / len(values)
 
@@ -26,21 +48,212 @@ def normalized_rms_ulab(values):
     samples_sum = np.sum(values * values)
     return math.sqrt(samples_sum / len(values))
 
-# Instead of using sensor data, we generate some data
-# The amplitude is 5000 so the rms should be around 5000/1.414 = 3536
-nums_list = [int(8000 + math.sin(i) * 5000) for i in range(100)]
-nums_array = np.array(nums_list)
+def rms_data(size):
+    # The amplitude is 5000 so the rms should be around 5000/1.414 = 3536
+    values = [int(8000 + math.sin(i) * 5000) for i in range(size)]
+    return values, np.array(values)
+
+# ### FIR convolution, as in cluepulse and cluebarometer ###
+
+FIR_TAPS = [math.sin(math.pi * (i + 1) / 17) / 8 for i in range(16)]
+
+def convolve(values, taps):
+    result = [0.0] * (len(values) + len(taps) - 1)
+    for i, value in enumerate(values):
+        for j, tap in enumerate(taps):
+            result[i + j] += value * tap
+    return result
+
+def fir_data(size):
+    values = [math.sin(i / 3) for i in range(size)]
+    return (values, FIR_TAPS), (np.array(values), np.array(FIR_TAPS))
+
+# ### Spectrogram, as in waterfall ###
+
+def bit_reversed(values):
+    # values reordered by bit reversed index, len(values) must be a power of 2
+    n = len(values)
+    result = [0.0] * n
+    for i, value in enumerate(values):
+        reversed_i, bit, rest = 0, n >> 1, i
+        while bit:
+            if rest & 1:
+                reversed_i |= bit
+            rest >>= 1
+            bit >>= 1
+        result[reversed_i] = value
+    return result
+
+def fft_magnitude(values):
+    # iterative radix-2 FFT, len(values) must be a power of 2
+    n = len(values)
+    real = bit_reversed(values)
+    imag = [0.0] * n
+    size = 2
+    while size <= n:
+        half = size // 2
+        step = -2 * math.pi / size
+        for start in range(0, n, size):
+            for k in range(half):
+                w_re = math.cos(step * k)
+                w_im = math.sin(step * k)
+                a, b = start + k, start + k + half
+                t_re = w_re * real[b] - w_im * imag[b]
+                t_im = w_re * imag[b] + w_im * real[b]
+                real[b], imag[b] = real[a] - t_re, imag[a] - t_im
+                real[a], imag[a] = real[a] + t_re, imag[a] + t_im
+        size *= 2
+    return [math.sqrt(re * re + im * im) for re, im in zip(real, imag)]
 
-def timeit(s, f, n=100):
+def spectrum_data(size):
+    values = [8000 + 2000 * math.sin(i / 5) for i in range(size)]
+    return values, np.array(values)
+
+# ### Bilinear 2x upscale, as in the thermal camera ###
+
+def upscale(sensor):
+    axis = len(sensor)
+    grid_axis = 2 * axis - 1
+    grid = [[0.0] * grid_axis for _ in range(grid_axis)]
+    for row in range(axis):
+        for col in range(axis):
+            grid[2 * row][2 * col] = sensor[row][col]
+    for row in range(0, grid_axis, 2):
+        for col in range(1, grid_axis, 2):
+            grid[row][col] = (grid[row][col - 1] + grid[row][col + 1]) / 2
+    for row in range(1, grid_axis, 2):
+        for col in range(grid_axis):
+            grid[row][col] = (grid[row - 1][col] + grid[row + 1][col]) / 2
+    return grid
+
+def upscale_ulab(sensor):
+    axis = sensor.shape[0]
+    grid = np.zeros((2 * axis - 1, 2 * axis - 1))
+    grid[::2, ::2] = sensor
+    grid[1::2, ::2] = sensor[:-1, :]
+    grid[1::2, ::2] += sensor[1:, :]
+    grid[1::2, ::2] /= 2
+    grid[::, 1::2] = grid[::, :-1:2]
+    grid[::, 1::2] += grid[::, 2::2]
+    grid[::, 1::2] /= 2
+    return grid
+
+def upscale_data(size):
+    sensor = [[(math.sin(row / 2) + math.cos(col / 3) + 2) / 4
+               for col in range(size)] for row in range(size)]
+    return sensor, np.array(sensor)
+
+# ### Threshold and histogram, as in the thermal camera ###
+
+HISTOGRAM_BINS = 15
+THRESHOLD = 0.75
+
+def threshold_histogram(values):
+    histogram = [0] * HISTOGRAM_BINS
+    over = 0
+    for value in values:
+        histogram[min(HISTOGRAM_BINS - 1, int(value * HISTOGRAM_BINS))] += 1
+        if value > THRESHOLD:
+            over += 1
+    return over, histogram
+
+def threshold_histogram_ulab(values):
+    # count values at or above each bin edge, then take differences
+    at_least = [len(values)]
+    for edge in range(1, HISTOGRAM_BINS):
+        at_least.append(np.sum(values >= edge / HISTOGRAM_BINS))
+    at_least.append(0)
+    histogram = [at_least[i] - at_least[i + 1] for i in range(HISTOGRAM_BINS)]
+    return np.sum(values > THRESHOLD), histogram
+
+def histogram_data(size):
+    values = [(math.sin(i * 0.37) + 1) / 2.0001 for i in range(size)]
+    return values, np.array(values)
+
+# ### The suite ###
+
+# kernel: sizes to time, function making (python data, ulab data) for a
+# size, and the functions to time, by implementation
+KERNELS = {
+    "rms": {
+        "sizes": (100, 1000, 4000),
+        "data": rms_data,
+        "impl": {
+            "python": normalized_rms,
+            "ulab": normalized_rms_ulab,
+            "ulab_std": np.std,
+        },
+    },
+    "fir": {
+        "sizes": (64, 256, 1024),
+        "data": fir_data,
+        "impl": {
+            "python": lambda args: convolve(*args),
+            "ulab": lambda args: np.convolve(*args),
+        },
+    },
+    "spectrogram": {
+        "sizes": (64, 256, 1024),
+        "data": spectrum_data,
+        "impl": {
+            "python": fft_magnitude,
+            "ulab": spectrogram,
+        },
+    },
+    "upscale": {
+        "sizes": (8, 16, 32),
+        "data": upscale_data,
+        "impl": {
+            "python": upscale,
+            "ulab": upscale_ulab,
+        },
+    },
+    "histogram": {
+        "sizes": (64, 225, 1024),
+        "data": histogram_data,
+        "impl": {
+            "python": threshold_histogram,
+            "ulab": threshold_histogram_ulab,
+        },
+    },
+}
+
+def timeit(function, data):
+    """Return (ms per call, calls timed)"""
+    repeat = 0
     t0 = time.monotonic_ns()
-    for _ in range(n):
-        x = f()
-    t1 = time.monotonic_ns()
-    r = (t1 - t0) * 1e-6 / n
-    print("%-30s : %8.3fms [result=%f]" % (s, r, x))
-
-print("Computing the RMS value of 100 numbers")
-timeit("traditional", lambda: normalized_rms(nums_list))
-timeit("ulab, with ndarray, some implementation in python", lambda: normalized_rms_ulab(nums_array))
-timeit("ulab only, with list", lambda: np.std(nums_list))
-timeit("ulab only, with ndarray", lambda: np.std(nums_array))
+    t1 = t0
+    while repeat < MAX_REPEAT and t1 - t0 < MIN_TIME_NS:
+        function(data)
+        repeat += 1
+        t1 = time.monotonic_ns()
+    return (t1 - t0) * 1e-6 / repeat, repeat
+
+def run(kernels=None):
+    if kernels is None:
+        kernels = KERNELS
+    results = []
+    for kernel, suite in kernels.items():
+        for size in suite["sizes"]:
+            try:
+                python_data, ulab_data = suite["data"](size)
+            except MemoryError:
+                results.append({"kernel": kernel, "size": size, "error": "MemoryError"})
+                continue
+            for implementation, function in suite["impl"].items():
+                data = python_data if implementation == "python" else ulab_data
+                result = {"kernel": kernel, "size": size, "impl": implementation}
+                try:
+                    result["ms"], result["repeat"] = timeit(function, data)
+                except MemoryError:
+                    result["error"] = "MemoryError"
+                results.append(result)
+    return {
+        "platform": sys.platform,
+        "implementation": sys.implementation.name,
+        "ulab": ulab.__version__,
+        "results": results,
+    }
+
+if __name__ == "__main__":
+    print(json.dumps(run()))
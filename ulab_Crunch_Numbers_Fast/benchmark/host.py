@@ -0,0 +1,80 @@
+# SPDX-FileCopyrightText: 2020 Jeff Epler for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Host-side (CPython + NumPy, NOT CircuitPython) runner for code.py. Stands
+NumPy in for the parts of ulab the benchmark uses, runs code.py unchanged
+and saves or compares its JSON results.
+
+$ python host.py --output host.json
+$ python host.py --compare host.json
+$ python host.py --compare host.json board.json   # compare two saved runs
+"""
+
+import argparse
+import json
+import os
+import runpy
+import sys
+import types
+import numpy
+
+def install_ulab_shim():
+    """Make `from ulab import numpy` and ulab.utils.spectrogram use NumPy"""
+    ulab = types.ModuleType("ulab")
+    ulab.__version__ = "numpy-" + numpy.__version__
+    ulab.numpy = numpy
+    ulab.utils = types.ModuleType("ulab.utils")
+    ulab.utils.spectrogram = lambda values: numpy.abs(numpy.fft.fft(values))
+    sys.modules["ulab"] = ulab
+    sys.modules["ulab.numpy"] = numpy
+    sys.modules["ulab.utils"] = ulab.utils
+
+def run_benchmark():
+    install_ulab_shim()
+    code = os.path.join(os.path.dirname(os.path.abspath(__file__)), "code.py")
+    return runpy.run_path(code, run_name="benchmark")["run"]()
+
+def timings(run):
+    return {(result["kernel"], result["size"], result.get("impl")): result.get("ms")
+            for result in run["results"]}
+
+def compare(old, new):
+    """Print new timings against old ones, ratio > 1 being slower"""
+    old_ms = timings(old)
+    print("{:12s} {:>6s} {:10s} {:>10s} {:>10s} {:>7s}".format(
+        "kernel", "size", "impl", "old ms", "new ms", "ratio"))
+    for key, new_time in timings(new).items():
+        old_time = old_ms.get(key)
+        ratio = new_time / old_time if new_time and old_time else None
+        print("{:12s} {:6d} {:10s} {:>10s} {:>10s} {:>7s}".format(
+            key[0], key[1], key[2] or "-",
+            "-" if old_time is None else "{:.4f}".format(old_time),
+            "-" if new_time is None else "{:.4f}".format(new_time),
+            "-" if ratio is None else "{:.2f}".format(ratio)))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the ulab kernel benchmark on the host with NumPy.")
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--compare", nargs="+", metavar="JSON",
+                        help="compare against a saved run, or compare two saved runs")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0]) as old, open(args.compare[1]) as new:
+            compare(json.load(old), json.load(new))
+        return
+    run = run_benchmark()
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(run, output, indent=1)
+    if args.compare:
+        with open(args.compare[0]) as old:
+            compare(json.load(old), run)
+    elif not args.output:
+        print(json.dumps(run))
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import adafruit_bmp280
 import board
 import displayio
 from ulab import numpy as np
+from fir import DecimatingFIR
 
 # Blank the screen.  Scrolling text causes unwanted delays.
 d = displayio.Group()
@@ -131,8 +132,9 @@ dt = 62500000 # 16Hz, 62.5ms
 
 # Wait until after deadline_ns has passed
 def sleep_deadline(deadline_ns):
-    while time.monotonic_ns() < deadline_ns:
-        pass
+    remaining = deadline_ns - time.monotonic_ns()
+    if remaining > 0:
+        time.sleep(remaining * 1e-9)
 
 
 # Initialize our sensor
@@ -146,8 +148,12 @@ sensor.iir_filter = adafruit_bmp280.IIR_FILTER_DISABLE
 sensor.overscan_pressure = adafruit_bmp280.OVERSCAN_X1
 
 # And our data structures
-# The most recent data samples, equal in number to the filter taps
-data = np.zeros(len(taps))
+# The filter keeps the most recent samples, equal in number to the filter
+# taps. We only print every 10th value, so it only computes every 10th
+# output.  This prints about 1.6 values per second.  You can print values
+# more quickly by changing the number '10' down, as far as 1 to print every
+# value.
+fir = DecimatingFIR(taps, 10)
 t0 = deadline = time.monotonic_ns()
 n = 0
 # Take an initial reading to subtract off later, so that the graph in mu
@@ -164,16 +170,9 @@ while True:
     value = sensor.pressure - offset
     if n == 0:
         # The first time, fill the filter with the initial value
-        data = data + value
-    else:
-        # Otherwise, add it as the next sample
-        data = np.roll(data, 1)
-        data[-1] = value
-    filtered = np.sum(data * taps)
-    # Actually print every 10th value.  This prints about 1.6 values per
-    # second.  You can print values more quickly by removing the 'if' and
-    # making the print unconditional, or change the frequency of prints up
-    # or down by changing the number '10'.
-    if n % 10 == 0:
+        fir.fill(value)
+    # Add it as the next sample, getting a filtered value back every 10th
+    filtered = fir.push(value)
+    if filtered is not None:
         print((filtered, value))
     n += 1
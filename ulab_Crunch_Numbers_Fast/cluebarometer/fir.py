@@ -0,0 +1,45 @@
+# SPDX-FileCopyrightText: 2020 Jeff Epler for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+from ulab import numpy as np
+
+class DecimatingFIR:
+    """Streaming FIR filter that only computes every `decimation`th output.
+
+    Samples go into a circular buffer twice as long as the filter, written
+    at i and i + len(taps), so the latest len(taps) samples are always one
+    contiguous slice in time order and nothing is allocated or shifted per
+    sample. The dot product with the taps runs only when an output is due,
+    which for a decimating FIR is the same work as the polyphase form: each
+    kept output uses every phase once and the dropped outputs cost nothing.
+
+    push() returns the filtered value on the first sample and every
+    `decimation`th after it, and None otherwise.
+    """
+
+    def __init__(self, taps, decimation=1):
+        self.ntaps = len(taps)
+        self.decimation = decimation
+        # reversed, so the oldest sample in the window meets the last tap
+        self.taps = np.array(taps[::-1])
+        self.buffer = np.zeros(2 * self.ntaps)
+        self.index = 0
+        self.phase = 0
+
+    def fill(self, value):
+        """Make it look as if value had always been the input"""
+        self.buffer[:] = value
+
+    def push(self, value):
+        index = self.index
+        self.buffer[index] = value
+        self.buffer[index + self.ntaps] = value
+        index += 1
+        self.index = 0 if index == self.ntaps else index
+
+        phase = self.phase
+        self.phase = phase + 1 if phase + 1 < self.decimation else 0
+        if phase:
+            return None
+        return np.dot(self.buffer[index:index + self.ntaps], self.taps)
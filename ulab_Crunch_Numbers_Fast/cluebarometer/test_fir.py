@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2020 Jeff Epler for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Host-side (CPython + NumPy, NOT CircuitPython) check of fir.py. Compares
+DecimatingFIR against an lfilter style reference built from np.convolve,
+then times it against the np.roll() loop code.py used to have.
+
+$ python test_fir.py
+"""
+
+import sys
+import time
+import types
+import numpy
+
+try:
+    import ulab  # pylint: disable=unused-import
+except ImportError:
+    # fir.py only needs ulab.numpy, which follows the NumPy API
+    sys.modules["ulab"] = types.SimpleNamespace(numpy=numpy)
+
+from fir import DecimatingFIR  # pylint: disable=wrong-import-position
+
+NTAPS = 311
+DECIMATION = 10
+SAMPLES = 20000
+
+def lowpass_taps(ntaps, cutoff):
+    """Hamming windowed sinc, like the barometer's filter"""
+    n = numpy.arange(ntaps) - (ntaps - 1) / 2
+    taps = numpy.sinc(2 * cutoff * n) * numpy.hamming(ntaps)
+    return taps / taps.sum()
+
+def lfilter(taps, samples):
+    """lfilter(taps, 1, samples) with zero initial state"""
+    return numpy.convolve(samples, taps)[:len(samples)]
+
+def check(taps, samples, decimation, initial=None):
+    fir = DecimatingFIR(taps, decimation)
+    if initial is None:
+        expected = lfilter(taps, samples)
+    else:
+        fir.fill(initial)
+        padded = numpy.concatenate((numpy.full(len(taps) - 1, initial), samples))
+        expected = lfilter(taps, padded)[len(taps) - 1:]
+    outputs = [fir.push(value) for value in samples]
+    kept = [value for value in outputs if value is not None]
+    assert all(value is None for index, value in enumerate(outputs)
+               if index % decimation), "output on the wrong sample"
+    error = numpy.max(numpy.abs(numpy.array(kept) - expected[::decimation]))
+    assert error < 1e-9, "max error {}".format(error)
+    return error
+
+def roll_filter(taps, samples):
+    """The old per sample loop: roll, store, multiply and sum"""
+    data = numpy.zeros(len(taps))
+    for n, value in enumerate(samples):
+        data = numpy.roll(data, 1)
+        data[-1] = value
+        filtered = numpy.sum(data * taps)
+        if n % DECIMATION == 0:
+            yield filtered
+
+def rate(function):
+    start = time.perf_counter()
+    function()
+    return SAMPLES / (time.perf_counter() - start)
+
+def main():
+    rng = numpy.random.default_rng(1)
+    taps = lowpass_taps(NTAPS, 0.01)
+    samples = rng.normal(size=SAMPLES).cumsum() * 0.01 + rng.normal(size=SAMPLES)
+
+    for decimation in (1, 3, 10):
+        error = check(taps, samples, decimation)
+        print("decimation {:2d}: max error {:.2e}".format(decimation, error))
+    error = check(taps, samples + 5, DECIMATION, initial=samples[0] + 5)
+    print("filled start: max error {:.2e}".format(error))
+    check(rng.normal(size=7), samples[:100], 4)
+    print("short filter: ok")
+
+    fir = DecimatingFIR(taps, DECIMATION)
+    fir_rate = rate(lambda: [fir.push(value) for value in samples])
+    roll_rate = rate(lambda: list(roll_filter(taps, samples)))
+    print("{} taps, decimation {}: DecimatingFIR {:.0f} samples/s, "
+          "np.roll loop {:.0f} samples/s ({:.1f}x)".format(
+              NTAPS, DECIMATION, fir_rate, roll_rate, fir_rate / roll_rate))
+
+if __name__ == "__main__":
+    main()
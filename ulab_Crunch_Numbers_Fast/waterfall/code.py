@@ -7,9 +7,11 @@ https://teaandtechtime.com/fft-circuitpython-library/
 to work with ulab on Adafruit CLUE"""
 
 import array
+import time
 
 import board
 import audiobusio
+import bitmaptools
 import displayio
 from ulab import numpy as np
 
@@ -39,30 +41,45 @@ for i, pi in enumerate((0xff0000, 0xff0a00, 0xff1400, 0xff1e00,
     # fmt: on
     palette[51-i] = pi
 
-class RollingGraph(displayio.TileGrid):
+class Waterfall(displayio.TileGrid):
+    """Scrolling spectrogram, newest row at the top.
+
+    Each row of the bitmap is its own tile, so scrolling only changes which
+    row each tile position shows; no pixels are redrawn.  A new row is
+    written over the oldest one with a single arrayblit."""
+
     def __init__(self, scale=2):
+        width = display.width//scale
+        height = display.height//scale
         # Create a bitmap with heatmap colors
-        self._bitmap = displayio.Bitmap(display.width//scale,
-                                       display.height//scale, len(palette))
-        super().__init__(self._bitmap, pixel_shader=palette)
+        self._bitmap = displayio.Bitmap(width, height, len(palette))
+        super().__init__(self._bitmap, pixel_shader=palette, width=1,
+                         height=height, tile_width=width, tile_height=1)
 
-        self.scroll_offset = 0
+        self._row = np.zeros(width, dtype=np.uint8)
+        self.newest = 0
 
     def show(self, data):
-        y = self.scroll_offset
+        """Add a row of palette indices, given as floats"""
         bitmap = self._bitmap
-
-        board.DISPLAY.auto_refresh = False
-        offset = max(0, (bitmap.width-len(data))//2)
-        for x in range(min(bitmap.width, len(data))):
-            bitmap[x+offset, y] = int(data[x])
-
-        board.DISPLAY.auto_refresh = True
-
-        self.scroll_offset = (y + 1) % self.bitmap.height
+        row = self._row
+        count = min(bitmap.width, len(data))
+        offset = (bitmap.width-count)//2
+        # Clamp and truncate the whole row to palette indices at once
+        row[offset:offset+count] = np.array(
+            np.clip(data[:count], 0, len(palette)-1), dtype=np.uint8)
+
+        y = (self.newest - 1) % bitmap.height
+        bitmaptools.arrayblit(bitmap, row, 0, y, bitmap.width, y+1)
+        self.newest = y
+        for position in range(bitmap.height):
+            self[0, position] = y
+            y += 1
+            if y == bitmap.height:
+                y = 0
 
 group = displayio.Group(scale=3)
-graph = RollingGraph(3)
+graph = Waterfall(3)
 fft_size = 256
 
 # Add the TileGrid to the Group
@@ -81,6 +98,10 @@ samples_bit = array.array('H', [0] * (fft_size+3))
 # Main Loop
 def main():
     max_all = 10
+    # Draw each frame as one refresh, rather than whenever displayio is ready
+    display.auto_refresh = False
+    frames = 0
+    fps_start = time.monotonic()
 
     while True:
         mic.record(samples_bit, len(samples_bit))
@@ -98,12 +119,18 @@ def main():
         else:
             max_curr = max_curr-1
 
-        print(min_curr, max_all)
         min_curr = max(min_curr, 3)
-        # Plot FFT
+        # Plot FFT, show() clamps negative numbers to zero
         data = (spectrogram1 - min_curr) * (51. / (max_all - min_curr))
-        # This clamps any negative numbers to zero
-        data = data * np.array((data > 0))
         graph.show(data)
+        display.refresh()
+
+        # Print the frame rate and range about once a second
+        frames += 1
+        now = time.monotonic()
+        if now - fps_start >= 1:
+            print("%.1f fps" % (frames / (now - fps_start)), min_curr, max_all)
+            frames = 0
+            fps_start = now
 
 main()